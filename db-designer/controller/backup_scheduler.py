@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from .connection_manager import BackupReport, ConnectionManager
+from .worker_threads import WorkerThreads
+
+
+# Milliseconds between two automatic backups of an in-memory database
+BACKUP_INTERVAL = 30_000
+
+
+class BackupWorker(QObject):
+    """Runs one ConnectionManager.backup() off the GUI thread."""
+
+    finished = Signal(object)  # BackupReport, or the error message
+
+    def __init__(self, manager: ConnectionManager) -> None:
+        super().__init__()
+        self._manager = manager
+
+    def run(self) -> None:
+        try:
+            result: object = self._manager.backup()
+        except Exception as e:
+            result = f"Backup failed: {str(e)}"
+        self.finished.emit(result)
+
+
+class BackupScheduler(QObject):
+    """
+    Writes an in-memory working database to its file in the background.
+
+    A backup runs every ``interval`` milliseconds when something changed,
+    and on ``save()``. Only one runs at a time; a save requested meanwhile
+    runs once the current one is done.
+    """
+
+    saved = Signal(object)  # BackupReport
+    failed = Signal(str)
+
+    def __init__(
+        self, manager: ConnectionManager, interval: int = BACKUP_INTERVAL, parent: Optional[QObject] = None
+    ) -> None:
+        super().__init__(parent)
+        self._manager = manager
+        self._running = False
+        self._pending = False
+        self._threads = WorkerThreads(self)
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._on_timer)
+        if manager.in_memory:
+            self._timer.start()
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def save(self) -> None:
+        """Back up now, or right after the backup that is running."""
+        if self._running:
+            self._pending = True
+            return
+        worker = BackupWorker(self._manager)
+        worker.finished.connect(self._on_worker_finished)
+        self._running = True
+        self._threads.start(worker)
+
+    def stop(self) -> None:
+        """Stop the timer and wait for a running backup."""
+        self._timer.stop()
+        self._pending = False
+        self._threads.wait()
+
+    def _on_timer(self) -> None:
+        if not self._running and self._manager.needs_backup():
+            self.save()
+
+    def _on_worker_finished(self, result: object) -> None:
+        self._running = False
+        if isinstance(result, BackupReport):
+            self.saved.emit(result)
+        else:
+            self.failed.emit(str(result))
+        if self._pending:
+            self._pending = False
+            self.save()
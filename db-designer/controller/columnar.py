@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import zipfile
+from typing import Any, List, Sequence, Tuple
+
+# NumPy is optional; only the columnar export needs it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+class ColumnarWriter:
+    """
+    Writes rows as a zip of NumPy column chunks, a small Parquet-like layout.
+
+    Every ``write_batch`` call becomes one row group: one ``.npy`` array per
+    column stored as ``<group>/<column index>.npy``, plus a boolean
+    ``<group>/<column index>.null.npy`` mask when the chunk has NULLs.
+    ``meta.json`` lists the columns and row group sizes. The file opens with
+    ``numpy.load`` and only one row group is held in memory while writing.
+
+    Integer columns become int64, with 0 in the rows the null mask marks,
+    reals float64 (NaN for NULL). Text is stored as ``<column index>.utf8.npy``, the UTF-8
+    bytes of all values back to back as uint8, anything else likewise as
+    ``<column index>.bytes.npy``; both come with an int64
+    ``<column index>.offsets.npy`` of n + 1 byte offsets, value i being
+    ``data[offsets[i]:offsets[i + 1]]``. Memory use thus follows the total
+    length of the values, not the longest one times the row count.
+    """
+
+    def __init__(self, path: str, columns: Sequence[str]) -> None:
+        if np is None:
+            raise RuntimeError("Columnar export requires NumPy (pip install numpy)")
+        self._columns = list(columns)
+        self._groups: List[int] = []
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True)
+
+    def write_batch(self, rows: Sequence[tuple]) -> None:
+        if not rows:
+            return
+        group = len(self._groups)
+        for index, values in enumerate(zip(*rows)):
+            for suffix, array in _column_arrays(values):
+                self._write_array(f"{group:05d}/{index}{suffix}.npy", array)
+        self._groups.append(len(rows))
+
+    def close(self) -> None:
+        meta = {"columns": self._columns, "row_groups": self._groups}
+        self._zip.writestr("meta.json", json.dumps(meta))
+        self._zip.close()
+
+    def _write_array(self, name: str, array: Any) -> None:
+        with self._zip.open(name, "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, array, allow_pickle=False)
+
+
+def _column_arrays(values: Sequence[Any]) -> List[Tuple[str, Any]]:
+    """(file suffix, array) pairs storing one column of a row group."""
+    arrays: List[Tuple[str, Any]] = []
+    if any(v is None for v in values):
+        arrays.append((".null", np.fromiter((v is None for v in values), dtype=bool, count=len(values))))
+    present = [v for v in values if v is not None]
+    if all(type(v) is int for v in present):
+        if not arrays:
+            return [("", np.array(values, dtype=np.int64))]
+        return [("", np.array([0 if v is None else v for v in values], dtype=np.int64))] + arrays
+    if all(type(v) in (int, float) for v in present):
+        return [("", np.array([np.nan if v is None else v for v in values], dtype=np.float64))] + arrays
+    if all(type(v) is str for v in present):
+        suffix = ".utf8"
+        encoded = [b"" if v is None else v.encode("utf-8") for v in values]
+    else:
+        # Mixed or BLOB values: store the bytes of each value's text form
+        suffix = ".bytes"
+        encoded = [
+            b"" if v is None else v if isinstance(v, bytes) else str(v).encode("utf-8")
+            for v in values
+        ]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return [(suffix, data), (".offsets", offsets)] + arrays
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import queue
+import sqlite3
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+from . import sql_engine
+
+
+# Pages copied per backup step; the working database is free between steps
+BACKUP_PAGES = 256
+# Seconds a writing connection waits for another one's write lock
+BUSY_TIMEOUT = 10.0
+_memory_names = itertools.count(1)
+
+
+@dataclass
+class BackupReport:
+    """Outcome of ConnectionManager.backup."""
+    pages: int = 0
+    seconds: float = 0.0
+    # False when there was nothing new to write
+    written: bool = True
+
+
+class ConnectionManager:
+    """
+    Owns the connections to one database file.
+
+    The file is switched to WAL journaling, so readers never block
+    writers or each other. ``writer`` is the long-lived connection of the
+    GUI thread (imports, generated data, the initial DDL); the background
+    sync and each console query write through connections of their own
+    from ``connect()``. These writers take turns on SQLite's single write
+    lock: one that finds it held waits up to BUSY_TIMEOUT seconds, then
+    fails with "database is locked". Read-only work such as plan lookups
+    borrows one of up to ``readers`` pooled connections, opened on demand.
+    Every connection starts with the manager's PRAGMA profile (see
+    sql_engine.PRAGMA_PROFILES).
+
+    With ``in_memory`` the connections share a working database in memory
+    (SQLite's memdb VFS) instead, loaded from the file if it exists. Edits
+    then never wait on disk; ``backup()`` writes the working database back
+    to the file, which stays the last consistent snapshot in between.
+    """
+
+    def __init__(
+        self, db_path: str, readers: int = 4, profile: str = "interactive", in_memory: bool = False
+    ) -> None:
+        self.db_path = str(Path(db_path).resolve())
+        self.profile = profile
+        self.in_memory = in_memory
+        if in_memory:
+            # The memory database lives as long as one connection to it is open
+            self.uri = f"file:/db_designer-{next(_memory_names)}?vfs=memdb"
+        else:
+            self.uri = Path(self.db_path).as_uri()
+        self._writer = self.connect()
+        self._max_readers = readers
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._readers: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._backup_lock = threading.Lock()
+        self._backup_source: Optional[sqlite3.Connection] = None
+        self._saved_version: Optional[int] = None
+        if in_memory:
+            self._restore()
+        else:
+            self._writer.execute("PRAGMA journal_mode=WAL")
+
+    @property
+    def writer(self) -> sqlite3.Connection:
+        return self._writer
+
+    def connect(self, read_only: bool = False, **kwargs) -> sqlite3.Connection:
+        """
+        A new connection with the current profile, owned by the caller.
+        It waits BUSY_TIMEOUT seconds for locks unless ``timeout`` is given.
+
+        Read-only connections are opened with ``mode=ro`` (``query_only``
+        in memory) so a stray write fails instead of taking the write lock.
+        """
+        kwargs.setdefault("timeout", BUSY_TIMEOUT)
+        if read_only and not self.in_memory:
+            conn = sql_engine.connect(self.uri + "?mode=ro", uri=True, **kwargs)
+        else:
+            conn = sql_engine.connect(self.uri, uri=True, **kwargs)
+            if read_only:
+                conn.execute("PRAGMA query_only=ON")
+        sql_engine.apply_pragmas(conn, sql_engine.PRAGMA_PROFILES[self.profile])
+        return conn
+
+    @contextmanager
+    def reader(self, timeout: Optional[float] = None) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a pooled read-only connection for the duration of a block.
+
+        Blocks for up to ``timeout`` seconds when all of them are in use.
+        Any transaction left open is rolled back before the connection is
+        returned to the pool.
+        """
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = len(self._readers) < self._max_readers
+                if grow:
+                    conn = self.connect(read_only=True, check_same_thread=False)
+                    self._readers.append(conn)
+            if not grow:
+                conn = self._idle.get(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    @contextmanager
+    def use_profile(self, name: str) -> Iterator[sqlite3.Connection]:
+        """Run a block on the writer under another PRAGMA profile, e.g. "bulk-load"."""
+        with sql_engine.pragma_profile(self._writer, sql_engine.PRAGMA_PROFILES[name]):
+            yield self._writer
+
+    def set_profile(self, name: str) -> None:
+        """Switch the default profile; applied to the writer and to connections opened later."""
+        pragmas = sql_engine.PRAGMA_PROFILES[name]
+        self.profile = name
+        sql_engine.apply_pragmas(self._writer, pragmas)
+
+    def _restore(self) -> None:
+        """Load the file into the working database, if there is one."""
+        if not Path(self.db_path).exists():
+            return
+        disk = sqlite3.connect(self.db_path)
+        try:
+            # memdb cannot open a WAL database, and a snapshot file needs no WAL
+            disk.execute("PRAGMA journal_mode=DELETE")
+            disk.backup(self._writer)
+        finally:
+            disk.close()
+        with self._backup_lock:
+            # The file already holds what was just loaded
+            self._saved_version = self._data_version()
+
+    def needs_backup(self) -> bool:
+        """Whether the working database changed since it was last written to the file."""
+        if not self.in_memory:
+            return False
+        with self._backup_lock:
+            # None until the file holds a copy: everything is unsaved
+            return self._data_version() != self._saved_version
+
+    def _data_version(self) -> int:
+        """The working database's data version; call with _backup_lock held."""
+        if self._backup_source is None:
+            self._backup_source = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            self._backup_source.execute("PRAGMA query_only=ON")
+        # Bumped by commits of any other connection, never by this one
+        return self._backup_source.execute("PRAGMA data_version").fetchone()[0]
+
+    def backup(
+        self,
+        pages: int = BACKUP_PAGES,
+        sleep: float = 0.005,
+        progress: Optional[Callable[[int, int, int], object]] = None,
+    ) -> BackupReport:
+        """
+        Write the working database to the file, ``pages`` pages per step.
+
+        Between steps the working database is unlocked for ``sleep``
+        seconds; if another connection commits meanwhile, SQLite starts the
+        copy over. The file is locked for the whole copy and written in one
+        transaction, so it never holds a mix of two versions. Callable from
+        any thread; a no-op for file databases and when nothing changed.
+        """
+        if not self.needs_backup():
+            return BackupReport(written=False)
+        start = time.perf_counter()
+        report = BackupReport()
+
+        def on_step(status: int, remaining: int, total: int) -> None:
+            report.pages = total
+            if progress is not None:
+                progress(status, remaining, total)
+
+        with self._backup_lock:
+            # Read the version first: a commit racing the copy is picked up next time
+            version = self._data_version()
+            disk = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                self._backup_source.backup(disk, pages=pages, progress=on_step, sleep=sleep)
+            finally:
+                disk.close()
+            self._saved_version = version
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        with self._backup_lock:
+            if self._backup_source is not None:
+                self._backup_source.close()
+                self._backup_source = None
+        self._writer.close()
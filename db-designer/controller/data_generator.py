@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import random
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from model.relationship import Relationship
+from model.schema import Schema
+from model.table import Table
+
+from .sql_engine import (
+    BULK_LOAD_PRAGMAS,
+    _quote_identifier,
+    column_affinity,
+    dependency_order,
+    executemany,
+    junction_table_name,
+    normalize_statement,
+    pragma_profile,
+)
+
+# NumPy is optional; without it values come from the random module
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_WORDS = (
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa",
+)
+_DATE_BASE = date(2020, 1, 1).toordinal()
+_DATETIME_BASE = datetime(2020, 1, 1)
+
+
+@dataclass
+class ColumnSpec:
+    """
+    How to fill one column.
+
+    ``kind`` is derived from the declared type: "integer", "real", "text",
+    "blob", "bool", "date", "datetime" or "numeric". FK columns name the
+    reference ``group`` (one parent row per group and generated row) and
+    the position of the matching key column in that parent.
+    """
+    name: str
+    kind: str
+    unique: bool = False
+    nullable: bool = True
+    group: Optional[int] = None
+    key_index: int = 0
+
+
+@dataclass
+class TablePlan:
+    name: str
+    columns: List[ColumnSpec]
+    # Per reference group: the parent table and its key columns
+    parents: List[Tuple[str, List[str]]] = field(default_factory=list)
+
+
+@dataclass
+class GenerationReport:
+    """Outcome of generate_data."""
+    rows: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+    cancelled: bool = False
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+
+def _column_kind(declared_type: str) -> str:
+    declared = declared_type.upper()
+    if "BOOL" in declared:
+        return "bool"
+    if "DATETIME" in declared or "TIMESTAMP" in declared:
+        return "datetime"
+    if "DATE" in declared:
+        return "date"
+    return column_affinity(declared_type).lower()
+
+
+class _Random:
+    """The few vectorized draws the generator needs, over NumPy or random."""
+
+    def __init__(self, seed: int) -> None:
+        self._np = np.random.default_rng(seed) if np is not None else None
+        self._py = random.Random(seed)
+
+    def ints(self, low: int, high: int, n: int) -> List[int]:
+        """n integers in [low, high)."""
+        if self._np is not None:
+            return self._np.integers(low, high, n).tolist()
+        randrange = self._py.randrange
+        return [randrange(low, high) for _ in range(n)]
+
+    def floats(self, scale: float, n: int) -> List[float]:
+        """n floats in [0, scale), rounded to cents."""
+        if self._np is not None:
+            return np.round(self._np.random(n) * scale, 2).tolist()
+        rand = self._py.random
+        return [round(rand() * scale, 2) for _ in range(n)]
+
+    def mask(self, fraction: float, n: int) -> List[bool]:
+        """n flags, each True with the given probability."""
+        if self._np is not None:
+            return (self._np.random(n) < fraction).tolist()
+        rand = self._py.random
+        return [rand() < fraction for _ in range(n)]
+
+    def dates(self, days: int, n: int) -> List[str]:
+        """n ISO dates within ``days`` days of 2020-01-01."""
+        if self._np is not None:
+            offsets = self._np.integers(0, days, n)
+            return np.datetime_as_string(np.datetime64("2020-01-01") + offsets).tolist()
+        return [date.fromordinal(_DATE_BASE + d).isoformat() for d in self.ints(0, days, n)]
+
+    def datetimes(self, seconds: int, n: int) -> List[str]:
+        """n "YYYY-MM-DD HH:MM:SS" timestamps within ``seconds`` of 2020-01-01."""
+        if self._np is not None:
+            offsets = self._np.integers(0, seconds, n).astype("timedelta64[s]")
+            text = np.datetime_as_string(np.datetime64("2020-01-01T00:00:00") + offsets)
+            return np.char.replace(text, "T", " ").tolist()
+        return [(_DATETIME_BASE + timedelta(seconds=s)).isoformat(" ") for s in self.ints(0, seconds, n)]
+
+    def blobs(self, size: int, n: int) -> List[bytes]:
+        if self._np is not None:
+            data = self._np.bytes(size * n)
+        else:
+            data = self._py.randbytes(size * n)
+        return [data[i:i + size] for i in range(0, size * n, size)]
+
+
+def _unique_values(spec: ColumnSpec, start: int, n: int) -> list:
+    """Values that are distinct across rows, derived from the row number."""
+    indexes = range(start, start + n)
+    if spec.kind in ("integer", "bool"):
+        return list(indexes)
+    if spec.kind in ("real", "numeric"):
+        return [float(i) for i in indexes]
+    if spec.kind == "date":
+        return [date.fromordinal(_DATE_BASE + i).isoformat() for i in indexes]
+    if spec.kind == "datetime":
+        return [(_DATETIME_BASE + timedelta(seconds=i)).isoformat(" ") for i in indexes]
+    if spec.kind == "blob":
+        return [i.to_bytes(8, "big") for i in indexes]
+    return [f"{spec.name}_{i}" for i in indexes]
+
+
+def _random_values(spec: ColumnSpec, rng: _Random, n: int) -> list:
+    if spec.kind == "integer":
+        return rng.ints(0, 1_000_000, n)
+    if spec.kind == "bool":
+        return rng.ints(0, 2, n)
+    if spec.kind in ("real", "numeric"):
+        return rng.floats(10_000.0, n)
+    if spec.kind == "date":
+        return rng.dates(3650, n)
+    if spec.kind == "datetime":
+        return rng.datetimes(3650 * 86400, n)
+    if spec.kind == "blob":
+        return rng.blobs(16, n)
+    words = rng.ints(0, len(_WORDS), n)
+    numbers = rng.ints(0, 10_000, n)
+    return [f"{_WORDS[w]} {k}" for w, k in zip(words, numbers)]
+
+
+def _generate_columns(
+    columns: List[ColumnSpec],
+    start: int,
+    n: int,
+    seed: int,
+    parent_counts: List[int],
+    null_fraction: float,
+) -> List[list]:
+    """
+    One batch of values for a table, column by column.
+
+    FK columns hold row numbers into the parent's keys (see _resolve_rows),
+    so only ``parent_counts`` has to reach a worker process.
+    """
+    rng = _Random(seed)
+    picks: Dict[int, Optional[List[int]]] = {}
+    for group, count in enumerate(parent_counts):
+        if not count:
+            picks[group] = None
+        elif any(c.group == group and c.unique for c in columns):
+            # A unique FK can use each parent row once
+            picks[group] = [(start + k) % count for k in range(n)]
+        else:
+            picks[group] = rng.ints(0, count, n)
+
+    values: List[list] = []
+    for spec in columns:
+        if spec.group is not None:
+            column: list = picks[spec.group] or [None] * n
+        elif spec.unique:
+            column = _unique_values(spec, start, n)
+        else:
+            column = _random_values(spec, rng, n)
+        if spec.nullable and not spec.unique and null_fraction > 0:
+            column = [None if blank else v for v, blank in zip(column, rng.mask(null_fraction, n))]
+        values.append(column)
+    return values
+
+
+def _resolve_rows(
+    columns: List[ColumnSpec], values: List[list], parent_keys: List[List[list]]
+) -> List[tuple]:
+    """Swap parent row numbers for key values and turn columns into rows."""
+    for index, spec in enumerate(columns):
+        if spec.group is not None and parent_keys[spec.group]:
+            keys = parent_keys[spec.group][spec.key_index]
+            values[index] = [None if r is None else keys[r] for r in values[index]]
+    return list(zip(*values))
+
+
+def _table_plan(conn: sqlite3.Connection, schema: Schema, table: Table) -> Optional[TablePlan]:
+    """Column specs of a modeled table as created in the database, FKs included."""
+    live = conn.execute(f"PRAGMA table_info({_quote_identifier(table.name)})").fetchall()
+    if not live:
+        return None
+    plan = TablePlan(table.name, [])
+    references: Dict[str, Tuple[int, int]] = {}
+    for rel in schema.incoming(table.name, "1-N"):
+        pks = rel.table_a.get_primary_keys()
+        if not pks:
+            continue
+        group = len(plan.parents)
+        plan.parents.append((rel.table_a.name, [pk.name for pk in pks]))
+        for index, pk in enumerate(pks):
+            references.setdefault(pk.name, (group, index))
+
+    single_pk = len(table.get_primary_keys()) == 1
+    for _, name, declared_type, notnull, _, pk in live:
+        attr = table.find_attribute(name)
+        spec = ColumnSpec(name, _column_kind(declared_type or ""))
+        if attr is not None:
+            # A composite key is unique as a whole, each column on its own here
+            spec.unique = attr.is_unique or attr.is_primary_key
+            spec.nullable = attr.is_nullable and not attr.is_primary_key
+        else:
+            spec.nullable = not notnull
+        if name in references:
+            spec.group, spec.key_index = references[name]
+            spec.unique = spec.unique and single_pk or (attr is not None and attr.is_unique)
+        plan.columns.append(spec)
+    return plan
+
+
+def _junction_plan(conn: sqlite3.Connection, rel: Relationship) -> Optional[TablePlan]:
+    name = junction_table_name(rel)
+    if not conn.execute(f"PRAGMA table_info({_quote_identifier(name)})").fetchall():
+        return None
+    plan = TablePlan(name, [])
+    for table in (rel.table_a, rel.table_b):
+        pks = table.get_primary_keys()
+        group = len(plan.parents)
+        plan.parents.append((table.name, [pk.name for pk in pks]))
+        for index, pk in enumerate(pks):
+            plan.columns.append(ColumnSpec(
+                f"{table.name.lower()}_{pk.name}", _column_kind(pk.data_type),
+                nullable=False, group=group, key_index=index,
+            ))
+    return plan
+
+
+def _load_keys(conn: sqlite3.Connection, table_name: str, key_columns: List[str]) -> List[list]:
+    cols = ", ".join(_quote_identifier(c) for c in key_columns)
+    rows = conn.execute(f"SELECT {cols} FROM {_quote_identifier(table_name)}").fetchall()
+    return [list(column) for column in zip(*rows)] if rows else []
+
+
+def _bounded_map(
+    executor: Executor, fn: Callable[..., List[list]], arg_tuples: Iterable[tuple], limit: int
+) -> Iterator[List[list]]:
+    """
+    Like ``executor.map(fn, *zip(*arg_tuples))``, in order, but with at most
+    ``limit`` batches submitted and not yet consumed, so results never pile
+    up faster than the caller inserts them.
+    """
+    pending: Deque[Future] = deque()
+    for args in arg_tuples:
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, *args))
+    while pending:
+        yield pending.popleft().result()
+
+
+def generate_data(
+    conn: sqlite3.Connection,
+    schema: Schema,
+    rows_per_table: Union[int, Dict[str, int]],
+    batch_size: int = 50_000,
+    null_fraction: float = 0.1,
+    seed: Optional[int] = None,
+    processes: int = 0,
+    progress: Optional[Callable[[int], bool]] = None,
+) -> GenerationReport:
+    """
+    Fill the schema's tables in the database with synthetic rows.
+
+    Tables are filled parent-first along dependency_order, then the N-N
+    junction tables. Values follow each column's declared type; primary
+    key and unique columns get values derived from the row number,
+    nullable ones are NULL for ``null_fraction`` of rows, and FK columns
+    reference random existing parent rows (all key columns of a composite
+    key from the same row). Rows that would still collide with existing
+    ones are skipped (INSERT OR IGNORE), so the report counts rows
+    actually inserted.
+
+    Batches are drawn with NumPy when it is installed and inserted with
+    executemany under BULK_LOAD_PRAGMAS. With ``processes`` > 1, batches
+    of the tables in one dependency level are generated in worker
+    processes while the main process inserts, with at most two batches
+    per process in flight.
+    """
+    start_time = time.perf_counter()
+    report = GenerationReport()
+    base_seed = seed if seed is not None else random.randrange(1 << 30)
+    order = dependency_order(schema)
+
+    levels: List[List[TablePlan]] = []
+    for level in order.levels:
+        plans = [_table_plan(conn, schema, table) for table in level]
+        levels.append([p for p in plans if p is not None])
+    junctions = [_junction_plan(conn, rel) for rel in schema.relationships if rel.rel_type == "N-N"]
+    levels.append([p for p in junctions if p is not None])
+
+    def wanted(plan: TablePlan) -> int:
+        if isinstance(rows_per_table, int):
+            return rows_per_table
+        return rows_per_table.get(plan.name, 0)
+
+    executor: Optional[Executor] = ProcessPoolExecutor(processes) if processes > 1 else None
+    chunk_seed = base_seed
+    try:
+        with pragma_profile(conn, BULK_LOAD_PRAGMAS):
+            for level in levels:
+                # Every parent of this level was filled by an earlier one
+                tasks: List[Tuple[TablePlan, str, List[List[list]], tuple]] = []
+                for plan in level:
+                    parent_keys = [_load_keys(conn, parent, keys) for parent, keys in plan.parents]
+                    parent_counts = [len(keys[0]) if keys else 0 for keys in parent_keys]
+                    offset = conn.execute(
+                        f"SELECT COALESCE(MAX(rowid), 0) FROM {_quote_identifier(plan.name)}"
+                    ).fetchone()[0] + 1
+                    cols = ", ".join(_quote_identifier(c.name) for c in plan.columns)
+                    insert = normalize_statement(
+                        f"INSERT OR IGNORE INTO {_quote_identifier(plan.name)} ({cols}) "
+                        f"VALUES ({', '.join('?' * len(plan.columns))})"
+                    )
+                    report.rows.setdefault(plan.name, 0)
+                    total = wanted(plan)
+                    for done in range(0, total, batch_size):
+                        n = min(batch_size, total - done)
+                        chunk_seed += 1
+                        args = (plan.columns, offset + done, n, chunk_seed, parent_counts, null_fraction)
+                        tasks.append((plan, insert, parent_keys, args))
+
+                if executor is not None:
+                    batches: Iterator[List[list]] = _bounded_map(
+                        executor, _generate_columns, (args for *_, args in tasks), 2 * processes
+                    )
+                else:
+                    batches = (_generate_columns(*args) for *_, args in tasks)
+
+                for (plan, insert, parent_keys, _), values in zip(tasks, batches):
+                    rows = _resolve_rows(plan.columns, values, parent_keys)
+                    before = conn.total_changes
+                    with conn:
+                        executemany(conn, insert, rows)
+                    report.rows[plan.name] += conn.total_changes - before
+                    if progress is not None and progress(report.total_rows) is False:
+                        report.cancelled = True
+                        return report
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        report.seconds = time.perf_counter() - start_time
+    return report
@@ -10,6 +10,8 @@ from PySide6.QtWidgets import (
     QCheckBox,
     QLabel,
     QFrame,
+    QPushButton,
+    QFileDialog,
 )
 
 
@@ -425,4 +427,133 @@ class RelationshipDialog(QDialog):
             "table_a": self._table_a_combo.currentText(),
             "table_b": self._table_b_combo.currentText(),
             "rel_type": rel_type,
-        }
\ No newline at end of file
+        }
+
+
+class ImportDataDialog(QDialog):
+    """Dialog to pick a CSV/JSONL file and the table to load it into."""
+
+    def __init__(self, table_names: list[str], parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Import Data")
+        self.setModal(True)
+        self.resize(520, 260)
+        
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #0a1629;
+            }
+            QLabel {
+                color: #e2e8f0;
+                font-size: 13px;
+            }
+            QLineEdit, QComboBox {
+                padding: 12px;
+                border: 2px solid #1e3a5f;
+                border-radius: 8px;
+                font-size: 13px;
+                background-color: #0d1b2a;
+                min-height: 20px;
+                color: #e2e8f0;
+            }
+            QLineEdit:focus, QComboBox:focus {
+                border: 2px solid #2563eb;
+                background-color: #1a2332;
+                color: #ffffff;
+            }
+            QComboBox::drop-down {
+                border: none;
+                padding-right: 10px;
+            }
+            QComboBox QAbstractItemView {
+                background-color: #1a2332;
+                border: 1px solid #1e3a5f;
+                color: #e2e8f0;
+                selection-background-color: #2563eb;
+                selection-color: white;
+            }
+            QPushButton {
+                padding: 12px 28px;
+                border-radius: 8px;
+                font-size: 13px;
+                font-weight: 600;
+                min-width: 80px;
+            }
+        """)
+
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(25, 25, 25, 25)
+        main_layout.setSpacing(20)
+        
+        # Description
+        desc = QLabel("Load rows from a CSV file (with a header row) or a JSON Lines file.\n"
+                      "Columns are matched to the table's columns by name.")
+        desc.setStyleSheet("color: #94a3b8; font-size: 13px; margin-bottom: 5px;")
+        main_layout.addWidget(desc)
+
+        # Form
+        form = QFormLayout()
+        form.setSpacing(15)
+        form.setLabelAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
+        self._table_combo = QComboBox(self)
+        self._table_combo.addItems(table_names)
+        form.addRow("Target Table:", self._table_combo)
+
+        file_row = QHBoxLayout()
+        self._path_edit = QLineEdit(self)
+        self._path_edit.setPlaceholderText("data.csv or data.jsonl")
+        file_row.addWidget(self._path_edit, 1)
+        browse_btn = QPushButton("Browse...", self)
+        browse_btn.setStyleSheet("background-color: #334155; color: #e2e8f0; border: 1px solid #475569;")
+        browse_btn.clicked.connect(self._on_browse)
+        file_row.addWidget(browse_btn)
+        form.addRow("File:", file_row)
+
+        main_layout.addLayout(form)
+        main_layout.addStretch()
+
+        # Buttons
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.Ok | QDialogButtonBox.Cancel, Qt.Horizontal, self
+        )
+        buttons.button(QDialogButtonBox.Ok).setText("Import")
+        buttons.button(QDialogButtonBox.Ok).setStyleSheet("""
+            QPushButton {
+                background-color: #2563eb;
+                color: white;
+                border: 1px solid #3b82f6;
+            }
+            QPushButton:hover {
+                background-color: #3b82f6;
+                border: 1px solid #60a5fa;
+            }
+        """)
+        buttons.button(QDialogButtonBox.Cancel).setStyleSheet("""
+            QPushButton {
+                background-color: #334155;
+                color: #e2e8f0;
+                border: 1px solid #475569;
+            }
+            QPushButton:hover {
+                background-color: #475569;
+                border: 1px solid #64748b;
+                color: #ffffff;
+            }
+        """)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        main_layout.addWidget(buttons)
+
+    def _on_browse(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Data", "", "Data Files (*.csv *.jsonl *.ndjson);;All Files (*)"
+        )
+        if path:
+            self._path_edit.setText(path)
+
+    def get_values(self) -> dict:
+        return {
+            "table_name": self._table_combo.currentText(),
+            "path": self._path_edit.text().strip(),
+        }
@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import itertools
+import os
+import re
+import sqlite3
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .sql_engine import _quote_identifier
+
+
+_REBUILD_PREFIX = "_designer_new_"
+# Builds of a shadow database retried because the live one changed meanwhile
+SHADOW_ATTEMPTS = 3
+_shadow_names = itertools.count(1)
+
+
+@dataclass
+class MigrationStep:
+    """
+    One table's share of a migration.
+
+    ``kind`` is "create", "drop", "alter" or "rebuild". ``fallbacks`` are
+    alternative statement lists tried in order if ``statements`` fail, e.g.
+    when existing rows do not fit a new NOT NULL column. ``empty_fallbacks``
+    come last and are only tried while the table holds no rows, as they
+    discard its contents. ``followups`` are best-effort statements such as
+    re-creating indexes; their failures are ignored.
+    """
+    kind: str
+    table: str
+    statements: List[str]
+    fallbacks: List[List[str]] = field(default_factory=list)
+    empty_fallbacks: List[List[str]] = field(default_factory=list)
+    followups: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ShadowReport:
+    """Outcome of rebuild_via_shadow."""
+    tables: int = 0
+    # Tables whose rows were carried over, and those whose rows did not fit
+    copied: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    attempts: int = 0
+
+
+_PUNCTUATION = re.compile(r"""("[^"]*"|'[^']*'|`[^`]*`|\[[^\]]*\])|\s*([(),])\s*""")
+
+
+def _normalize_ddl(sql: str) -> str:
+    """Compare CREATE TABLE text the way sqlite_master stores it."""
+    sql = " ".join(sql.split()).rstrip(";").rstrip()
+    # ADD COLUMN appends ', "col" TYPE' after the last line, so spacing around
+    # punctuation differs; quoted names and literals are kept verbatim
+    sql = _PUNCTUATION.sub(lambda m: m.group(1) or m.group(2), sql)
+    return re.sub(r"^CREATE TABLE IF NOT EXISTS ", "CREATE TABLE ", sql, flags=re.IGNORECASE)
+
+
+def _live_tables(conn: sqlite3.Connection) -> Dict[str, str]:
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+    ).fetchall()
+    return {name: sql or "" for name, sql in rows}
+
+
+def _columns(conn: sqlite3.Connection, table_name: str) -> List[Tuple[str, str, int]]:
+    """(name, declared type, notnull) per column, in table order."""
+    rows = conn.execute(f"PRAGMA table_info({_quote_identifier(table_name)})").fetchall()
+    return [(row[1], row[2], row[3]) for row in rows]
+
+
+def plan_migration(
+    conn: sqlite3.Connection, desired: Iterable[Tuple[str, str]]
+) -> List[MigrationStep]:
+    """
+    Diff the live database against the wanted ``(table name, CREATE TABLE)``
+    pairs and return the steps that turn one into the other.
+
+    Tables whose stored definition already matches are skipped. For the
+    others, ALTER TABLE ADD/DROP COLUMN is tried on an empty copy in a
+    scratch in-memory database; it is used only if it reproduces the
+    wanted definition exactly, otherwise the table is rebuilt by copying
+    its rows into a new table. Only changed tables are inspected.
+    """
+    live = _live_tables(conn)
+    wanted: Dict[str, str] = dict(desired)
+    steps: List[MigrationStep] = []
+    scratch: Optional[sqlite3.Connection] = None
+
+    for name in live:
+        if name not in wanted:
+            steps.append(MigrationStep("drop", name, [f"DROP TABLE IF EXISTS {_quote_identifier(name)}"]))
+
+    for name, create_sql in wanted.items():
+        live_sql = live.get(name)
+        if live_sql is None:
+            steps.append(MigrationStep("create", name, [create_sql]))
+            continue
+        if _normalize_ddl(live_sql) == _normalize_ddl(create_sql):
+            continue
+        if scratch is None:
+            scratch = sqlite3.connect(":memory:")
+        alter = _plan_alter(scratch, name, live_sql, create_sql)
+        try:
+            rebuild = _plan_rebuild(conn, scratch, name, create_sql)
+        except sqlite3.Error:
+            # The wanted definition is not valid SQL (e.g. a table without
+            # columns); keep the live table until it is.
+            scratch.execute(f"DROP TABLE IF EXISTS {_quote_identifier(name)}")
+            continue
+        if alter is not None:
+            # ALTER can still fail on live rows (e.g. NOT NULL on a non-empty table)
+            rebuild.kind = "alter"
+            rebuild.fallbacks.insert(0, rebuild.statements)
+            rebuild.statements = alter
+        steps.append(rebuild)
+
+    if scratch is not None:
+        scratch.close()
+    return steps
+
+
+def _plan_alter(
+    scratch: sqlite3.Connection, name: str, live_sql: str, create_sql: str
+) -> Optional[List[str]]:
+    """ALTER statements turning live_sql into create_sql, or None if there are none."""
+    quoted = _quote_identifier(name)
+    try:
+        scratch.execute(create_sql)
+        wanted_cols = _columns(scratch, name)
+        scratch.execute(f"DROP TABLE {quoted}")
+
+        scratch.execute(live_sql)
+        live_cols = _columns(scratch, name)
+        wanted_names = {c[0] for c in wanted_cols}
+        live_names = {c[0] for c in live_cols}
+        kept = [c for c in live_cols if c[0] in wanted_names]
+        added = [c for c in wanted_cols if c[0] not in live_names]
+        # ALTER can only append columns, so the kept ones must come first unchanged
+        if kept + added != wanted_cols:
+            return None
+
+        statements: List[str] = []
+        for col_name, _, _ in live_cols:
+            if col_name not in wanted_names:
+                statements.append(f"ALTER TABLE {quoted} DROP COLUMN {_quote_identifier(col_name)}")
+        for col_name, col_type, notnull in added:
+            col_def = f"{_quote_identifier(col_name)} {col_type}".rstrip()
+            if notnull:
+                col_def += " NOT NULL"
+            statements.append(f"ALTER TABLE {quoted} ADD COLUMN {col_def}")
+
+        for statement in statements:
+            scratch.execute(statement)
+        result_sql = scratch.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (name,)
+        ).fetchone()[0]
+        if _normalize_ddl(result_sql) != _normalize_ddl(create_sql):
+            return None
+        return statements
+    except sqlite3.Error:
+        return None
+    finally:
+        scratch.execute(f"DROP TABLE IF EXISTS {quoted}")
+
+
+def _plan_rebuild(
+    conn: sqlite3.Connection, scratch: sqlite3.Connection, name: str, create_sql: str
+) -> MigrationStep:
+    """SQLite's copy-table procedure: create new, copy rows, drop old, rename."""
+    quoted = _quote_identifier(name)
+    temp_name = _REBUILD_PREFIX + name
+    quoted_temp = _quote_identifier(temp_name)
+
+    scratch.execute(create_sql)
+    wanted_names = [c[0] for c in _columns(scratch, name)]
+    scratch.execute(f"DROP TABLE {quoted}")
+    live_names = {c[0] for c in _columns(conn, name)}
+    shared = ", ".join(_quote_identifier(c) for c in wanted_names if c in live_names)
+
+    # Indexes and triggers are dropped along with the old table
+    extras = [
+        sql
+        for (sql,) in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type IN ('index', 'trigger') "
+            "AND tbl_name=? AND sql IS NOT NULL",
+            (name,),
+        )
+    ]
+
+    temp_sql = re.sub(
+        r"^\s*CREATE TABLE( IF NOT EXISTS)? " + re.escape(quoted),
+        f"CREATE TABLE {quoted_temp}",
+        create_sql,
+        count=1,
+        flags=re.IGNORECASE,
+    )
+    statements = [f"DROP TABLE IF EXISTS {quoted_temp}", temp_sql]
+    if shared:
+        statements.append(f"INSERT INTO {quoted_temp} ({shared}) SELECT {shared} FROM {quoted}")
+    statements += [
+        f"DROP TABLE {quoted}",
+        f"ALTER TABLE {quoted_temp} RENAME TO {quoted}",
+    ]
+    return MigrationStep(
+        "rebuild",
+        name,
+        statements,
+        empty_fallbacks=[[f"DROP TABLE IF EXISTS {quoted}", create_sql]],
+        followups=extras,
+    )
+
+
+def apply_migration(conn: sqlite3.Connection, steps: List[MigrationStep]) -> List[MigrationStep]:
+    """
+    Run the steps in a single transaction with foreign key enforcement off,
+    as the copy-table procedure requires.
+
+    Each step runs in its own savepoint: if it fails, its fallbacks are
+    tried in turn (the empty_fallbacks only if the table has no rows), and
+    if they all fail the step is undone and skipped without affecting the
+    others, so no rows are ever dropped. Returns the skipped steps.
+    """
+    failed: List[MigrationStep] = []
+    if not steps:
+        return failed
+    if conn.in_transaction:
+        conn.commit()
+    fk_enabled = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys=OFF")
+    try:
+        conn.execute("BEGIN")
+        try:
+            for step in steps:
+                done = _run_in_savepoint(conn, step.statements)
+                for fallback in step.fallbacks:
+                    if done:
+                        break
+                    done = _run_in_savepoint(conn, fallback)
+                if not done and step.empty_fallbacks and _is_empty(conn, step.table):
+                    for fallback in step.empty_fallbacks:
+                        done = _run_in_savepoint(conn, fallback)
+                        if done:
+                            break
+                if not done:
+                    failed.append(step)
+                    continue
+                for statement in step.followups:
+                    _run_in_savepoint(conn, [statement])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        if fk_enabled:
+            conn.execute("PRAGMA foreign_keys=ON")
+    return failed
+
+
+def _is_empty(conn: sqlite3.Connection, table_name: str) -> bool:
+    return conn.execute(f"SELECT 1 FROM {_quote_identifier(table_name)} LIMIT 1").fetchone() is None
+
+
+def _run_in_savepoint(conn: sqlite3.Connection, statements: List[str]) -> bool:
+    conn.execute("SAVEPOINT migration_step")
+    try:
+        for statement in statements:
+            conn.execute(statement)
+    except sqlite3.Error:
+        conn.execute("ROLLBACK TO migration_step")
+        conn.execute("RELEASE migration_step")
+        return False
+    conn.execute("RELEASE migration_step")
+    return True
+
+
+def _build_shadow(
+    conn: sqlite3.Connection,
+    shadow: sqlite3.Connection,
+    location: str,
+    desired: List[Tuple[str, str]],
+    copy_data: bool,
+) -> ShadowReport:
+    """Create the wanted tables in the shadow database and copy shared columns into them."""
+    report = ShadowReport(tables=len(desired))
+    with shadow:
+        for _, create_sql in desired:
+            shadow.execute(create_sql)
+    if not copy_data:
+        return report
+
+    live = _live_tables(conn)
+    fk_enabled = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys=OFF")
+    conn.execute("ATTACH DATABASE ? AS shadow", (location,))
+    try:
+        # Only the shadow database is written; the live one is just read
+        conn.execute("BEGIN")
+        for name, _ in desired:
+            if name not in live:
+                continue
+            quoted = _quote_identifier(name)
+            live_names = {c[0] for c in _columns(conn, name)}
+            wanted_names = [
+                row[1] for row in conn.execute(f"PRAGMA shadow.table_info({quoted})").fetchall()
+            ]
+            shared = ", ".join(_quote_identifier(c) for c in wanted_names if c in live_names)
+            if not shared:
+                continue
+            copy = f"INSERT INTO shadow.{quoted} ({shared}) SELECT {shared} FROM main.{quoted}"
+            if _run_in_savepoint(conn, [copy]):
+                report.copied.append(name)
+            else:
+                report.skipped.append(name)
+        conn.commit()
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute("DETACH DATABASE shadow")
+        if fk_enabled:
+            conn.execute("PRAGMA foreign_keys=ON")
+    return report
+
+
+def rebuild_via_shadow(
+    conn: sqlite3.Connection,
+    desired: Iterable[Tuple[str, str]],
+    copy_data: bool = True,
+    in_memory: bool = False,
+) -> ShadowReport:
+    """
+    Replace the database behind ``conn`` with one built from scratch.
+
+    The wanted tables are created in a temporary file (a memdb database
+    with ``in_memory``, which ``conn`` must then use too, as ATTACH goes
+    through the main database's VFS) while the live database stays
+    untouched; with ``copy_data`` the columns a table keeps are copied
+    over from the live one (tables whose rows violate the new constraints
+    start empty). The result is then swapped in with the backup API, which
+    writes it in a single transaction: readers see the old schema or the
+    new one, never a half-dropped database, and only wait for the page
+    copy, not for the build. If another connection commits during the
+    build, it is built again (up to SHADOW_ATTEMPTS).
+    """
+    desired = list(desired)
+    if conn.in_transaction:
+        conn.commit()
+    for attempt in range(1, SHADOW_ATTEMPTS + 1):
+        if in_memory:
+            location = f"file:/db_designer_shadow-{next(_shadow_names)}?vfs=memdb"
+        else:
+            fd, location = tempfile.mkstemp(prefix="db_designer_shadow_", suffix=".db")
+            os.close(fd)
+        # A memdb database lives as long as this connection
+        shadow = sqlite3.connect(location, uri=in_memory)
+        try:
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            report = _build_shadow(conn, shadow, location, desired, copy_data)
+            report.attempts = attempt
+            if conn.execute("PRAGMA data_version").fetchone()[0] == version:
+                shadow.backup(conn)
+                return report
+        finally:
+            shadow.close()
+            if not in_memory:
+                for leftover in (location, location + "-journal"):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+    raise sqlite3.OperationalError("the database kept changing during the rebuild")
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from . import sql_engine
+from .worker_threads import WorkerThreads
+
+
+# SQLite VM instructions between two progress handler calls, which is
+# also the resolution of the VM step counts in StatementStats. Small
+# enough that short queries register; one Python call per 1,000
+# instructions costs little next to the instructions themselves.
+PROGRESS_STEPS = 1_000
+# Minimum seconds between two progress signals
+PROGRESS_INTERVAL = 0.1
+# Rows fetched on the worker before handing a result cursor to the GUI
+FIRST_BATCH = 500
+# Result sets up to this many rows are read whole so they can be cached
+CACHE_MAX_ROWS = 10_000
+
+
+@dataclass
+class StatementStats:
+    """
+    Instrumentation for one statement of a console script.
+
+    ``elapsed`` covers preparing and running the statement up to its first
+    row; reading further rows is ``fetch_seconds``, which keeps growing as
+    a lazy result set is scrolled. ``steps`` counts SQLite VM instructions
+    in PROGRESS_STEPS resolution, so 0 means fewer than PROGRESS_STEPS.
+    ``rowcount`` is for DML.
+    """
+    statement: str
+    elapsed: float
+    steps: int = 0
+    returns_rows: bool = False
+    rowcount: int = -1
+    rows_returned: int = 0
+    fetch_seconds: float = 0.0
+    cached: bool = False
+
+
+class StepCounter:
+    """Progress handler that counts VM steps, PROGRESS_STEPS at a time."""
+
+    def __init__(self) -> None:
+        self.steps = 0
+
+    def __call__(self) -> int:
+        self.steps += PROGRESS_STEPS
+        return 0
+
+
+@dataclass
+class ResultSet:
+    """One statement's rows, still on its open cursor unless read whole."""
+    statement: str
+    columns: List[str]
+    cursor: Optional[sqlite3.Cursor]
+    stats: StatementStats
+    # Fetched on the worker; None if nothing was read yet
+    first_rows: Optional[List[tuple]] = None
+
+
+@dataclass
+class QueryResult:
+    """
+    Outcome of a background query.
+
+    ``result_sets`` holds one entry per statement that returned rows, in
+    script order; their cursors and ``connection`` stay open for the rest
+    and are owned by the receiver. Without result sets, ``messages`` holds
+    one-column status rows ("Success: ...", "SQL Error: ..."). ``stats`` has an entry per
+    executed statement; ``steps`` keeps counting on the open connection.
+    """
+    result_sets: List[ResultSet] = field(default_factory=list)
+    messages: List[tuple] = field(default_factory=list)
+    connection: Optional[sqlite3.Connection] = None
+    stats: List[StatementStats] = field(default_factory=list)
+    steps: Optional[StepCounter] = None
+
+    def close(self) -> None:
+        for result_set in self.result_sets:
+            if result_set.cursor is not None:
+                result_set.cursor.close()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class QueryWorker(QObject):
+    """
+    Runs console SQL on its own SQLite connection, off the GUI thread.
+
+    ``cancel()`` may be called from any thread: it interrupts the running
+    statement through ``Connection.interrupt()``. A timeout is enforced by
+    the progress handler, which also reports elapsed time.
+    """
+
+    progress = Signal(float)
+    finished = Signal(object)  # QueryResult
+
+    def __init__(
+        self, connect: Callable[[], sqlite3.Connection], sql: str, timeout: float = 0,
+        cache: Optional[sql_engine.ResultCache] = None,
+    ) -> None:
+        super().__init__()
+        self._connect = connect
+        self._sql = sql
+        self._timeout = timeout
+        self._cache = cache
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._cancelled = False
+        self._timed_out = False
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancelled = True
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def run(self) -> None:
+        start = time.monotonic()
+        deadline = start + self._timeout if self._timeout > 0 else None
+        last_report = start
+        counter = StepCounter()
+
+        def on_progress() -> int:
+            nonlocal last_report
+            counter.steps += PROGRESS_STEPS
+            now = time.monotonic()
+            if deadline is not None and now > deadline:
+                self._timed_out = True
+                return 1  # non-zero aborts the statement
+            if now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                self.progress.emit(now - start)
+            return 0
+
+        try:
+            # The result cursor is read from the GUI thread once we are done,
+            # so connect() must allow that (check_same_thread=False)
+            conn = self._connect()
+        except sqlite3.Error as e:
+            self.finished.emit(QueryResult(messages=[(f"SQL Error: {str(e)}",)]))
+            return
+        with self._lock:
+            if self._cancelled:
+                conn.close()
+                self.finished.emit(QueryResult(messages=[("Query cancelled",)]))
+                return
+            self._conn = conn
+
+        result = QueryResult(connection=conn, steps=counter)
+        try:
+            conn.set_progress_handler(on_progress, PROGRESS_STEPS)
+            total_affected = 0
+            steps_before = counter.steps
+            for statement in sql_engine.iter_sql_results(conn, self._sql, self._cache):
+                stats = StatementStats(
+                    statement.statement,
+                    statement.elapsed,
+                    counter.steps - steps_before,
+                    returns_rows=statement.columns is not None,
+                    rowcount=statement.rowcount,
+                    cached=statement.cached,
+                )
+                result.stats.append(stats)
+                steps_before = counter.steps
+                if statement.columns is None:
+                    total_affected += statement.rowcount
+                    continue
+                result_set = ResultSet(statement.statement, statement.columns, statement.rows, stats)
+                if statement.cached:
+                    result_set.cursor = None
+                    result_set.first_rows = list(statement.rows)
+                elif statement.cache_version is not None:
+                    self._read_for_cache(result_set, statement.cache_version)
+                stats.steps += counter.steps - steps_before
+                steps_before = counter.steps
+                result.result_sets.append(result_set)
+            conn.commit()
+            if not result.result_sets:
+                if result.stats:
+                    result.messages = [(f"Success: {total_affected} rows affected",)]
+                else:
+                    result.messages = [("No valid SQL statements",)]
+            elif result.result_sets[-1].first_rows is None:
+                # Only the set shown first is read here; the others wait until viewed
+                last = result.result_sets[-1]
+                fetch_start = time.perf_counter()
+                last.first_rows = last.cursor.fetchmany(FIRST_BATCH)
+                last.stats.fetch_seconds = time.perf_counter() - fetch_start
+                last.stats.steps += counter.steps - steps_before
+                last.stats.rows_returned = len(last.first_rows)
+        except Exception as e:
+            for result_set in result.result_sets:
+                if result_set.cursor is not None:
+                    result_set.cursor.close()
+            if conn.in_transaction:
+                conn.rollback()
+            prefix = "SQL Error" if isinstance(e, sqlite3.Error) else "Error"
+            result = QueryResult(messages=[(f"{prefix}: {str(e)}",)])
+        finally:
+            with self._lock:
+                self._conn = None
+            # Keep counting VM steps while the GUI reads the open cursors,
+            # without the timeout
+            conn.set_progress_handler(counter, PROGRESS_STEPS)
+            if not result.result_sets:
+                conn.close()
+                result.connection = None
+
+        if self._timed_out or self._cancelled:
+            result.close()
+            if self._timed_out:
+                result = QueryResult(messages=[(f"Query timed out after {self._timeout:g}s",)])
+            else:
+                result = QueryResult(messages=[("Query cancelled",)])
+        self.finished.emit(result)
+
+    def _read_for_cache(self, result_set: ResultSet, version: int) -> None:
+        """Read a small result set whole and cache it; larger ones stay lazy."""
+        start = time.perf_counter()
+        rows = result_set.cursor.fetchmany(CACHE_MAX_ROWS + 1)
+        result_set.stats.fetch_seconds = time.perf_counter() - start
+        result_set.stats.rows_returned = len(rows)
+        result_set.first_rows = rows
+        if len(rows) <= CACHE_MAX_ROWS:
+            result_set.cursor.close()
+            result_set.cursor = None
+            self._cache.store(version, result_set.statement, (), result_set.columns, rows)
+
+
+class QueryRunner(QObject):
+    """Starts one QueryWorker at a time, each on its own QThread."""
+
+    progress = Signal(float)
+    finished = Signal(object)  # QueryResult
+
+    def __init__(
+        self, connect: Callable[[], sqlite3.Connection], parent: Optional[QObject] = None
+    ) -> None:
+        super().__init__(parent)
+        self._connect = connect
+        self._worker: Optional[QueryWorker] = None
+        self._threads = WorkerThreads(self)
+
+    def is_running(self) -> bool:
+        return self._worker is not None
+
+    def start(
+        self, sql: str, timeout: float = 0, cache: Optional[sql_engine.ResultCache] = None
+    ) -> bool:
+        """Run sql in the background. Returns False if a query is already running."""
+        if self._worker is not None:
+            return False
+        worker = QueryWorker(self._connect, sql, timeout, cache)
+        worker.progress.connect(self.progress)
+        worker.finished.connect(self._on_worker_finished)
+        self._worker = worker
+        self._threads.start(worker)
+        return True
+
+    def cancel(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+
+    def wait(self) -> None:
+        """Block until every started query thread has stopped."""
+        self._threads.wait()
+
+    def _on_worker_finished(self, result: QueryResult) -> None:
+        self._worker = None
+        self.finished.emit(result)
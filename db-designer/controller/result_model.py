@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from typing import List, Optional, Sequence
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from .query_runner import PROGRESS_STEPS, StatementStats, StepCounter
+
+
+def format_steps(steps: int) -> str:
+    """A VM step count for display; counts are only exact to PROGRESS_STEPS."""
+    if steps < PROGRESS_STEPS:
+        return f"<{PROGRESS_STEPS:,}"
+    return f"~{steps:,}"
+
+
+class QueryResultModel(QAbstractTableModel):
+    """
+    Table model over a live SQLite cursor.
+
+    Rows are pulled in batches through canFetchMore/fetchMore as the view
+    scrolls, and cells are only turned into text in data(). The model owns
+    the cursor, and the connection if one is given; call close() when it
+    is replaced.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        cursor: sqlite3.Cursor,
+        first_rows: Optional[List[tuple]] = None,
+        batch_size: int = 500,
+        connection: Optional[sqlite3.Connection] = None,
+        parent=None,
+        stats: Optional[StatementStats] = None,
+        steps: Optional[StepCounter] = None,
+    ) -> None:
+        super().__init__(parent)
+        # Fetch time, VM steps and rows read here are added to stats
+        self._stats = stats
+        self._steps = steps
+        self._columns = list(columns)
+        self._cursor: Optional[sqlite3.Cursor] = cursor
+        self._connection = connection
+        self._batch_size = batch_size
+        self._rows: List[tuple] = list(first_rows or [])
+        if first_rows is not None and len(first_rows) < batch_size:
+            self._release()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        value = self._rows[index.row()][index.column()]
+        if value is None:
+            return "NULL"
+        if isinstance(value, bytes):
+            return f"<{len(value)} bytes>"
+        return str(value)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._columns[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._cursor is not None
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if parent.isValid() or self._cursor is None:
+            return
+        start = time.perf_counter()
+        steps_before = self._steps.steps if self._steps is not None else 0
+        try:
+            rows = self._cursor.fetchmany(self._batch_size)
+        except sqlite3.Error:
+            rows = []
+        if self._stats is not None:
+            self._stats.fetch_seconds += time.perf_counter() - start
+            self._stats.rows_returned += len(rows)
+            if self._steps is not None:
+                self._stats.steps += self._steps.steps - steps_before
+        if len(rows) < self._batch_size:
+            self._release()
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def close(self) -> None:
+        """Stop fetching and release the cursor and its connection."""
+        self._release()
+
+    def _release(self) -> None:
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class QueryStatsModel(QAbstractTableModel):
+    """
+    Per-statement timings of a console script, one row per statement.
+
+    Reads the StatementStats live; call refresh() after more rows were
+    fetched so the fetch columns update.
+    """
+
+    HEADERS = ("Statement", "Exec (ms)", "Fetch (ms)", "VM steps", "Rows")
+
+    def __init__(self, stats: List[StatementStats], parent=None) -> None:
+        super().__init__(parent)
+        self._stats = stats
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._stats)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        stats = self._stats[index.row()]
+        column = index.column()
+        if role == Qt.ToolTipRole and column == 0:
+            return stats.statement
+        if role == Qt.TextAlignmentRole and column > 0:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role != Qt.DisplayRole:
+            return None
+        if column == 0:
+            return " ".join(stats.statement.split())[:120]
+        if column == 1:
+            return f"{stats.elapsed * 1000:.2f}"
+        if column == 2:
+            return f"{stats.fetch_seconds * 1000:.2f}" if stats.returns_rows else ""
+        if column == 3:
+            return format_steps(stats.steps)
+        if stats.returns_rows:
+            return f"{stats.rows_returned:,} returned" + (" (cached)" if stats.cached else "")
+        return f"{stats.rowcount:,} changed" if stats.rowcount >= 0 else ""
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def refresh(self) -> None:
+        if self._stats:
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(len(self._stats) - 1, len(self.HEADERS) - 1)
+            )
+
+    def summary(self) -> str:
+        elapsed = sum(s.elapsed + s.fetch_seconds for s in self._stats)
+        steps = format_steps(sum(s.steps for s in self._stats))
+        return f"{len(self._stats)} statement(s), {elapsed * 1000:.1f} ms, {steps} VM steps"
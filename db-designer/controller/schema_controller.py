@@ -1,44 +1,96 @@
 from __future__ import annotations
 
+import csv
 import sqlite3
-from typing import Dict
+import time
+from typing import Dict, List, Optional, Tuple
 
 from PySide6.QtGui import QStandardItemModel, QStandardItem
-from PySide6.QtWidgets import QDialog, QMessageBox
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication, QDialog, QInputDialog, QMessageBox, QProgressDialog
 
 from model.attribute import Attribute
+from model.project import Position, Project, ProjectFormatError, load_project, save_project
 from model.relationship import Relationship
 from model.schema import Schema
-from model.table import Table
+from model.table import LazyTable, Table
 
 from view.widgets.table_widget import TableWidget
 from view.main_window import MainWindow
 
-from .dialogs import NewTableDialog, NewAttributeDialog, RelationshipDialog
+from .dialogs import NewTableDialog, NewAttributeDialog, RelationshipDialog, ImportDataDialog
 from . import sql_engine
+from .data_generator import generate_data
+from .backup_scheduler import BackupScheduler
+from .sync_scheduler import SyncScheduler
+from .connection_manager import BackupReport, ConnectionManager
+from .query_runner import QueryResult, QueryRunner
+from .result_model import QueryResultModel, QueryStatsModel
+
+
+# Side of the square canvas cells that tables without a widget are filed under
+WIDGET_CELL = 1024
 
 
 class SchemaController:
     """
     Main controller that wires the view and the schema model.
 
-    All application/business logic lives here.
+    All application/business logic lives here. With ``in_memory`` the
+    database is worked on in memory and saved to disk in the background.
     """
 
-    def __init__(self, schema: Schema, main_window: MainWindow) -> None:
+    def __init__(self, schema: Schema, main_window: MainWindow, in_memory: bool = False) -> None:
         self.schema = schema
         self.view = main_window
 
         self._table_widgets: Dict[str, TableWidget] = {}
-        self._conn = sqlite3.connect("db_designer.db")
+        # Tables of an opened project get a widget once scrolled into view:
+        # their positions, and their names by WIDGET_CELL cell
+        self._pending_widgets: Dict[str, Position] = {}
+        self._pending_cells: Dict[Tuple[int, int], List[str]] = {}
+        self._ddl = sql_engine.DDLCache(schema)
+        # WAL database (or a memory one): a writer for this thread, pooled readers
+        self._db = ConnectionManager("db_designer.db", in_memory=in_memory)
+        self._db_path = self._db.db_path
+        self._conn = self._db.writer
         self._create_tables_in_db()
+        # Model edits are applied to the database in coalesced background syncs
+        self._sync = SyncScheduler(self._db, self._ddl)
+        self._sync.status_changed.connect(self.view.set_sync_status)
+        self._backups = BackupScheduler(self._db)
+        self._backups.saved.connect(self._on_db_saved)
+        self._backups.failed.connect(self.view.set_db_status)
+        self.view.set_save_db_available(in_memory)
+        if in_memory:
+            self.view.set_db_status(f"Working in memory; saved to {self._db_path}")
+
+        # Console queries run on a worker thread with their own connection
+        self._query_runner = QueryRunner(lambda: self._db.connect(check_same_thread=False))
+        self._result_cache = sql_engine.ResultCache(self._db.uri, uri=True)
+        self._query_runner.progress.connect(self.view.set_query_progress)
+        self._query_runner.finished.connect(self._on_query_finished)
+        # The console's open result cursors (and their read lock) until released
+        self._query_result: QueryResult | None = None
+        self._result_models: List[QueryResultModel] = []
 
         self.view.add_table_requested.connect(self.on_add_table)
         self.view.add_attribute_requested.connect(self.on_add_attribute)
         self.view.add_relationship_requested.connect(self.on_add_relationship)
         self.view.generate_sql_requested.connect(self.on_generate_sql)
         self.view.execute_sql_requested.connect(self.on_execute_sql)
+        self.view.cancel_sql_requested.connect(self.on_cancel_sql)
+        self.view.sql_console_closed.connect(self._release_query_results)
+        self.view.export_sql_requested.connect(self.on_export_sql)
         self.view.open_sql_console_requested.connect(self.on_open_sql_console)
+        self.view.import_data_requested.connect(self.on_import_data)
+        self.view.export_query_requested.connect(self.on_export_query)
+        self.view.explain_sql_requested.connect(self.on_explain_sql)
+        self.view.generate_data_requested.connect(self.on_generate_data)
+        self.view.save_db_requested.connect(self.on_save_db)
+        self.view.open_project_requested.connect(self.on_open_project)
+        self.view.save_project_requested.connect(self.on_save_project)
+        self.view.canvas_viewport_changed.connect(self._create_visible_widgets)
         self.view.delete_table_requested.connect(self.on_delete_table)
         self.view.delete_attribute_requested.connect(self.on_delete_attribute)
         self.view.delete_relationship_requested.connect(self.on_delete_relationship)
@@ -47,12 +99,92 @@ class SchemaController:
         self._next_y = 20
         self._grid_step = 220  # Increased to accommodate larger widgets
 
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
+
+    def shutdown(self) -> None:
+        """Stop background work and close the database, saving it if it is in memory."""
+        self._query_runner.cancel()
+        self._query_runner.wait()
+        self._release_query_results()
+        if not self._sync.is_deferred():
+            self._sync.sync_now()
+        self._sync.stop()
+        self._backups.stop()
+        try:
+            self._db.backup(sleep=0)
+        except sqlite3.Error as e:
+            QMessageBox.warning(self.view, "Save Failed", f"The database could not be saved:\n{str(e)}")
+        self._result_cache.close()
+        self._db.close()
+
+    def on_save_db(self) -> None:
+        self.view.set_db_status("Saving to disk…")
+        self._backups.save()
+
+    def _on_db_saved(self, report: BackupReport) -> None:
+        if report.written:
+            self.view.set_db_status(
+                f"Saved at {time.strftime('%H:%M:%S')} ({report.pages} pages in {report.seconds:.2f}s)"
+            )
+        else:
+            self.view.set_db_status("No changes since the last save")
+
+    def on_open_project(self, path: str) -> None:
+        """Replace the schema and canvas with a saved project."""
+        try:
+            project = load_project(path)
+        except (OSError, ProjectFormatError) as e:
+            QMessageBox.warning(self.view, "Open Project Failed", f"Could not open '{path}':\n{e}")
+            return
+
+        for widget in self._table_widgets.values():
+            widget.hide()
+            widget.deleteLater()
+        self._table_widgets.clear()
+        self._pending_widgets.clear()
+        self._pending_cells.clear()
+        self.view.canvas.clear_relationships()
+        self._next_x = 20
+        self._next_y = 20
+
+        with self.schema.batch():
+            for table in self.schema.tables:
+                self.schema.remove_table(table.name)
+            for table in project.schema.tables:
+                self.schema.add_table(table)
+            for rel in project.schema.relationships:
+                self.schema.add_relationship(rel)
+
+        # Widgets (and the attributes of lazily loaded tables) only for what is in view
+        right = bottom = 0
+        lazy = False
+        for table in self.schema.tables:
+            position = project.positions.get(table.name) or self._take_grid_position()
+            self._pending_widgets[table.name] = position
+            cell = (position[0] // WIDGET_CELL, position[1] // WIDGET_CELL)
+            self._pending_cells.setdefault(cell, []).append(table.name)
+            right, bottom = max(right, position[0]), max(bottom, position[1])
+            lazy = lazy or isinstance(table, LazyTable)
+        self.view.ensure_canvas_size(right + self._grid_step, bottom + self._grid_step)
+        self._create_visible_widgets()
+        # Generating DDL would decode every lazily loaded table; wait until it's needed
+        self._sync.request(defer=lazy)
+
+    def on_save_project(self, path: str) -> None:
+        positions = dict(self._pending_widgets)
+        positions.update((name, (w.x(), w.y())) for name, w in self._table_widgets.items())
+        try:
+            save_project(Project(self.schema, positions), path)
+        except OSError as e:
+            QMessageBox.warning(self.view, "Save Project Failed", f"Could not save '{path}':\n{e}")
+
     def on_open_sql_console(self) -> None:
-        self._recreate_db()
+        # Only waits if edits have not reached the database yet
+        self._sync.sync_now()
 
     def _create_tables_in_db(self) -> None:
         """Create all tables from the current schema in the database."""
-        create_sql = sql_engine.generate_create_table_statements(self.schema)
+        create_sql = self._ddl.script()
         if create_sql.strip():
             try:
                 cursor = self._conn.cursor()
@@ -66,24 +198,9 @@ class SchemaController:
                 # For now, ignore errors in table creation
                 pass
 
-    def _recreate_db(self) -> None:
-        """Recreate the database with the current schema."""
-        # Drop all existing tables first
-        try:
-            cursor = self._conn.cursor()
-            # Get all table names
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-            tables = cursor.fetchall()
-            # Drop each table
-            for (table_name,) in tables:
-                cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
-            self._conn.commit()
-        except Exception as e:
-            # If there's an error, just continue - might be first run
-            pass
-        
-        # Now create tables with current schema
-        self._create_tables_in_db()
+    def _sync_db(self) -> None:
+        """Bring the database in line with the schema once edits pause (see SyncScheduler)."""
+        self._sync.request()
 
     def on_add_table(self) -> None:
         dialog = NewTableDialog(self.view)
@@ -102,7 +219,7 @@ class SchemaController:
         table = Table(name=name)
         self.schema.add_table(table)
         self._create_table_widget(table)
-        self._recreate_db()
+        self._sync_db()
 
     def on_add_attribute(self) -> None:
         if not self.schema.tables:
@@ -130,7 +247,7 @@ class SchemaController:
         table = self.schema.find_table(table_name)
         if table is None:
             return
-        if any(a.name == attr_name for a in table.attributes):
+        if table.has_attribute(attr_name):
             return
 
         attr = Attribute(
@@ -140,9 +257,9 @@ class SchemaController:
             is_nullable=is_nullable,
             is_unique=is_unique,
         )
-        table.add_attribute(attr)
+        self.schema.add_attribute(table.name, attr)
         self._refresh_table_widget(table)
-        self._recreate_db()
+        self._sync_db()
 
     def on_add_relationship(self) -> None:
         """Handle adding a new relationship."""
@@ -173,15 +290,13 @@ class SchemaController:
             return
 
         # Check if relationship already exists (bidirectional)
-        for existing_rel in self.schema.relationships:
-            if ((existing_rel.table_a.name == a_name and existing_rel.table_b.name == b_name) or
-                (existing_rel.table_a.name == b_name and existing_rel.table_b.name == a_name)):
-                QMessageBox.warning(
-                    self.view, 
-                    "Duplicate Relationship", 
-                    f"A relationship between '{a_name}' and '{b_name}' already exists."
-                )
-                return
+        if self.schema.find_relationship(a_name, b_name) is not None:
+            QMessageBox.warning(
+                self.view, 
+                "Duplicate Relationship", 
+                f"A relationship between '{a_name}' and '{b_name}' already exists."
+            )
+            return
 
         # Validate primary keys based on relationship type
         if rel_type == "1-N":
@@ -214,7 +329,7 @@ class SchemaController:
         if widget_a and widget_b:
             self.view.canvas.add_relationship(a_name, b_name, rel_type, widget_a, widget_b)
 
-        self._recreate_db()
+        self._sync_db()
 
     def on_generate_sql(self) -> None:
         """Generate and show SQL only when button is clicked."""
@@ -229,11 +344,114 @@ class SchemaController:
             QMessageBox.warning(self.view, "Schema Validation Error", "\n".join(errors))
             return
         
-        sql = sql_engine.generate_create_table_statements(self.schema)
+        sql = self._ddl.script()
         self.view.set_generated_sql(sql)
 
-    def on_execute_sql(self, sql: str) -> None:
-        """Execute SQL using the sql_engine module."""
+    def on_export_sql(self, path: str) -> None:
+        """Stream the DDL script to a file, one statement at a time."""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                sql_engine.write_sql_script(self._ddl.iter_statements(), f)
+        except OSError as e:
+            QMessageBox.warning(self.view, "Export Failed", f"Could not write '{path}':\n{e}")
+            return
+        QMessageBox.information(self.view, "Exported", f"SQL script saved to '{path}'.")
+
+    def on_import_data(self) -> None:
+        """Bulk load a CSV/JSONL file into one of the generated tables."""
+        if not self.schema.tables:
+            QMessageBox.information(self.view, "Import Data", "Add a table before importing data.")
+            return
+        dlg = ImportDataDialog([t.name for t in self.schema.tables], self.view)
+        if dlg.exec() != QDialog.Accepted:
+            return
+        values = dlg.get_values()
+        if not values["path"]:
+            return
+
+        self._sync.sync_now()
+        progress, on_progress = self._row_progress("Import Data", "Imported")
+        try:
+            report = sql_engine.load_file(
+                self._conn, values["table_name"], values["path"], progress=on_progress
+            )
+        except (OSError, ValueError, csv.Error, sqlite3.Error) as e:
+            QMessageBox.warning(self.view, "Import Failed", f"Could not import '{values['path']}':\n{e}")
+            return
+        finally:
+            progress.close()
+
+        message = (
+            f"{report.rows:,} rows loaded into '{report.table}' in {report.seconds:.1f}s "
+            f"({report.rows_per_second:,.0f} rows/s)."
+        )
+        if report.cancelled:
+            message += "\nImport was cancelled; rows loaded so far were kept."
+        if report.ignored_columns:
+            message += f"\nIgnored columns: {', '.join(report.ignored_columns)}"
+        QMessageBox.information(self.view, "Import Data", message)
+
+    def on_generate_data(self) -> None:
+        """Fill the database with synthetic rows that follow the modeled FKs."""
+        if not self.schema.tables:
+            QMessageBox.information(self.view, "Generate Data", "Add a table before generating data.")
+            return
+        rows, ok = QInputDialog.getInt(
+            self.view, "Generate Data", "Rows per table:", 1000, 1, 10_000_000, 1000
+        )
+        if not ok:
+            return
+
+        self._sync.sync_now()
+        progress, on_progress = self._row_progress("Generate Data", "Generated")
+        try:
+            report = generate_data(self._conn, self.schema, rows, progress=on_progress)
+        except sqlite3.Error as e:
+            QMessageBox.warning(self.view, "Generate Data Failed", str(e))
+            return
+        finally:
+            progress.close()
+
+        lines = [f"{name}: {count:,} rows" for name, count in report.rows.items()]
+        message = f"{report.total_rows:,} rows inserted in {report.seconds:.1f}s.\n\n" + "\n".join(lines)
+        if report.cancelled:
+            message += "\n\nGeneration was cancelled; rows inserted so far were kept."
+        QMessageBox.information(self.view, "Generate Data", message)
+
+    def on_export_query(self, sql: str, path: str) -> None:
+        """Stream a console query's result set to a file without loading it into the grid."""
+        progress, on_progress = self._row_progress("Export Results", "Exported")
+        try:
+            # A read-only connection: the export does not hold up schema syncs
+            with self._db.reader() as conn:
+                report = sql_engine.export_query(conn, sql, path, progress=on_progress)
+        except (OSError, ValueError, RuntimeError, sqlite3.Error) as e:
+            QMessageBox.warning(self.view, "Export Failed", f"Could not export to '{path}':\n{e}")
+            return
+        finally:
+            progress.close()
+
+        message = f"{report.rows:,} rows exported to '{path}' in {report.seconds:.1f}s."
+        if report.cancelled:
+            message += "\nExport was cancelled; the file is incomplete."
+        QMessageBox.information(self.view, "Export Results", message)
+
+    def _row_progress(self, title: str, verb: str):
+        """A cancellable progress dialog and the row-count callback that drives it."""
+        progress = QProgressDialog(f"{title}...", "Cancel", 0, 0, self.view)
+        progress.setWindowTitle(title)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+
+        def on_progress(rows: int) -> bool:
+            progress.setLabelText(f"{verb} {rows:,} rows...")
+            QApplication.processEvents()
+            return not progress.wasCanceled()
+
+        return progress, on_progress
+
+    def on_execute_sql(self, sql: str, timeout: int = 0, use_cache: bool = False) -> None:
+        """Execute SQL in the background; results arrive in _on_query_finished."""
         if not sql.strip():
             model = QStandardItemModel()
             model.setColumnCount(1)
@@ -242,32 +460,121 @@ class SchemaController:
             self.view.set_query_results_model(model)
             return
 
-        # Use the sql_engine.execute_sql function
-        columns, rows = sql_engine.execute_sql(self._conn, sql)
-        
-        model = QStandardItemModel()
-        
-        if columns is not None:
-            # SELECT query - show results in table
-            model.setColumnCount(len(columns))
-            model.setHorizontalHeaderLabels(columns)
-            if rows:
-                for row in rows:
-                    items = [QStandardItem(str(value) if value is not None else "NULL") for value in row]
-                    model.appendRow(items)
-            else:
-                # No rows returned
-                model.appendRow([QStandardItem("(empty result)")] + [QStandardItem("") for _ in range(len(columns) - 1)])
-        else:
+        cache = self._result_cache if use_cache else None
+        if not self._query_runner.start(sql, timeout, cache):
+            return
+        self.view.set_query_running(True)
+
+    def on_cancel_sql(self) -> None:
+        self._query_runner.cancel()
+
+    def _on_query_finished(self, result: QueryResult) -> None:
+        """Show the results of a background query in the console, one tab per result set."""
+        self.view.set_query_running(False)
+        self._release_query_results()
+
+        stats_model = QueryStatsModel(result.stats)
+        stats_tab = ("Stats", "Per-statement timings and VM steps", stats_model)
+        if not result.result_sets:
             # Non-SELECT query or error - show message
+            model = QStandardItemModel()
             model.setColumnCount(1)
             model.setHorizontalHeaderLabels(["Result"])
-            for row in rows:
+            for row in result.messages:
                 model.appendRow([QStandardItem(str(row[0]))])
-        
-        self.view.set_query_results_model(model)
+            if result.stats:
+                self.view.set_query_results([("Result", "", model), stats_tab], current=0)
+            else:
+                self.view.set_query_results_model(model)
+            return
 
-    def _create_table_widget(self, table: Table) -> None:
+        tabs = []
+        models: List[QueryResultModel] = []
+        for number, result_set in enumerate(result.result_sets, 1):
+            columns = result_set.columns
+            if result_set.first_rows == []:
+                # No rows returned
+                if result_set.cursor is not None:
+                    result_set.cursor.close()
+                model = QStandardItemModel()
+                model.setColumnCount(len(columns))
+                model.setHorizontalHeaderLabels(columns)
+                model.appendRow([QStandardItem("(empty result)")] + [QStandardItem("") for _ in range(len(columns) - 1)])
+            else:
+                # Rows are fetched in batches as the tab is viewed and scrolled
+                model = QueryResultModel(
+                    columns, result_set.cursor, result_set.first_rows,
+                    stats=result_set.stats, steps=result.steps,
+                )
+                model.rowsInserted.connect(lambda *_: stats_model.refresh())
+                models.append(model)
+            tooltip = f"{result_set.statement}\n({result_set.stats.elapsed * 1000:.1f} ms)"
+            tabs.append((f"Result {number}", tooltip, model))
+
+        tabs.append(stats_tab)
+        if self.view.set_query_results(tabs, current=len(tabs) - 2):
+            self._query_result = result
+            self._result_models = models
+        else:
+            result.close()
+
+    def on_explain_sql(self, sql: str) -> None:
+        """Show EXPLAIN QUERY PLAN for each statement of the console script."""
+        plans = []
+        with self._db.reader() as conn:
+            for statement in sql_engine.iter_sql_statements(sql):
+                try:
+                    plans.append((statement, sql_engine.explain_query_plan(conn, statement)))
+                except sqlite3.Error as e:
+                    plans.append((statement, str(e)))
+        self.view.set_query_plan(plans)
+
+    def _release_query_results(self) -> None:
+        for model in self._result_models:
+            model.close()
+        self._result_models = []
+        if self._query_result is not None:
+            self._query_result.close()
+            self._query_result = None
+
+    def _create_visible_widgets(self) -> None:
+        """Create the widgets of opened-project tables that are now in view."""
+        if not self._pending_widgets:
+            return
+        # One grid step of margin, and widgets starting left/above the view
+        rect = self.view.visible_canvas_rect().adjusted(-self._grid_step, -self._grid_step, 0, 0)
+        for cx in range(rect.left() // WIDGET_CELL, rect.right() // WIDGET_CELL + 1):
+            for cy in range(rect.top() // WIDGET_CELL, rect.bottom() // WIDGET_CELL + 1):
+                names = self._pending_cells.get((cx, cy))
+                if not names:
+                    continue
+                waiting = []
+                for name in names:
+                    position = self._pending_widgets.get(name)
+                    table = self.schema.find_table(name)
+                    if position is None or table is None:
+                        continue
+                    if rect.contains(*position):
+                        del self._pending_widgets[name]
+                        self._create_table_widget(table, position)
+                    else:
+                        waiting.append(name)
+                if waiting:
+                    self._pending_cells[(cx, cy)] = waiting
+                else:
+                    del self._pending_cells[(cx, cy)]
+
+    def _take_grid_position(self) -> Position:
+        """The next free slot of the default grid layout."""
+        position = (self._next_x, self._next_y)
+        self._next_x += self._grid_step
+        canvas_width = self.view.canvas.width()
+        if canvas_width > 0 and self._next_x + self._grid_step > canvas_width:
+            self._next_x = 20
+            self._next_y += self._grid_step
+        return position
+
+    def _create_table_widget(self, table: Table, position: Optional[Position] = None) -> None:
         canvas = self.view.canvas
         
         # Create widget with canvas as parent
@@ -279,7 +586,7 @@ class SchemaController:
         
         # Set size and position
         widget.resize(200, 120)
-        widget.move(self._next_x, self._next_y)
+        widget.move(*(position or self._take_grid_position()))
         
         # Make widget visible
         widget.show()
@@ -293,14 +600,7 @@ class SchemaController:
         widget.delete_attribute_requested.connect(self.view.delete_attribute_requested)
 
         # Update relationship drawings with new widget
-        self._refresh_all_relationships()
-
-        # Update position for next widget
-        self._next_x += self._grid_step
-        canvas_width = canvas.width()
-        if canvas_width > 0 and self._next_x + self._grid_step > canvas_width:
-            self._next_x = 20
-            self._next_y += self._grid_step
+        self._refresh_table_relationships(table)
 
     def _refresh_table_widget(self, table: Table) -> None:
         widget = self._table_widgets.get(table.name)
@@ -316,54 +616,49 @@ class SchemaController:
         if widget.height() < 100:
             widget.resize(widget.width(), max(100, 50 + len(lines) * 20))
 
-    def _refresh_all_relationships(self) -> None:
-        """Refresh all relationship lines on the canvas."""
-        self.view.canvas.clear_relationships()
-        for rel in self.schema.relationships:
-            table_a_name = rel.table_a.name
-            table_b_name = rel.table_b.name
-            widget_a = self._table_widgets.get(table_a_name)
-            widget_b = self._table_widgets.get(table_b_name)
+    def _refresh_table_relationships(self, table: Table) -> None:
+        """Redraw only the relationship lines touching one table."""
+        for rel in self.schema.relationships_of(table.name):
+            widget_a = self._table_widgets.get(rel.table_a.name)
+            widget_b = self._table_widgets.get(rel.table_b.name)
             if widget_a and widget_b:
                 self.view.canvas.add_relationship(
-                    table_a_name, table_b_name, rel.rel_type, widget_a, widget_b
+                    rel.table_a.name, rel.table_b.name, rel.rel_type, widget_a, widget_b
                 )
 
     def on_delete_table(self, table_name: str) -> None:
         table = self.schema.find_table(table_name)
         if not table:
             return
+        # Remove the lines touching this table before the schema forgets them
+        for rel in self.schema.relationships_of(table_name):
+            self.view.canvas.remove_relationship(rel.table_a.name, rel.table_b.name)
         # Remove from schema
         self.schema.remove_table(table_name)
         # Remove widget
+        self._pending_widgets.pop(table_name, None)
         widget = self._table_widgets.pop(table_name, None)
         if widget:
             widget.hide()
             widget.deleteLater()
-        # Refresh relationships
-        self._refresh_all_relationships()
-        # Recreate DB
-        self._recreate_db()
+        # Sync DB
+        self._sync_db()
 
     def on_delete_attribute(self, table_name: str, attr_name: str) -> None:
         table = self.schema.find_table(table_name)
         if not table:
             return
         # Remove attribute
-        table.remove_attribute(attr_name)
+        self.schema.remove_attribute(table_name, attr_name)
         # Refresh widget
         self._refresh_table_widget(table)
-        # Recreate DB
-        self._recreate_db()
+        # Sync DB
+        self._sync_db()
 
     def on_delete_relationship(self, table_a_name: str, table_b_name: str) -> None:
         # Find and remove relationship
-        self.schema.relationships = [
-            r for r in self.schema.relationships
-            if not ((r.table_a.name == table_a_name and r.table_b.name == table_b_name) or
-                    (r.table_a.name == table_b_name and r.table_b.name == table_a_name))
-        ]
+        self.schema.remove_relationship(table_a_name, table_b_name)
         # Refresh canvas
-        self._refresh_all_relationships()
-        # Recreate DB
-        self._recreate_db()
\ No newline at end of file
+        self.view.canvas.remove_relationship(table_a_name, table_b_name)
+        # Sync DB
+        self._sync_db()
\ No newline at end of file
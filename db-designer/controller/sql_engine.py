@@ -1,245 +1,1255 @@
 from __future__ import annotations
 
+import csv
+import itertools
+import json
 import sqlite3
 import re
-from typing import List, Tuple, Optional
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import (
+    Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Sequence, Set, Tuple, Optional, TextIO, Union,
+)
 
 from model.schema import Schema
 from model.table import Table
 from model.attribute import Attribute
+from model.relationship import Relationship
+from model.events import (
+    SchemaEvent,
+    TableAdded,
+    TableRemoved,
+    TableRenamed,
+    AttributeAdded,
+    AttributeRemoved,
+    RelationshipAdded,
+    RelationshipRemoved,
+)
 
 
 def _quote_identifier(name: str) -> str:
     return '"' + name.replace('"', '""') + '"'
 
 
+@dataclass
+class DependencyOrder:
+    """
+    Tables grouped into creation levels along the 1-N foreign key graph.
+
+    Every table only references tables from earlier levels, so a level can
+    be created as soon as the previous ones exist, in any order or in
+    parallel. Relationships in ``deferred`` were cut to break cycles; their
+    constraints are emitted as DEFERRABLE INITIALLY DEFERRED.
+    """
+    levels: List[List[Table]]
+    deferred: List[Relationship]
+    _deferred_by_table: Dict[int, FrozenSet[int]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        by_table: Dict[int, Set[int]] = {}
+        for rel in self.deferred:
+            by_table.setdefault(id(rel.table_b), set()).add(id(rel))
+        self._deferred_by_table = {k: frozenset(v) for k, v in by_table.items()}
+
+    @property
+    def tables(self) -> List[Table]:
+        return [table for level in self.levels for table in level]
+
+    def deferred_into(self, table: Table) -> FrozenSet[int]:
+        """Ids of the deferred relationships whose FK lives in this table."""
+        return self._deferred_by_table.get(id(table), frozenset())
+
+
+def dependency_order(schema: Schema) -> DependencyOrder:
+    """
+    Topologically sort the tables by their 1-N edges (Kahn's algorithm,
+    O(V+E) plus O(V) per cycle broken).
+
+    Ties keep schema order. When only cycles remain, one cycle is found by
+    walking up from the first unplaced table; its table first in schema
+    order has the incoming edge that closes the cycle deferred, and sorting
+    resumes. Tables merely depending on a cycle keep their ordinary FKs.
+    """
+    tables = schema.tables
+    position = {id(t): i for i, t in enumerate(tables)}
+    indegree = dict.fromkeys(position, 0)
+    for table in tables:
+        for rel in schema.incoming(table.name, "1-N"):
+            if rel.table_a is not table and id(rel.table_a) in position:
+                indegree[id(table)] += 1
+
+    levels: List[List[Table]] = []
+    deferred: List[Relationship] = []
+    deferred_ids: Set[int] = set()
+    placed: Set[int] = set()
+    current = [t for t in tables if indegree[id(t)] == 0]
+    next_unplaced = 0
+    while len(placed) < len(tables):
+        if not current:
+            while id(tables[next_unplaced]) in placed:
+                next_unplaced += 1
+            rel = _cycle_edge(schema, tables[next_unplaced], position, placed, deferred_ids)
+            deferred.append(rel)
+            deferred_ids.add(id(rel))
+            victim = rel.table_b
+            indegree[id(victim)] -= 1
+            if indegree[id(victim)]:
+                continue  # still waits on another cycle or on a table behind one
+            current = [victim]
+
+        levels.append(current)
+        placed.update(id(t) for t in current)
+        ready: List[Table] = []
+        for table in current:
+            for rel in schema.outgoing(table.name, "1-N"):
+                child = rel.table_b
+                if (child is table or id(child) not in position or id(child) in placed
+                        or id(rel) in deferred_ids):
+                    continue
+                indegree[id(child)] -= 1
+                if indegree[id(child)] == 0:
+                    ready.append(child)
+        current = sorted(ready, key=lambda t: position[id(t)])
+
+    return DependencyOrder(levels, deferred)
+
+
+def _cycle_edge(
+    schema: Schema,
+    start: Table,
+    position: Dict[int, int],
+    placed: Set[int],
+    deferred_ids: Set[int],
+) -> Relationship:
+    """
+    An edge closing a cycle among the unplaced tables, reached by walking
+    up from ``start``.
+
+    Every unplaced table still has an unplaced parent, so the walk must
+    revisit a table; the tables from its first visit on form a cycle.
+    Returns the cycle's edge into its table first in schema order.
+    """
+    edges: List[Relationship] = []  # each runs into the table the previous one came from
+    seen: Dict[int, int] = {}  # table id -> index of its edge in edges
+    table = start
+    while id(table) not in seen:
+        seen[id(table)] = len(edges)
+        for rel in schema.incoming(table.name, "1-N"):
+            parent = rel.table_a
+            if (parent is not table and id(parent) in position and id(parent) not in placed
+                    and id(rel) not in deferred_ids):
+                edges.append(rel)
+                table = parent
+                break
+    cycle_edges = edges[seen[id(table)]:]
+    return min(cycle_edges, key=lambda rel: position[id(rel.table_b)])
+
+
 def generate_create_table_statements(schema: Schema) -> str:
-    lines: List[str] = []
-    fk_constraints: dict[str, List[str]] = {}
-    junction_tables: List[Tuple[str, str, str]] = []
+    return "".join(iter_create_table_statements(schema))
+
+
+def iter_create_table_statements(schema: Schema) -> Iterator[str]:
+    """
+    Yield the CREATE TABLE statements of the schema one at a time.
+
+    Tables come in dependency order (parents before children), followed by
+    the N-N junction tables, so the script loads in one pass with
+    ``PRAGMA foreign_keys=ON``.
+    """
+    for _, create_stmt in iter_named_create_table_statements(schema):
+        yield create_stmt
 
-    # Track which tables need foreign key columns added
-    fk_columns_to_add: dict[str, List[Attribute]] = {}
-    
+
+def iter_named_create_table_statements(schema: Schema) -> Iterator[Tuple[str, str]]:
+    """Like iter_create_table_statements, paired with each created table's name."""
+    order = dependency_order(schema)
+    for table in order.tables:
+        yield table.name, _create_table_statement(schema, table, order.deferred_into(table))
     for rel in schema.relationships:
-        a = rel.table_a
-        b = rel.table_b
-        if rel.rel_type == "1-N":
-            pk_attrs = a.get_primary_keys()
-            if not pk_attrs:
-                # Skip this relationship if no primary key exists
-                # This should have been caught earlier, but handle gracefully
-                continue
-            for pk in pk_attrs:
-                # Check if table_b has a column with the same name as the primary key
-                fk_column_exists = any(attr.name == pk.name for attr in b.attributes)
-                if not fk_column_exists:
-                    # We need to add this foreign key column to table_b
-                    fk_attr = Attribute(
-                        name=pk.name,
-                        data_type=pk.data_type,
-                        is_primary_key=False,
-                        is_nullable=True,
-                        is_unique=False
-                    )
-                    fk_columns_to_add.setdefault(b.name, []).append(fk_attr)
-                
-                fk_constraints.setdefault(b.name, [])
-                fk_constraints[b.name].append(
-                    f"FOREIGN KEY ({_quote_identifier(pk.name)}) "
-                    f"REFERENCES {_quote_identifier(a.name)}({_quote_identifier(pk.name)})"
-                )
-        elif rel.rel_type == "N-N":
-            name = f"{a.name}_{b.name}"
-            junction_tables.append((name, a.name, b.name))
-
-    for table in schema.tables:
-        col_defs: List[str] = []
-        pk_cols: List[str] = []
-
-        # Add regular attributes
-        for attr in table.attributes:
-            parts = [f"{_quote_identifier(attr.name)} {attr.data_type}"]
-            if attr.is_primary_key:
-                pk_cols.append(_quote_identifier(attr.name))
-            if not attr.is_nullable:
-                parts.append("NOT NULL")
-            if attr.is_unique and not attr.is_primary_key:
-                parts.append("UNIQUE")
-            col_defs.append(" ".join(parts))
-        
-        # Add foreign key columns if needed (for 1-N relationships)
-        if table.name in fk_columns_to_add:
-            for fk_attr in fk_columns_to_add[table.name]:
-                # Only add if it doesn't already exist
-                if not any(attr.name == fk_attr.name for attr in table.attributes):
-                    parts = [f"{_quote_identifier(fk_attr.name)} {fk_attr.data_type}"]
-                    if not fk_attr.is_nullable:
-                        parts.append("NOT NULL")
-                    col_defs.append(" ".join(parts))
-
-        if pk_cols:
-            col_defs.append(f"PRIMARY KEY ({', '.join(pk_cols)})")
-
-        col_defs.extend(fk_constraints.get(table.name, []))
-
-        create_stmt = (
-            f"CREATE TABLE IF NOT EXISTS {_quote_identifier(table.name)} (\n    "
-            + ",\n    ".join(col_defs)
-            + "\n);\n"
-        )
-        lines.append(create_stmt)
+        if rel.rel_type == "N-N":
+            create_stmt = _create_junction_statement(schema, rel)
+            if create_stmt:
+                yield junction_table_name(rel), create_stmt
 
-    for jname, aname, bname in junction_tables:
-        atable: Optional[Table] = schema.find_table(aname)
-        btable: Optional[Table] = schema.find_table(bname)
-        if not atable or not btable:
-            continue
-        apks = atable.get_primary_keys()
-        bpks = btable.get_primary_keys()
-        if not apks or not bpks:
+
+def junction_table_name(rel: Relationship) -> str:
+    """Name of the table generated for an N-N relationship."""
+    return f"{rel.table_a.name}_{rel.table_b.name}"
+
+
+def write_sql_script(statements: Iterable[str], out: TextIO) -> int:
+    """
+    Write statements to any object with a text ``write`` method (a file, a
+    ``socket.makefile("w")``, ...) without joining them first.
+
+    Returns the number of characters written.
+    """
+    written = 0
+    for statement in statements:
+        out.write(statement)
+        written += len(statement)
+    return written
+
+
+def _create_table_statement(
+    schema: Schema, table: Table, deferred: FrozenSet[int] = frozenset()
+) -> str:
+    """
+    CREATE TABLE for one modeled table, including FKs of its incoming 1-N edges.
+
+    ``deferred`` holds ids of incoming relationships whose constraint must be
+    DEFERRABLE because they close a cycle (see dependency_order).
+    """
+    col_defs: List[str] = []
+    pk_cols: List[str] = []
+    fk_constraints: List[str] = []
+
+    # Track which foreign key columns need to be added (for 1-N relationships)
+    fk_columns_to_add: List[Attribute] = []
+    for rel in schema.incoming(table.name, "1-N"):
+        a = rel.table_a
+        pk_attrs = a.get_primary_keys()
+        if not pk_attrs:
+            # Skip this relationship if no primary key exists
+            # This should have been caught earlier, but handle gracefully
             continue
+        for pk in pk_attrs:
+            # Check if this table has a column with the same name as the primary key
+            fk_column_exists = table.has_attribute(pk.name)
+            if not fk_column_exists:
+                # We need to add this foreign key column to the table
+                fk_columns_to_add.append(Attribute(
+                    name=pk.name,
+                    data_type=pk.data_type,
+                    is_primary_key=False,
+                    is_nullable=True,
+                    is_unique=False
+                ))
 
-        cols = []
-        fk_constraints_junction = []
-        pk_cols = []
-        for apk in apks:
-            col_name = f"{aname.lower()}_{apk.name}"
-            cols.append(f"{_quote_identifier(col_name)} {apk.data_type} NOT NULL")
-            pk_cols.append(col_name)
-            fk_constraints_junction.append(
-                f"FOREIGN KEY ({_quote_identifier(col_name)}) "
-                f"REFERENCES {_quote_identifier(aname)}({_quote_identifier(apk.name)})"
+            fk_constraints.append(
+                f"FOREIGN KEY ({_quote_identifier(pk.name)}) "
+                f"REFERENCES {_quote_identifier(a.name)}({_quote_identifier(pk.name)})"
+                + (" DEFERRABLE INITIALLY DEFERRED" if id(rel) in deferred else "")
             )
-        for bpk in bpks:
-            col_name = f"{bname.lower()}_{bpk.name}"
-            cols.append(f"{_quote_identifier(col_name)} {bpk.data_type} NOT NULL")
-            pk_cols.append(col_name)
-            fk_constraints_junction.append(
-                f"FOREIGN KEY ({_quote_identifier(col_name)}) "
-                f"REFERENCES {_quote_identifier(bname)}({_quote_identifier(bpk.name)})"
-            )
-        cols.append(f"PRIMARY KEY ({', '.join(_quote_identifier(c) for c in pk_cols)})")
-        cols.extend(fk_constraints_junction)
-        create_stmt = (
-            f"CREATE TABLE IF NOT EXISTS {_quote_identifier(jname)} (\n    "
-            + ",\n    ".join(cols)
-            + "\n);\n"
+
+    # Add regular attributes
+    for attr in table.attributes:
+        parts = [f"{_quote_identifier(attr.name)} {attr.data_type}"]
+        if attr.is_primary_key:
+            pk_cols.append(_quote_identifier(attr.name))
+        if not attr.is_nullable:
+            parts.append("NOT NULL")
+        if attr.is_unique and not attr.is_primary_key:
+            parts.append("UNIQUE")
+        col_defs.append(" ".join(parts))
+
+    # Add foreign key columns if needed (for 1-N relationships)
+    for fk_attr in fk_columns_to_add:
+        parts = [f"{_quote_identifier(fk_attr.name)} {fk_attr.data_type}"]
+        if not fk_attr.is_nullable:
+            parts.append("NOT NULL")
+        col_defs.append(" ".join(parts))
+
+    if pk_cols:
+        col_defs.append(f"PRIMARY KEY ({', '.join(pk_cols)})")
+
+    col_defs.extend(fk_constraints)
+
+    return (
+        f"CREATE TABLE IF NOT EXISTS {_quote_identifier(table.name)} (\n    "
+        + ",\n    ".join(col_defs)
+        + "\n);\n"
+    )
+
+
+def _create_junction_statement(schema: Schema, rel: Relationship) -> Optional[str]:
+    """CREATE TABLE for the junction table of an N-N relationship, if it can be built."""
+    aname = rel.table_a.name
+    bname = rel.table_b.name
+    jname = junction_table_name(rel)
+    atable: Optional[Table] = schema.find_table(aname)
+    btable: Optional[Table] = schema.find_table(bname)
+    if not atable or not btable:
+        return None
+    apks = atable.get_primary_keys()
+    bpks = btable.get_primary_keys()
+    if not apks or not bpks:
+        return None
+
+    cols = []
+    fk_constraints_junction = []
+    pk_cols = []
+    for apk in apks:
+        col_name = f"{aname.lower()}_{apk.name}"
+        cols.append(f"{_quote_identifier(col_name)} {apk.data_type} NOT NULL")
+        pk_cols.append(col_name)
+        fk_constraints_junction.append(
+            f"FOREIGN KEY ({_quote_identifier(col_name)}) "
+            f"REFERENCES {_quote_identifier(aname)}({_quote_identifier(apk.name)})"
+        )
+    for bpk in bpks:
+        col_name = f"{bname.lower()}_{bpk.name}"
+        cols.append(f"{_quote_identifier(col_name)} {bpk.data_type} NOT NULL")
+        pk_cols.append(col_name)
+        fk_constraints_junction.append(
+            f"FOREIGN KEY ({_quote_identifier(col_name)}) "
+            f"REFERENCES {_quote_identifier(bname)}({_quote_identifier(bpk.name)})"
         )
-        lines.append(create_stmt)
+    cols.append(f"PRIMARY KEY ({', '.join(_quote_identifier(c) for c in pk_cols)})")
+    cols.extend(fk_constraints_junction)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {_quote_identifier(jname)} (\n    "
+        + ",\n    ".join(cols)
+        + "\n);\n"
+    )
+
+
+class DDLCache:
+    """Per-table DDL statements, dropped only for the tables a schema event affects."""
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = schema
+        # table id -> (deferred relationship ids it was built with, statement)
+        self._tables: Dict[int, Tuple[FrozenSet[int], str]] = {}
+        self._junctions: Dict[int, Optional[str]] = {}
+        self._order: Optional[DependencyOrder] = None
+        self._script: Optional[str] = None
+        self._unsubscribe = schema.subscribe(self._on_schema_events)
 
-    return "".join(lines)
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def order(self) -> DependencyOrder:
+        """dependency_order(schema), recomputed only when the graph changes."""
+        if self._order is None:
+            self._order = dependency_order(self.schema)
+        return self._order
+
+    def table_statement(self, table: Table) -> str:
+        deferred = self.order().deferred_into(table)
+        entry = self._tables.get(id(table))
+        if entry is None or entry[0] != deferred:
+            entry = (deferred, _create_table_statement(self.schema, table, deferred))
+            self._tables[id(table)] = entry
+        return entry[1]
+
+    def junction_statement(self, rel: Relationship) -> Optional[str]:
+        if id(rel) not in self._junctions:
+            self._junctions[id(rel)] = _create_junction_statement(self.schema, rel)
+        return self._junctions[id(rel)]
+
+    def iter_statements(self) -> Iterator[str]:
+        """Cached counterpart of iter_create_table_statements(schema)."""
+        for _, create_stmt in self.iter_named_statements():
+            yield create_stmt
+
+    def iter_named_statements(self) -> Iterator[Tuple[str, str]]:
+        """Cached counterpart of iter_named_create_table_statements(schema)."""
+        for table in self.order().tables:
+            yield table.name, self.table_statement(table)
+        for rel in self.schema.relationships:
+            if rel.rel_type == "N-N":
+                create_stmt = self.junction_statement(rel)
+                if create_stmt:
+                    yield junction_table_name(rel), create_stmt
+
+    def script(self) -> str:
+        """Full DDL script, identical to generate_create_table_statements(schema)."""
+        if self._script is None:
+            self._script = "".join(self.iter_statements())
+        return self._script
+
+    def _on_schema_events(self, events: List[SchemaEvent]) -> None:
+        self._script = None
+        for event in events:
+            if isinstance(event, (TableAdded, TableRemoved)):
+                self._tables.pop(id(event.table), None)
+                self._order = None
+            elif isinstance(event, TableRenamed):
+                self._invalidate_table(event.table, dependents=True)
+            elif isinstance(event, (AttributeAdded, AttributeRemoved)):
+                self._invalidate_table(event.table, dependents=event.attribute.is_primary_key)
+            elif isinstance(event, (RelationshipAdded, RelationshipRemoved)):
+                rel = event.relationship
+                if rel.rel_type == "1-N":
+                    self._tables.pop(id(rel.table_b), None)
+                    self._order = None
+                else:
+                    self._junctions.pop(id(rel), None)
+
+    def _invalidate_table(self, table: Table, dependents: bool) -> None:
+        self._tables.pop(id(table), None)
+        if not dependents:
+            return
+        for rel in self.schema.outgoing(table.name, "1-N"):
+            self._tables.pop(id(rel.table_b), None)
+        for rel in self.schema.relationships_of(table.name, "N-N"):
+            self._junctions.pop(id(rel), None)
+
+
+# SQLite token classes the splitter cares about. ``body`` swallows a whole
+# run of statement text, closed quotes included, in one match. Unclosed
+# quotes and block comments run to the end of the buffer (\Z) so the
+# streaming splitter can tell they are incomplete.
+_SQL_TOKEN = re.compile(
+    r"""
+      (?P<body>(?:[^'"`\[;\-/]+
+                 |'[^']*(?:''[^']*)*'
+                 |"[^"]*(?:""[^"]*)*"
+                 |`[^`]*(?:``[^`]*)*`
+                 |\[[^\]]*\]
+                 |-(?!-)
+                 |/(?!\*))+)
+    | (?P<line_comment>--[^\n]*)
+    | (?P<block_comment>/\*.*?(?:\*/|\Z))
+    | (?P<semi>;)
+    | (?P<unclosed>['"`\[].*\Z)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_TRIGGER_START = re.compile(r"\s*CREATE\s+(?:TEMP\s+|TEMPORARY\s+)?TRIGGER\b", re.IGNORECASE)
+# As in sqlite3_complete(), a trigger body ends only at an END right
+# after a semicolon, so a CASE ... END inside it does not end it
+_TRIGGER_END = re.compile(r"\s*END\s*$", re.IGNORECASE)
+_CLOSING_QUOTE = {"'": "'", '"': '"', "`": "`", "[": "]"}
+
+
+class _StatementSplitter:
+    """
+    Incremental SQL statement splitter following SQLite's tokenizer rules.
+
+    Handles '' / "" / `` escapes, [bracketed] identifiers, -- and /* */
+    comments (dropped from the output) and the semicolons inside
+    CREATE TRIGGER ... BEGIN ... END bodies, like sqlite3_complete().
+
+    Text is scanned once: at a chunk boundary only a trailing "-" or "/"
+    and an open comment's "/*" are carried over, and an open quote is
+    remembered as state, so a statement spread over many chunks costs
+    time linear in its length.
+    """
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._current: List[str] = []
+        # Closing character of a quote left open by the previous chunk
+        self._quote: Optional[str] = None
+        self._in_trigger = False
+        # Index in _current of the last semicolon kept inside a trigger
+        self._last_semi: Optional[int] = None
+
+    def feed(self, chunk: str, final: bool = False) -> Iterator[str]:
+        buf = self._pending + chunk
+        self._pending = ""
+        pos = 0
+        if self._quote is not None:
+            end = buf.find(self._quote)
+            if end < 0:
+                self._current.append(buf)
+                return
+            # A doubled quote may span the boundary; the two halves are
+            # then lexed as adjacent literals, which splits identically
+            self._current.append(buf[:end + 1])
+            self._quote = None
+            pos = end + 1
+        size = len(buf)
+        for m in _SQL_TOKEN.finditer(buf, pos):
+            kind = m.lastgroup
+            if not final and m.end() == size and self._hold(kind, m.group()):
+                return
+            if kind == "semi":
+                statement = self._end_statement()
+                if statement:
+                    yield statement
+            elif kind == "block_comment":
+                self._current.append(" ")
+            elif kind != "line_comment":
+                self._current.append(m.group())
+
+    def _hold(self, kind: str, text: str) -> bool:
+        """
+        Keep what the next chunk may change about a token that ends the
+        buffer. Returns False if the token is complete as it is.
+        """
+        if kind == "body":
+            # Only a "-" or "/" could start a comment with the next chunk
+            if text[-1] in "-/":
+                self._pending = text[-1]
+                text = text[:-1]
+            if text:
+                self._current.append(text)
+        elif kind == "line_comment":
+            self._pending = "--"
+        elif kind == "block_comment":
+            if text.endswith("*/") and len(text) >= 4:
+                return False
+            self._pending = "/**" if text.endswith("*") and len(text) > 2 else "/*"
+        elif kind == "unclosed":
+            self._current.append(text)
+            self._quote = _CLOSING_QUOTE[text[0]]
+        else:
+            return False
+        return True
+
+    def close(self) -> Iterator[str]:
+        yield from self.feed("", final=True)
+        statement = "".join(self._current).strip()
+        self._current = []
+        self._quote = None
+        self._in_trigger = False
+        self._last_semi = None
+        if statement:
+            yield statement
+
+    def _end_statement(self) -> Optional[str]:
+        if not self._in_trigger:
+            statement = "".join(self._current)
+            if not _TRIGGER_START.match(statement):
+                self._current = []
+                return statement.strip()
+            self._in_trigger = True
+        elif self._last_semi is not None and _TRIGGER_END.match(
+            "".join(self._current[self._last_semi + 1:])
+        ):
+            statement = "".join(self._current).strip()
+            self._current = []
+            self._in_trigger = False
+            self._last_semi = None
+            return statement
+        self._last_semi = len(self._current)
+        self._current.append(";")
+        return None
+
+
+def iter_sql_statements(
+    source: Union[str, TextIO, Iterable[str]], chunk_size: int = 1 << 20
+) -> Iterator[str]:
+    """
+    Yield the statements of a SQL script one at a time.
+
+    ``source`` is a string, a text file object (read ``chunk_size``
+    characters at a time) or any iterable of text chunks, so large dumps
+    can be split without loading them whole.
+    """
+    if isinstance(source, str):
+        chunks: Iterable[str] = (source,)
+    elif hasattr(source, "read"):
+        chunks = iter(lambda: source.read(chunk_size), "")
+    else:
+        chunks = source
+    splitter = _StatementSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
 
 
 def _split_sql_statements(sql: str) -> List[str]:
     """Split SQL string into individual statements, handling quoted strings and comments."""
-    statements = []
-    current = []
-    in_string = False
-    string_char = None
-    in_line_comment = False
-    in_block_comment = False
-    
-    i = 0
-    while i < len(sql):
-        char = sql[i]
-        
-        # Handle block comments /* */
-        if not in_string and not in_line_comment:
-            if char == '/' and i + 1 < len(sql) and sql[i + 1] == '*':
-                in_block_comment = True
-                i += 1  # skip *
-                continue
-            elif char == '*' and i + 1 < len(sql) and sql[i + 1] == '/':
-                in_block_comment = False
-                i += 1  # skip /
+    return list(iter_sql_statements(sql))
+
+
+# Positional (sequence) or named (mapping) statement parameters
+Params = Union[Sequence[Any], Mapping[str, Any]]
+
+# Prepared statements kept per connection. sqlite3 keeps them in an LRU
+# keyed by the exact SQL text, so statements are normalized first.
+STATEMENT_CACHE_SIZE = 256
+# Longer statements (multi-row INSERTs, pasted scripts) are normalized
+# without being memoized, so the cache never keeps large strings alive
+NORMALIZE_CACHE_MAX_CHARS = 4096
+
+_SQL_SPACING = re.compile(
+    r"""
+      (?P<literal>'[^']*(?:''[^']*)*'
+                 |"[^"]*(?:""[^"]*)*"
+                 |`[^`]*(?:``[^`]*)*`
+                 |\[[^\]]*\])
+    | (?:\s+|--[^\n]*|/\*.*?\*/)+
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+def connect(path: str, cached_statements: int = STATEMENT_CACHE_SIZE, **kwargs) -> sqlite3.Connection:
+    """sqlite3.connect with a prepared-statement cache sized for repeated scripts."""
+    return sqlite3.connect(path, cached_statements=cached_statements, **kwargs)
+
+
+def normalize_statement(sql: str) -> str:
+    """
+    Canonical text of one statement: comments dropped, whitespace outside
+    literals collapsed, trailing semicolon removed. Statements that differ
+    only in layout then share one prepared statement in the cache.
+    """
+    if len(sql) > NORMALIZE_CACHE_MAX_CHARS:
+        return _normalize(sql)
+    return _normalize_cached(sql)
+
+
+def _normalize(sql: str) -> str:
+    def replace(m: re.Match) -> str:
+        return m.group("literal") or " "
+
+    return _SQL_SPACING.sub(replace, sql).strip().rstrip(";").rstrip()
+
+
+_normalize_cached = lru_cache(maxsize=1024)(_normalize)
+
+
+def execute(conn: sqlite3.Connection, sql: str, params: Params = ()) -> sqlite3.Cursor:
+    """Execute one statement with ? / :name parameters through the statement cache."""
+    return conn.execute(normalize_statement(sql), params)
+
+
+def executemany(conn: sqlite3.Connection, sql: str, seq_of_params: Iterable[Params]) -> int:
+    """
+    Execute one DML statement once per parameter set, prepared once.
+
+    Returns the total number of rows changed. Transaction control is left
+    to the caller, as with sqlite3.
+    """
+    return conn.executemany(normalize_statement(sql), seq_of_params).rowcount
+
+
+@dataclass
+class StatementResult:
+    """
+    Outcome of one statement from iter_sql_results.
+
+    For statements that return rows, ``rows`` is the statement's own live
+    cursor (so ``fetchmany`` works too) and nothing has been fetched yet;
+    for others it is empty and ``columns`` is None. ``elapsed`` is the
+    seconds spent preparing and starting the statement.
+
+    With a ResultCache, ``cached`` marks rows served from it, and a miss
+    that may be cached carries the ``cache_version`` to store it under.
+    """
+    statement: str
+    columns: Optional[List[str]]
+    rows: Iterator[tuple]
+    rowcount: int
+    elapsed: float
+    cached: bool = False
+    cache_version: Optional[int] = None
+
+
+def iter_sql_results(
+    conn: sqlite3.Connection,
+    sql: Union[str, TextIO, Iterable[str]],
+    cache: Optional[ResultCache] = None,
+    params: Optional[Params] = None,
+) -> Iterator[StatementResult]:
+    """Run a script lazily, one StatementResult per statement; rows are left unfetched."""
+    if params is None:
+        params = ()
+    for index, statement in enumerate(iter_sql_statements(sql)):
+        # Named parameters go to every statement, positional ones to a lone statement
+        if index and params and not isinstance(params, Mapping):
+            raise ValueError("Positional parameters need a single statement")
+        start = time.perf_counter()
+        version: Optional[int] = None
+        if cache is not None:
+            version, hit = cache.lookup(conn, statement, params)
+            if hit is not None:
+                columns, rows = hit
+                elapsed = time.perf_counter() - start
+                yield StatementResult(statement, columns, iter(rows), -1, elapsed, cached=True)
                 continue
-        
-        if in_block_comment:
-            i += 1
-            continue
-        
-        # Handle line comments --
-        if not in_string and char == '-' and i + 1 < len(sql) and sql[i + 1] == '-':
-            in_line_comment = True
-        
-        if in_line_comment:
-            if char == '\n':
-                in_line_comment = False
-            i += 1
-            continue
-        
-        # Handle string literals
-        if char in ('"', "'") and (i == 0 or sql[i-1] != '\\'):
-            if not in_string:
-                in_string = True
-                string_char = char
-            elif char == string_char:
-                in_string = False
-                string_char = None
-        
-        # Handle semicolon
-        if char == ';' and not in_string:
-            stmt = ''.join(current).strip()
-            if stmt:
-                statements.append(stmt)
-            current = []
+        cursor = execute(conn, statement, params)
+        elapsed = time.perf_counter() - start
+        if cursor.description:
+            columns = [d[0] for d in cursor.description]
+            yield StatementResult(
+                statement, columns, cursor, cursor.rowcount, elapsed, cache_version=version
+            )
         else:
-            current.append(char)
-        
-        i += 1
-    
-    # Add last statement if exists
-    stmt = ''.join(current).strip()
-    if stmt:
-        statements.append(stmt)
-    
-    return statements
+            rowcount = cursor.rowcount
+            cursor.close()
+            yield StatementResult(statement, None, iter(()), rowcount, elapsed)
 
 
-def execute_sql(conn: sqlite3.Connection, sql: str) -> Tuple[Optional[list[str]], list[tuple]]:
-    cursor = conn.cursor()
-
+def execute_sql(
+    conn: sqlite3.Connection, sql: str, params: Optional[Params] = None
+) -> Tuple[Optional[List[str]], List[tuple]]:
+    """Run a script through iter_sql_results; ``(columns, rows)`` of its last result set, or ``(None, message rows)``."""
     if not sql.strip():
         return None, [("No SQL",)]
-
+    columns: Optional[List[str]] = None
+    rows: List[tuple] = []
+    total_affected = 0
+    ran = False
     try:
-        # Split statements properly
-        statements = _split_sql_statements(sql)
-        
-        if not statements:
-            return None, [("No valid SQL statements",)]
-        
-        last_columns = None
-        last_rows = []
-        total_affected = 0
-        
-        for statement in statements:
-            if not statement:
-                continue
-                
-            cursor.execute(statement)
-            
-            # Check if this was a SELECT statement
-            if cursor.description:
-                last_columns = [d[0] for d in cursor.description]
-                last_rows = cursor.fetchall()
+        for result in iter_sql_results(conn, sql, params=params):
+            ran = True
+            if result.columns is None:
+                # DDL reports -1
+                total_affected += max(result.rowcount, 0)
             else:
-                # For INSERT, UPDATE, DELETE
-                total_affected += cursor.rowcount
-        
+                columns, rows = result.columns, list(result.rows)
         conn.commit()
-        
-        # If the last statement was a SELECT, return its results
-        if last_columns:
-            return last_columns, last_rows
-        
-        # Otherwise, return success message with row count
-        return None, [(f"Success: {total_affected} rows affected",)]
-        
-    except sqlite3.Error as e:
+    except (sqlite3.Error, ValueError) as e:
         conn.rollback()
-        return None, [(f"SQL Error: {str(e)}",)]
-    except Exception as e:
-        conn.rollback()
-        return None, [(f"Error: {str(e)}",)]
\ No newline at end of file
+        prefix = "SQL Error" if isinstance(e, sqlite3.Error) else "Error"
+        return None, [(f"{prefix}: {str(e)}",)]
+    if columns is not None:
+        return columns, rows
+    if not ran:
+        return None, [("No valid SQL statements",)]
+    return None, [(f"Success: {total_affected} rows affected",)]
+
+
+_CACHEABLE = re.compile(r"\s*(?:SELECT|VALUES|WITH)\b", re.IGNORECASE)
+# Writes hidden in a CTE and functions whose result changes between runs
+_UNCACHEABLE = re.compile(
+    r"\b(?:INSERT|UPDATE|DELETE|REPLACE|RETURNING|random|randomblob|changes|last_insert_rowid"
+    r"|CURRENT_TIMESTAMP|CURRENT_DATE|CURRENT_TIME)\b"
+    # Date and time functions default to the current time without a time value
+    r"|\b(?:date|time|datetime|julianday|unixepoch)\s*\(\s*\)"
+    r"|\bstrftime\s*\(\s*'(?:[^']|'')*'\s*\)"
+    r"|'now'",
+    re.IGNORECASE,
+)
+
+
+def _result_size(columns: List[str], rows: List[tuple]) -> int:
+    """Rough memory footprint of a result, for the cache's byte budget."""
+    size = sys.getsizeof(rows) + sum(sys.getsizeof(c) for c in columns)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row:
+            # Small ints and None are shared; count what a value adds
+            if value is not None:
+                size += sys.getsizeof(value)
+    return size
+
+
+class ResultCache:
+    """
+    LRU of SELECT results, bounded by their approximate size in bytes.
+
+    Entries are keyed by normalized SQL and parameters and are only valid
+    for one database version, read as ``PRAGMA data_version`` on a probe
+    connection of the cache's own. That value changes whenever another
+    connection commits (data or schema), and the probe never writes, so
+    any committed write from the app or elsewhere empties the cache.
+    Uncommitted changes are not visible to it: callers must not use the
+    cache inside a transaction (see ``lookup``). Safe to share between
+    threads.
+    """
+
+    def __init__(
+        self, db_path: str, max_bytes: int = 64 << 20, max_entry_bytes: int = 0, uri: bool = False
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 4
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._entries: "OrderedDict[tuple, Tuple[List[str], List[tuple], int]]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._probe = sqlite3.connect(db_path, check_same_thread=False, uri=uri)
+
+    @staticmethod
+    def cacheable(statement: str) -> bool:
+        """Whether a statement only reads, with a result that depends on the data alone."""
+        return bool(_CACHEABLE.match(statement)) and not _UNCACHEABLE.search(statement)
+
+    def version(self) -> int:
+        """The current data version; drops every entry when it moved."""
+        with self._lock:
+            version = self._probe.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._version:
+                self._entries.clear()
+                self._bytes = 0
+                self._version = version
+            return version
+
+    @staticmethod
+    def _key(statement: str, params: Params) -> tuple:
+        if isinstance(params, Mapping):
+            params = tuple(sorted(params.items()))
+        return normalize_statement(statement), tuple(params)
+
+    def lookup(
+        self, conn: sqlite3.Connection, statement: str, params: Params = ()
+    ) -> Tuple[Optional[int], Optional[Tuple[List[str], List[tuple]]]]:
+        """
+        ``(version, hit)`` for a statement about to run on conn.
+
+        ``hit`` is ``(columns, rows)`` or None. ``version`` is None when the
+        statement must bypass the cache (not cacheable, or conn has
+        uncommitted changes); otherwise pass it to ``store`` after a miss.
+        """
+        if conn.in_transaction or not self.cacheable(statement):
+            return None, None
+        version = self.version()
+        key = self._key(statement, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return version, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return version, (entry[0], entry[1])
+
+    def store(
+        self, version: int, statement: str, params: Params, columns: List[str], rows: List[tuple]
+    ) -> bool:
+        """Cache a complete result read at ``version``. Returns False if it was not kept."""
+        size = _result_size(columns, rows)
+        if size > self.max_entry_bytes:
+            return False
+        key = self._key(statement, params)
+        with self._lock:
+            if version != self._version:
+                return False  # the data changed while the statement ran
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (columns, rows, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+        return True
+
+    def execute(
+        self, conn: sqlite3.Connection, sql: str, params: Params = ()
+    ) -> Tuple[Optional[List[str]], List[tuple]]:
+        """Run one statement through the cache; returns ``(columns, rows)``."""
+        version, hit = self.lookup(conn, sql, params)
+        if hit is not None:
+            return hit
+        cursor = execute(conn, sql, params)
+        columns = [d[0] for d in cursor.description] if cursor.description else None
+        rows = cursor.fetchall()
+        if version is not None and columns is not None:
+            self.store(version, sql, params, columns, rows)
+        return columns, rows
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def close(self) -> None:
+        self.clear()
+        self._probe.close()
+
+
+@dataclass
+class PlanNode:
+    """One line of EXPLAIN QUERY PLAN output, with its child lines."""
+    detail: str
+    children: List[PlanNode] = field(default_factory=list)
+
+    @property
+    def full_scan(self) -> bool:
+        """A scan of a whole table rather than an index lookup ("SCAN t")."""
+        return self.detail.startswith("SCAN ") and " USING " not in self.detail
+
+    @property
+    def temp_btree(self) -> bool:
+        """A sort, DISTINCT/GROUP BY or compound query that builds a temporary index."""
+        return "TEMP B-TREE" in self.detail
+
+
+def explain_query_plan(
+    conn: sqlite3.Connection, statement: str, params: Params = ()
+) -> List[PlanNode]:
+    """
+    The query plan of one statement as a tree, without running it.
+
+    Returns the top-level nodes; statements without a plan (DDL) give an
+    empty list. Errors, e.g. unknown tables, propagate.
+    """
+    rows = conn.execute("EXPLAIN QUERY PLAN " + normalize_statement(statement), params).fetchall()
+    nodes: Dict[int, PlanNode] = {}
+    roots: List[PlanNode] = []
+    for node_id, parent_id, _, detail in rows:
+        node = PlanNode(detail)
+        nodes[node_id] = node
+        parent = nodes.get(parent_id)
+        (parent.children if parent is not None else roots).append(node)
+    return roots
+
+
+# Named connection settings. cache_size is in KiB when negative.
+#   interactive: WAL-safe defaults for the app; NORMAL sync only risks the
+#                last commits on power loss, never corruption, in WAL mode.
+#   bulk-load:   no fsync and a large page cache, for loads that can be
+#                repeated; an OS crash mid-load may corrupt the file.
+#   durable:     fsync on every commit and no memory mapping.
+PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    "interactive": {
+        "synchronous": "NORMAL",
+        "cache_size": -64_000,
+        "mmap_size": 256 << 20,
+        "temp_store": "MEMORY",
+    },
+    "bulk-load": {
+        "synchronous": "OFF",
+        "cache_size": -256_000,
+        "mmap_size": 256 << 20,
+        "temp_store": "MEMORY",
+    },
+    "durable": {
+        "synchronous": "FULL",
+        "cache_size": -16_000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+}
+BULK_LOAD_PRAGMAS = PRAGMA_PROFILES["bulk-load"]
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: Mapping[str, Any]) -> None:
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+
+
+@contextmanager
+def pragma_profile(conn: sqlite3.Connection, pragmas: Mapping[str, Any]) -> Iterator[None]:
+    """
+    Apply PRAGMA settings for the duration of a block, then restore them.
+    Settings a connection does not report (e.g. mmap_size on a memdb
+    database) are left alone.
+    """
+    saved = {}
+    for name in pragmas:
+        row = conn.execute(f"PRAGMA {name}").fetchone()
+        if row is not None:
+            saved[name] = row[0]
+    apply_pragmas(conn, {name: value for name, value in pragmas.items() if name in saved})
+    try:
+        yield
+    finally:
+        apply_pragmas(conn, saved)
+
+
+def column_affinity(declared_type: str) -> str:
+    """SQLite's type affinity for a declared column type (section 3.1 of its datatype docs)."""
+    declared = declared_type.upper()
+    if "INT" in declared:
+        return "INTEGER"
+    if "CHAR" in declared or "CLOB" in declared or "TEXT" in declared:
+        return "TEXT"
+    if "BLOB" in declared or not declared:
+        return "BLOB"
+    if "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+        return "REAL"
+    return "NUMERIC"
+
+
+@dataclass
+class LoadReport:
+    """Outcome of load_file."""
+    table: str
+    rows: int
+    seconds: float
+    columns: List[str] = field(default_factory=list)
+    ignored_columns: List[str] = field(default_factory=list)
+    cancelled: bool = False
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _csv_value(affinity: str) -> Optional[Callable[[str], Any]]:
+    # Numeric text is converted by the column's affinity inside SQLite;
+    # only empty cells need mapping, to NULL, for non-text columns.
+    if affinity == "TEXT":
+        return None
+    return lambda value: value if value != "" else None
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _iter_csv_rows(
+    f: TextIO, live: Dict[str, str]
+) -> Tuple[List[str], List[str], Iterator[tuple]]:
+    reader = csv.reader(f)
+    header = next(reader, [])
+    by_name = {name.lower(): name for name in live}
+    indexes: List[int] = []
+    columns: List[str] = []
+    ignored: List[str] = []
+    for index, name in enumerate(header):
+        column = by_name.get(name.strip().lower())
+        if column is None or column in columns:
+            ignored.append(name)
+            continue
+        indexes.append(index)
+        columns.append(column)
+    converters = [_csv_value(column_affinity(live[c])) for c in columns]
+
+    whole = indexes == list(range(len(header)))
+    # Rows passed through whole must have exactly the header's fields
+    checked = _checked_csv_rows(reader, len(header), exact=whole)
+    if whole and not any(converters):
+        rows: Iterator[tuple] = checked  # type: ignore[assignment]
+    elif not any(converters):
+        rows = (tuple(row[i] for i in indexes) for row in checked)
+    else:
+        pairs = [(i, conv) for i, conv in zip(indexes, converters)]
+        rows = (
+            tuple(row[i] if conv is None else conv(row[i]) for i, conv in pairs)
+            for row in checked
+        )
+    return columns, ignored, rows
+
+
+def _checked_csv_rows(reader: Any, width: int, exact: bool) -> Iterator[List[str]]:
+    """Skip blank lines; a row with fewer fields than the header is an error."""
+    for row in reader:
+        if len(row) == width or (len(row) > width and not exact):
+            yield row
+        elif row:
+            raise ValueError(f"CSV line {reader.line_num}: {len(row)} fields, the header has {width}")
+
+
+def _iter_jsonl_rows(
+    f: TextIO, live: Dict[str, str]
+) -> Tuple[List[str], List[str], Iterator[tuple]]:
+    lines = ((number, line) for number, line in enumerate(f, 1) if line.strip())
+    first_line = next(lines, None)
+    if first_line is None:
+        return [], [], iter(())
+    first = _json_record(*first_line)
+    by_name = {name.lower(): name for name in live}
+    keys: List[str] = []
+    columns: List[str] = []
+    ignored: List[str] = []
+    for key in first:
+        column = by_name.get(key.lower())
+        if column is None or column in columns:
+            ignored.append(key)
+            continue
+        keys.append(key)
+        columns.append(column)
+
+    def rows() -> Iterator[tuple]:
+        for number, line in itertools.chain((first_line,), lines):
+            record = _json_record(number, line)
+            # Keys missing from a record load as NULL
+            yield tuple(_json_value(record.get(key)) for key in keys)
+
+    return columns, ignored, rows()
+
+
+def _json_record(number: int, line: str) -> Dict[str, Any]:
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"JSON Lines line {number}: {e}") from None
+    if not isinstance(record, dict):
+        raise ValueError(f"JSON Lines line {number} is not an object")
+    return record
+
+
+def load_file(
+    conn: sqlite3.Connection,
+    table_name: str,
+    path: str,
+    fmt: Optional[str] = None,
+    chunk_rows: int = 50_000,
+    commit_rows: int = 500_000,
+    progress: Optional[Callable[[int], bool]] = None,
+) -> LoadReport:
+    """
+    Stream a CSV (with a header row) or JSON Lines file into a table.
+
+    Header names / first-record keys are matched case-insensitively to the
+    table's columns as created in the database, so FK columns added by the
+    generator can be filled too; others are ignored and columns absent
+    from the file are left NULL. ``fmt`` is "csv" or "jsonl" and defaults
+    from the file extension.
+
+    Rows are inserted with one prepared INSERT via executemany,
+    ``chunk_rows`` at a time, committing every ``commit_rows`` under
+    BULK_LOAD_PRAGMAS. ``progress`` is called with the running row count
+    after each chunk and may return False to stop. A failing chunk rolls
+    back the uncommitted part and the error propagates.
+    """
+    if fmt is None:
+        fmt = "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+    live = {
+        row[1]: row[2]
+        for row in conn.execute(f"PRAGMA table_info({_quote_identifier(table_name)})")
+    }
+    if not live:
+        raise ValueError(f"Table '{table_name}' does not exist in the database")
+
+    start = time.perf_counter()
+    report = LoadReport(table_name, 0, 0.0)
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8") as f, \
+            pragma_profile(conn, BULK_LOAD_PRAGMAS):
+        iter_rows = _iter_csv_rows if fmt == "csv" else _iter_jsonl_rows
+        report.columns, report.ignored_columns, rows = iter_rows(f, live)
+        if report.columns:
+            insert = normalize_statement(
+                f"INSERT INTO {_quote_identifier(table_name)} "
+                f"({', '.join(_quote_identifier(c) for c in report.columns)}) "
+                f"VALUES ({', '.join('?' * len(report.columns))})"
+            )
+            if conn.in_transaction:
+                conn.commit()
+            uncommitted = 0
+            try:
+                conn.execute("BEGIN")
+                while True:
+                    chunk = list(itertools.islice(rows, chunk_rows))
+                    if not chunk:
+                        break
+                    executemany(conn, insert, chunk)
+                    report.rows += len(chunk)
+                    uncommitted += len(chunk)
+                    if uncommitted >= commit_rows:
+                        conn.commit()
+                        conn.execute("BEGIN")
+                        uncommitted = 0
+                    if progress is not None and progress(report.rows) is False:
+                        report.cancelled = True
+                        break
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+EXPORT_FORMATS = ("csv", "jsonl", "columnar")
+
+
+@dataclass
+class ExportReport:
+    """Outcome of export_query."""
+    rows: int
+    seconds: float
+    columns: List[str] = field(default_factory=list)
+    cancelled: bool = False
+
+
+def _export_text(value: Any) -> Any:
+    # BLOBs are written as hex; CSV/JSON have no binary type
+    return value.hex() if isinstance(value, bytes) else value
+
+
+def export_query(
+    conn: sqlite3.Connection,
+    sql: str,
+    path: str,
+    fmt: Optional[str] = None,
+    params: Optional[Params] = None,
+    batch_size: int = 10_000,
+    progress: Optional[Callable[[int], bool]] = None,
+) -> ExportReport:
+    """
+    Run a query and stream its last result set straight into a file.
+
+    Rows are read with ``fetchmany(batch_size)`` and written batch by
+    batch, so memory stays bounded whatever the row count. ``fmt`` is one
+    of EXPORT_FORMATS and defaults from the extension (.jsonl/.ndjson,
+    .npz for columnar, else CSV). "columnar" writes one NumPy array per
+    column per batch (see columnar.ColumnarWriter) and needs NumPy.
+    ``progress`` works as in load_file.
+
+    ``params`` are bound as in iter_sql_results: named parameters to every
+    statement, positional ones only to a single-statement query.
+    """
+    if fmt is None:
+        lower = path.lower()
+        if lower.endswith((".jsonl", ".ndjson")):
+            fmt = "jsonl"
+        elif lower.endswith(".npz"):
+            fmt = "columnar"
+        else:
+            fmt = "csv"
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    start = time.perf_counter()
+    statements = list(iter_sql_statements(sql))
+    if not statements:
+        raise ValueError("No SQL statements to export")
+    if params is None:
+        params = ()
+    elif len(statements) > 1 and not isinstance(params, Mapping):
+        raise ValueError("Positional parameters need a single statement")
+    cursor: Optional[sqlite3.Cursor] = None
+    try:
+        for statement in statements[:-1]:
+            execute(conn, statement, params).close()
+        cursor = execute(conn, statements[-1], params)
+        if not cursor.description:
+            raise ValueError("The last statement does not return rows")
+        report = ExportReport(0, 0.0, [d[0] for d in cursor.description])
+
+        batches = iter(lambda: cursor.fetchmany(batch_size), [])
+        if fmt == "columnar":
+            from .columnar import ColumnarWriter
+
+            writer = ColumnarWriter(path, report.columns)
+            try:
+                for batch in batches:
+                    writer.write_batch(batch)
+                    report.rows += len(batch)
+                    if progress is not None and progress(report.rows) is False:
+                        report.cancelled = True
+                        break
+            finally:
+                writer.close()
+        else:
+            with open(path, "w", newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+                if fmt == "csv":
+                    csv_writer = csv.writer(f)
+                    csv_writer.writerow(report.columns)
+                for batch in batches:
+                    if fmt == "csv":
+                        csv_writer.writerows(
+                            row if not any(isinstance(v, bytes) for v in row)
+                            else [_export_text(v) for v in row]
+                            for row in batch
+                        )
+                    else:
+                        f.writelines(
+                            json.dumps(dict(zip(report.columns, row)), default=_export_text) + "\n"
+                            for row in batch
+                        )
+                    report.rows += len(batch)
+                    if progress is not None and progress(report.rows) is False:
+                        report.cancelled = True
+                        break
+        if conn.in_transaction:
+            conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        if cursor is not None:
+            cursor.close()
+    report.seconds = time.perf_counter() - start
+    return report
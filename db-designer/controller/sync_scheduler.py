@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from PySide6.QtCore import QObject, QThread, QTimer, Signal
+
+from . import migration
+from .connection_manager import ConnectionManager
+from .sql_engine import DDLCache
+from .worker_threads import WorkerThreads
+
+
+# Milliseconds without model changes before the database is synced
+SYNC_DELAY = 400
+
+
+@dataclass
+class SyncReport:
+    """Outcome of one sync_database run."""
+    steps: int = 0
+    failed: int = 0
+    rebuilt: bool = False
+    # Tables that lost their rows in a rebuild because they did not fit
+    emptied: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def sync_database(
+    conn: sqlite3.Connection, statements: List[Tuple[str, str]], in_memory: bool = False
+) -> SyncReport:
+    """
+    Bring the database in line with ``(table name, CREATE TABLE)`` pairs,
+    keeping existing data where migration can, else rebuilding it in a
+    shadow database that is swapped in whole (see rebuild_via_shadow).
+    """
+    start = time.perf_counter()
+    report = SyncReport()
+    try:
+        try:
+            steps = migration.plan_migration(conn, statements)
+            report.steps = len(steps)
+            report.failed = len(migration.apply_migration(conn, steps))
+        except sqlite3.Error:
+            # Fall back to a full rebuild if the live database can't be diffed
+            report.rebuilt = True
+            shadow = migration.rebuild_via_shadow(conn, statements, in_memory=in_memory)
+            report.emptied = shadow.skipped
+    except sqlite3.Error as e:
+        report.error = str(e)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+class SyncWorker(QObject):
+    """Runs sync_database for one snapshot of the schema's DDL."""
+
+    finished = Signal(object)  # SyncReport
+
+    def __init__(
+        self, conn: sqlite3.Connection, statements: List[Tuple[str, str]], in_memory: bool = False
+    ) -> None:
+        super().__init__()
+        self._conn = conn
+        self._statements = statements
+        self._in_memory = in_memory
+        self.report: Optional[SyncReport] = None
+
+    def run(self) -> None:
+        self.report = sync_database(self._conn, self._statements, self._in_memory)
+        self.finished.emit(self.report)
+
+
+class SyncScheduler(QObject):
+    """
+    Coalesces bursts of model changes into one database sync.
+
+    ``request()`` (re)starts a quiet period of ``delay`` milliseconds;
+    when it ends, the current DDL of the schema is taken on the GUI thread
+    (cheap through DDLCache) and applied on a worker thread with a
+    connection of the scheduler's own. Requests made while a sync runs
+    are merged into one more sync after it. ``sync_now()`` is for callers
+    that need the database current, like the SQL console.
+    """
+
+    status_changed = Signal(str)
+    synced = Signal(object)  # SyncReport
+
+    def __init__(
+        self, manager: ConnectionManager, ddl: DDLCache, delay: int = SYNC_DELAY, parent: Optional[QObject] = None
+    ) -> None:
+        super().__init__(parent)
+        self._ddl = ddl
+        self._in_memory = manager.in_memory
+        # Used by one thread at a time: the worker, or sync_now once it is done
+        self._conn = manager.connect(check_same_thread=False)
+        self._pending = False
+        # Pending, but left for sync_now or the next edit (see request)
+        self._deferred = False
+        self._running: Optional[Tuple[QThread, SyncWorker]] = None
+        self._threads = WorkerThreads(self)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self._start)
+
+    def is_pending(self) -> bool:
+        return self._pending or self._running is not None
+
+    def is_deferred(self) -> bool:
+        return self._deferred
+
+    def request(self, defer: bool = False) -> None:
+        """
+        Note a model change; the sync waits until changes stop for a moment.
+        With ``defer`` it waits until sync_now() or the next request instead,
+        e.g. after opening a lazily loaded project, where generating the DDL
+        would decode every table.
+        """
+        self._pending = True
+        self._deferred = defer
+        if defer:
+            self._timer.stop()
+            self.status_changed.emit("Database not synced yet; it will be before it is used")
+        elif self._running is None:
+            self._timer.start()
+            self.status_changed.emit("Schema changes pending…")
+
+    def sync_now(self) -> Optional[SyncReport]:
+        """
+        Block until the database matches the schema. Returns the report of
+        the last sync this took, or None if nothing was pending or running.
+        """
+        self._timer.stop()
+        report: Optional[SyncReport] = None
+        if self._running is not None:
+            thread, worker = self._running
+            # Its finished signal is still queued; _on_worker_finished skips it
+            self._running = None
+            thread.quit()
+            thread.wait()
+            report = worker.report
+        self._deferred = False
+        if self._pending:
+            self._pending = False
+            report = sync_database(self._conn, list(self._ddl.iter_named_statements()), self._in_memory)
+        if report is not None:
+            self._report(report)
+        return report
+
+    def stop(self) -> None:
+        """Drop pending requests, wait for a running sync and close the connection."""
+        self._timer.stop()
+        self._pending = False
+        self._threads.wait()
+        self._running = None
+        self._conn.close()
+
+    def _start(self) -> None:
+        if self._running is not None or not self._pending:
+            return
+        self._pending = False
+        worker = SyncWorker(self._conn, list(self._ddl.iter_named_statements()), self._in_memory)
+        worker.finished.connect(self._on_worker_finished)
+        self.status_changed.emit("Syncing database…")
+        self._running = (self._threads.start(worker), worker)
+
+    def _on_worker_finished(self, report: SyncReport) -> None:
+        if self._running is None or self._running[1] is not self.sender():
+            return  # already waited for and reported by sync_now
+        self._running = None
+        self._report(report)
+        if self._pending and not self._deferred:
+            self._timer.start()
+
+    def _report(self, report: SyncReport) -> None:
+        if report.error is not None:
+            self.status_changed.emit(f"⚠️ Sync failed: {report.error}")
+        elif report.failed:
+            self.status_changed.emit(f"⚠️ {report.failed} of {report.steps} schema changes could not be applied")
+        elif report.rebuilt and report.emptied:
+            self.status_changed.emit(f"⚠️ Database rebuilt; rows of {', '.join(report.emptied)} did not fit")
+        elif report.rebuilt:
+            self.status_changed.emit(f"Database rebuilt in {report.seconds:.2f}s")
+        else:
+            self.status_changed.emit(f"Database in sync ({report.steps} changes, {report.seconds:.2f}s)")
+        self.synced.emit(report)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from PySide6.QtCore import QObject, QThread
+
+
+class WorkerThreads(QObject):
+    """
+    Runs one-shot workers, each on a QThread of its own.
+
+    A worker is a QObject with a ``run()`` slot and a ``finished`` signal.
+    Threads and their workers are kept alive until the thread has stopped;
+    they are released by a slot of this object, so on the thread it lives
+    in (the GUI thread), never concurrently with ``wait()``.
+    """
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._threads: List[Tuple[QThread, QObject]] = []
+
+    def start(self, worker: QObject) -> QThread:
+        """
+        Move ``worker`` to a new thread and run it there. Connect to its
+        signals before calling this.
+        """
+        thread = QThread()
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(self._on_thread_finished)
+        self._threads.append((thread, worker))
+        thread.start()
+        return thread
+
+    def wait(self) -> None:
+        """Block until every started thread has stopped."""
+        for thread, _ in list(self._threads):
+            # quit() here: the queued one from the worker needs the event loop
+            thread.quit()
+            thread.wait()
+
+    def _on_thread_finished(self) -> None:
+        thread = self.sender()
+        self._threads = [entry for entry in self._threads if entry[0] is not thread]
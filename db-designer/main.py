@@ -12,7 +12,14 @@ def main() -> None:
 
     schema = Schema()
     main_window = MainWindow()
-    controller = SchemaController(schema, main_window)  # IMPORTANT: keep a reference
+    # --in-memory: edit a memory copy of the database, saved to disk in the background
+    in_memory = "--in-memory" in app.arguments()
+    controller = SchemaController(schema, main_window, in_memory)  # IMPORTANT: keep a reference
+
+    # An optional project file to open
+    paths = [arg for arg in app.arguments()[1:] if not arg.startswith("-")]
+    if paths:
+        controller.on_open_project(paths[0])
 
     main_window.show()
     sys.exit(app.exec())
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Attribute:
     """Represents a column/attribute of a table in the schema model."""
     name: str
@@ -11,3 +12,9 @@ class Attribute:
     is_primary_key: bool = False
     is_nullable: bool = True
     is_unique: bool = False
+
+    def __post_init__(self) -> None:
+        # Column names and types repeat across tables ("id", "INTEGER", ...);
+        # interning lets every attribute share one copy of each string.
+        self.name = sys.intern(self.name)
+        self.data_type = sys.intern(self.data_type)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .attribute import Attribute
+from .relationship import Relationship
+from .table import Table
+
+
+@dataclass(frozen=True, slots=True)
+class SchemaEvent:
+    """Base class for changes published by Schema to its subscribers."""
+
+
+@dataclass(frozen=True, slots=True)
+class TableAdded(SchemaEvent):
+    table: Table
+
+
+@dataclass(frozen=True, slots=True)
+class TableRemoved(SchemaEvent):
+    table: Table
+
+
+@dataclass(frozen=True, slots=True)
+class TableRenamed(SchemaEvent):
+    table: Table
+    old_name: str
+
+
+@dataclass(frozen=True, slots=True)
+class AttributeAdded(SchemaEvent):
+    table: Table
+    attribute: Attribute
+
+
+@dataclass(frozen=True, slots=True)
+class AttributeRemoved(SchemaEvent):
+    table: Table
+    attribute: Attribute
+
+
+@dataclass(frozen=True, slots=True)
+class RelationshipAdded(SchemaEvent):
+    relationship: Relationship
+
+
+@dataclass(frozen=True, slots=True)
+class RelationshipRemoved(SchemaEvent):
+    relationship: Relationship
@@ -0,0 +1,520 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Any, BinaryIO, Dict, Iterator, List, TextIO, Tuple
+
+from .attribute import Attribute
+from .frozen_schema import FLAG_NULLABLE, FLAG_PRIMARY_KEY, FLAG_UNIQUE, REL_TYPES, FrozenSchema
+from .relationship import Relationship
+from .schema import Schema
+from .table import LazyTable, Table
+
+
+JSON_FORMAT = "db-designer-project"
+BINARY_MAGIC = b"DBDP"
+PROJECT_VERSION = 1
+# File extension of the binary format; anything else is written as JSON
+BINARY_SUFFIX = ".dbd"
+MAPPED_MAGIC = b"DBDX"
+MAPPED_SUFFIX = ".dbdx"
+
+# magic, version, string count, string bytes, tables, attributes, relationships
+_HEADER = struct.Struct("<4sH2xIIIII")
+# magic, version, string count, tables, attributes, relationships
+_MAPPED_HEADER = struct.Struct("<4sH2xIIII")
+_CHUNK = 1 << 16
+
+Position = Tuple[int, int]
+
+
+@dataclass
+class Project:
+    """A schema plus the canvas position of each table, by table name."""
+    schema: Schema = field(default_factory=Schema)
+    positions: Dict[str, Position] = field(default_factory=dict)
+
+
+class ProjectFormatError(ValueError):
+    """The file is not a project file this version can read."""
+
+
+# What the binary readers raise on a truncated or corrupt file, e.g. a
+# string id past the string table or a string that is not UTF-8; the JSON
+# reader checks the shape of each entry itself
+_DECODE_ERRORS = (struct.error, UnicodeDecodeError, IndexError)
+
+
+def _flags(attr: Attribute) -> int:
+    return (
+        (FLAG_PRIMARY_KEY if attr.is_primary_key else 0)
+        | (FLAG_NULLABLE if attr.is_nullable else 0)
+        | (FLAG_UNIQUE if attr.is_unique else 0)
+    )
+
+
+# (is_primary_key, is_nullable, is_unique) per flags value, so loading
+# an attribute is a single positional constructor call
+_FLAG_FIELDS = [
+    (bool(flags & FLAG_PRIMARY_KEY), bool(flags & FLAG_NULLABLE), bool(flags & FLAG_UNIQUE))
+    for flags in range(8)
+]
+
+
+# JSON
+
+def write_json(project: Project, f: TextIO) -> None:
+    """
+    Write a project as JSON, one table per line, without building the
+    document in memory first.
+
+    Layout: ``{"format", "version", "tables": [{"name", "x", "y",
+    "attributes": [[name, type, flags], ...]}, ...], "relationships":
+    [[table_a, table_b, type], ...]}``; ``flags`` uses the FLAG_* bits of
+    frozen_schema. Tables without a position have no "x"/"y".
+    """
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    f.write(f'{{"format":{dumps(JSON_FORMAT)},"version":{PROJECT_VERSION},"tables":[')
+    for i, table in enumerate(project.schema.tables):
+        item: Dict[str, Any] = {"name": table.name}
+        position = project.positions.get(table.name)
+        if position is not None:
+            item["x"], item["y"] = position
+        item["attributes"] = [[a.name, a.data_type, _flags(a)] for a in table.attributes]
+        f.write(("\n" if i == 0 else ",\n") + dumps(item))
+    f.write('\n],"relationships":[')
+    for i, rel in enumerate(project.schema.relationships):
+        f.write(("\n" if i == 0 else ",\n") + dumps([rel.table_a.name, rel.table_b.name, rel.rel_type]))
+    f.write("\n]}\n")
+
+
+class _JsonStream:
+    """Pulls JSON tokens and values from a text file a chunk at a time."""
+
+    def __init__(self, f: TextIO) -> None:
+        self._f = f
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decode = json.JSONDecoder().raw_decode
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(_CHUNK)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character, or "" at the end."""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of ``chars``."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ProjectFormatError(f"Expected one of {chars!r}, found {char!r}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if not self._fill():
+                    raise ProjectFormatError(f"Invalid JSON: {e}") from None
+                continue
+            # A number may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def items(self) -> Iterator[Any]:
+        """The values of an array, one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def read_json(f: TextIO) -> Project:
+    """Read a project written by write_json, keeping only one table's JSON at a time."""
+    project = Project()
+    schema = project.schema
+    stream = _JsonStream(f)
+    stream.expect("{")
+    with schema.batch():
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.expect(":")
+            if key == "tables":
+                for item in stream.items():
+                    table = _json_table(item)
+                    schema.add_table(table)
+                    if "x" in item:
+                        project.positions[table.name] = _json_position(item)
+            elif key == "relationships":
+                for entry in stream.items():
+                    if not _is_row(entry, (str, str, str)) or entry[2] not in REL_TYPES:
+                        raise ProjectFormatError(f"Invalid relationship: {entry!r}")
+                    a_name, b_name, rel_type = entry
+                    table_a = schema.find_table(a_name)
+                    table_b = schema.find_table(b_name)
+                    if table_a is not None and table_b is not None:
+                        schema.add_relationship(Relationship(table_a, table_b, rel_type))
+            else:
+                value = stream.value()
+                if key == "format" and value != JSON_FORMAT:
+                    raise ProjectFormatError(f"Not a project file: format {value!r}")
+                if key == "version" and (type(value) is not int or value > PROJECT_VERSION):
+                    raise ProjectFormatError(f"Project version {value} is newer than supported")
+            if stream.expect(",}") == "}":
+                break
+    return project
+
+
+def _is_row(value: Any, types: Tuple[type, ...]) -> bool:
+    """Whether value is a JSON array of exactly these item types."""
+    return (
+        type(value) is list and len(value) == len(types)
+        and all(type(item) is t for item, t in zip(value, types))
+    )
+
+
+_ATTRIBUTE_ROW = (str, str, int)
+
+
+def _json_table(item: Any) -> Table:
+    if type(item) is not dict or type(item.get("name")) is not str:
+        raise ProjectFormatError(f"Invalid table: {item!r}")
+    attributes = item.get("attributes", [])
+    if type(attributes) is not list or not all(_is_row(a, _ATTRIBUTE_ROW) for a in attributes):
+        raise ProjectFormatError(f"Invalid attributes of table {item['name']!r}")
+    return Table(item["name"], [
+        Attribute(name, data_type, *_FLAG_FIELDS[flags & 7])
+        for name, data_type, flags in attributes
+    ])
+
+
+def _json_position(item: Dict[str, Any]) -> Position:
+    position = [item.get("x"), item.get("y")]
+    if not _is_row(position, (int, int)):
+        raise ProjectFormatError(f"Invalid position of table {item['name']!r}")
+    return position[0], position[1]
+
+
+# Binary
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def _read_array(f: BinaryIO, typecode: str, count: int) -> array:
+    values = array(typecode)
+    try:
+        values.fromfile(f, count)
+    except (EOFError, ValueError):
+        # ValueError: the file ends inside a value
+        raise ProjectFormatError("Project file is truncated") from None
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _read_bytes(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) < size:
+        raise ProjectFormatError("Project file is truncated")
+    return data
+
+
+def write_binary(project: Project, f: BinaryIO) -> None:
+    """
+    Write a project in the compact binary format.
+
+    After a fixed header come the sections of a FrozenSchema as
+    little-endian arrays: the string table (lengths, then the strings as
+    one UTF-8 block), table name ids, attribute offsets, attribute name
+    ids, type ids and flag bytes, relationship endpoints and kinds, and
+    finally an (x, y) pair per table, with -1 for "no position".
+    """
+    frozen = FrozenSchema.from_schema(project.schema)
+    blob = "".join(frozen.strings).encode("utf-8")
+    f.write(_HEADER.pack(
+        BINARY_MAGIC, PROJECT_VERSION, len(frozen.strings), len(blob),
+        len(frozen.table_names), len(frozen.attr_names), len(frozen.rel_a),
+    ))
+    _little_endian(array("I", map(len, frozen.strings))).tofile(f)
+    f.write(blob)
+    for values in (frozen.table_names, frozen.attr_offsets, frozen.attr_names, frozen.attr_types):
+        _little_endian(values).tofile(f)
+    f.write(frozen.attr_flags)
+    _little_endian(frozen.rel_a).tofile(f)
+    _little_endian(frozen.rel_b).tofile(f)
+    f.write(frozen.rel_kinds)
+    positions = array("i")
+    for name in map(frozen.strings.__getitem__, frozen.table_names):
+        positions.extend(project.positions.get(name, (-1, -1)))
+    _little_endian(positions).tofile(f)
+
+
+def read_binary(f: BinaryIO) -> Project:
+    """Read a project written by write_binary."""
+    header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size or header[:4] != BINARY_MAGIC:
+        raise ProjectFormatError("Not a binary project file")
+    _, version, string_count, blob_size, table_count, attr_count, rel_count = _HEADER.unpack(header)
+    if version > PROJECT_VERSION:
+        raise ProjectFormatError(f"Project version {version} is newer than supported")
+
+    lengths = _read_array(f, "I", string_count)
+    text = _read_bytes(f, blob_size).decode("utf-8")
+    ends = list(accumulate(lengths))
+    strings = [sys.intern(text[end - n:end]) for n, end in zip(lengths, ends)]
+    del text, ends
+    table_names = _read_array(f, "I", table_count)
+    attr_offsets = _read_array(f, "I", table_count + 1)
+    attr_names = _read_array(f, "I", attr_count)
+    attr_types = _read_array(f, "I", attr_count)
+    attr_flags = _read_bytes(f, attr_count)
+    rel_a = _read_array(f, "I", rel_count)
+    rel_b = _read_array(f, "I", rel_count)
+    rel_kinds = _read_bytes(f, rel_count)
+    positions = _read_array(f, "i", 2 * table_count)
+
+    project = Project()
+    schema = project.schema
+    tables = []
+    with schema.batch():
+        for i, name_id in enumerate(table_names):
+            start, end = attr_offsets[i], attr_offsets[i + 1]
+            table = Table(strings[name_id], [
+                Attribute(strings[name], strings[data_type], *_FLAG_FIELDS[flags & 7])
+                for name, data_type, flags in zip(
+                    attr_names[start:end], attr_types[start:end], attr_flags[start:end]
+                )
+            ])
+            tables.append(table)
+            schema.add_table(table)
+            x, y = positions[2 * i], positions[2 * i + 1]
+            if x != -1 or y != -1:
+                project.positions[table.name] = (x, y)
+        for a, b, kind in zip(rel_a, rel_b, rel_kinds):
+            schema.add_relationship(Relationship(tables[a], tables[b], REL_TYPES[kind]))
+    return project
+
+
+# Memory-mapped
+
+def _pad(f: BinaryIO, size: int) -> None:
+    """Keep the next section 4-byte aligned."""
+    f.write(b"\0" * (-size % 4))
+
+
+def write_mapped(project: Project, f: BinaryIO) -> None:
+    """
+    Write a project in the indexed format MappedProject opens lazily.
+
+    Same sections as write_binary, all 4-byte aligned, except that the
+    string table holds byte offsets so any one string can be decoded on
+    its own, and positions follow the table names, so that opening a
+    file touches neither the attribute sections nor unused strings.
+    """
+    frozen = FrozenSchema.from_schema(project.schema)
+    encoded = [value.encode("utf-8") for value in frozen.strings]
+    offsets = array("I", [0])
+    offsets.extend(accumulate(map(len, encoded)))
+    f.write(_MAPPED_HEADER.pack(
+        MAPPED_MAGIC, PROJECT_VERSION, len(encoded),
+        len(frozen.table_names), len(frozen.attr_names), len(frozen.rel_a),
+    ))
+    _little_endian(offsets).tofile(f)
+    f.write(b"".join(encoded))
+    _pad(f, offsets[-1])
+    del encoded
+    positions = array("i")
+    for name in map(frozen.strings.__getitem__, frozen.table_names):
+        positions.extend(project.positions.get(name, (-1, -1)))
+    for values in (
+        frozen.table_names, positions, frozen.attr_offsets, frozen.attr_names, frozen.attr_types,
+    ):
+        _little_endian(values).tofile(f)
+    f.write(frozen.attr_flags)
+    _pad(f, len(frozen.attr_flags))
+    _little_endian(frozen.rel_a).tofile(f)
+    _little_endian(frozen.rel_b).tofile(f)
+    f.write(frozen.rel_kinds)
+
+
+class MappedProject:
+    """
+    A project file written by write_mapped, opened with mmap.
+
+    Opening reads the header and locates the sections without copying
+    them. ``project()`` then decodes just the table names, positions and
+    relationships, and hands out LazyTable stubs whose attributes are
+    decoded from the mapping when first needed. Strings are decoded once
+    each, on first use. The mapping stays open while any stub needs it.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _MAPPED_HEADER.size:
+                raise ProjectFormatError("Not a mapped project file")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, version, string_count, table_count, attr_count, rel_count = (
+            _MAPPED_HEADER.unpack_from(view)
+        )
+        if magic != MAPPED_MAGIC:
+            raise ProjectFormatError("Not a mapped project file")
+        if version > PROJECT_VERSION:
+            raise ProjectFormatError(f"Project version {version} is newer than supported")
+
+        self._view = view
+        self._pos = _MAPPED_HEADER.size
+        self._string_offsets = self._section("I", string_count + 1)
+        self._blob = self._section("B", self._string_offsets[-1])
+        self._table_names = self._section("I", table_count)
+        self._positions = self._section("i", 2 * table_count)
+        self._attr_offsets = self._section("I", table_count + 1)
+        self._attr_names = self._section("I", attr_count)
+        self._attr_types = self._section("I", attr_count)
+        self._attr_flags = self._section("B", attr_count)
+        self._rel_a = self._section("I", rel_count)
+        self._rel_b = self._section("I", rel_count)
+        self._rel_kinds = self._section("B", rel_count)
+        self._strings: Dict[int, str] = {}
+
+    def _section(self, typecode: str, count: int):
+        """The next ``count`` values, as a view into the mapping where possible."""
+        size = count * (1 if typecode == "B" else 4)
+        start, end = self._pos, self._pos + size
+        if end > len(self._view):
+            raise ProjectFormatError("Project file is truncated")
+        self._pos = end + (-size % 4)
+        if typecode == "B":
+            return self._view[start:end]
+        if sys.byteorder == "big":
+            values = array(typecode, self._view[start:end])
+            values.byteswap()
+            return values
+        return self._view[start:end].cast(typecode)
+
+    def string(self, string_id: int) -> str:
+        value = self._strings.get(string_id)
+        if value is None:
+            start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+            value = sys.intern(str(self._blob[start:end], "utf-8"))
+            self._strings[string_id] = value
+        return value
+
+    def attributes(self, index: int) -> List[Attribute]:
+        """Decode the attributes of the table at ``index``."""
+        start, end = self._attr_offsets[index], self._attr_offsets[index + 1]
+        string = self.string
+        try:
+            return [
+                Attribute(string(name), string(data_type), *_FLAG_FIELDS[flags & 7])
+                for name, data_type, flags in zip(
+                    self._attr_names[start:end], self._attr_types[start:end], self._attr_flags[start:end]
+                )
+            ]
+        except (IndexError, UnicodeDecodeError) as e:
+            raise ProjectFormatError(f"Project file is corrupt: {e}") from e
+
+    def project(self) -> Project:
+        project = Project()
+        schema = project.schema
+        positions = self._positions
+        tables = []
+        with schema.batch():
+            for i, name_id in enumerate(self._table_names):
+                table = LazyTable(self.string(name_id), self, i)
+                tables.append(table)
+                schema.add_table(table)
+                x, y = positions[2 * i], positions[2 * i + 1]
+                if x != -1 or y != -1:
+                    project.positions[table.name] = (x, y)
+            for a, b, kind in zip(self._rel_a, self._rel_b, self._rel_kinds):
+                schema.add_relationship(Relationship(tables[a], tables[b], REL_TYPES[kind]))
+        return project
+
+
+def save_project(project: Project, path: str) -> None:
+    """
+    Save to ``path``: BINARY_SUFFIX and MAPPED_SUFFIX files in those
+    formats, JSON otherwise. The file is replaced only once fully written,
+    which also keeps a project mapped from it readable.
+    """
+    partial = path + ".partial"
+    suffix = os.path.splitext(path)[1].lower()
+    try:
+        if suffix == MAPPED_SUFFIX:
+            with open(partial, "wb") as f:
+                write_mapped(project, f)
+        elif suffix == BINARY_SUFFIX:
+            with open(partial, "wb") as f:
+                write_binary(project, f)
+        else:
+            with open(partial, "w", encoding="utf-8", newline="\n") as f:
+                write_json(project, f)
+    except BaseException:
+        # Leave no half-written file behind; the old project stays as it was
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+        raise
+    os.replace(partial, path)
+
+
+def load_project(path: str) -> Project:
+    """
+    Load a project file of any format, recognized by its first bytes.
+    Mapped files are opened lazily (see MappedProject). Raises
+    ProjectFormatError for files that cannot be decoded.
+    """
+    try:
+        with open(path, "rb") as f:
+            magic = f.read(len(BINARY_MAGIC))
+            if magic == BINARY_MAGIC:
+                f.seek(0)
+                return read_binary(f)
+        if magic == MAPPED_MAGIC:
+            return MappedProject(path).project()
+        with open(path, "r", encoding="utf-8") as f:
+            return read_json(f)
+    except ProjectFormatError:
+        raise
+    except _DECODE_ERRORS as e:
+        raise ProjectFormatError(f"Project file is corrupt: {e}") from e
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from .table import Table
 
 
-@dataclass
+@dataclass(slots=True)
 class Relationship:
     """Represents a relationship between two tables."""
     table_a: Table
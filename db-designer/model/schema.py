@@ -1,44 +1,258 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional
 
+from .attribute import Attribute
 from .table import Table
 from .relationship import Relationship
+from .events import (
+    SchemaEvent,
+    TableAdded,
+    TableRemoved,
+    TableRenamed,
+    AttributeAdded,
+    AttributeRemoved,
+    RelationshipAdded,
+    RelationshipRemoved,
+)
+
+
+PairKey = FrozenSet[int]
+Subscriber = Callable[[List[SchemaEvent]], None]
+
+
+def _pair_key(table_a: Table, table_b: Table) -> PairKey:
+    """Unordered key identifying the relationship slot between two tables.
+
+    Keys use object identity rather than names so that renaming a table
+    never invalidates the relationship index.
+    """
+    return frozenset((id(table_a), id(table_b)))
+
+
+@dataclass(slots=True)
+class TableEdges:
+    """Relationships touching one table, split by direction.
+
+    ``outgoing`` holds relationships where the table is ``table_a`` (the
+    "1" side of a 1-N), ``incoming`` those where it is ``table_b`` (the
+    side that receives the foreign key).
+    """
+    outgoing: Dict[PairKey, Relationship] = field(default_factory=dict)
+    incoming: Dict[PairKey, Relationship] = field(default_factory=dict)
 
 
-@dataclass
 class Schema:
     """Root schema model holding tables and relationships."""
-    tables: List[Table] = field(default_factory=list)
-    relationships: List[Relationship] = field(default_factory=list)
+
+    __slots__ = (
+        "_tables",
+        "_table_order",
+        "_relationships",
+        "_edges",
+        "_subscribers",
+        "_pending",
+        "_batch_depth",
+        "_version",
+    )
+
+    def __init__(
+        self,
+        tables: Optional[Iterable[Table]] = None,
+        relationships: Optional[Iterable[Relationship]] = None,
+    ) -> None:
+        self._tables: Dict[str, Table] = {}
+        # id(table) -> table, in insertion order; unaffected by renames
+        self._table_order: Dict[int, Table] = {}
+        self._relationships: Dict[PairKey, Relationship] = {}
+        self._edges: Dict[int, TableEdges] = {}
+        self._subscribers: List[Subscriber] = []
+        self._pending: List[SchemaEvent] = []
+        self._batch_depth = 0
+        self._version = 0
+
+        for table in tables or ():
+            self.add_table(table)
+        for relationship in relationships or ():
+            self.add_relationship(relationship)
+
+    def __repr__(self) -> str:
+        return f"Schema(tables={self.tables!r}, relationships={self.relationships!r})"
+
+    @property
+    def tables(self) -> List[Table]:
+        """Tables in insertion order (a snapshot; mutate via the Schema API)."""
+        return list(self._table_order.values())
+
+    @property
+    def relationships(self) -> List[Relationship]:
+        """Relationships in insertion order (a snapshot; mutate via the Schema API)."""
+        return list(self._relationships.values())
+
+    @property
+    def version(self) -> int:
+        """Number of change events published so far."""
+        return self._version
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """Register a callback for change events; returns an unsubscribe function."""
+        self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Deliver all events raised inside the block as a single list."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._flush()
 
     def add_table(self, table: Table) -> None:
-        if self.find_table(table.name) is not None:
+        if table.name in self._tables:
             return
-        self.tables.append(table)
+        self._tables[table.name] = table
+        self._table_order[id(table)] = table
+        self._edges.setdefault(id(table), TableEdges())
+        self._emit(TableAdded(table))
 
     def remove_table(self, table_name: str) -> None:
-        self.tables = [t for t in self.tables if t.name != table_name]
-        # Remove relationships that involve this table
-        self.relationships = [
-            r
-            for r in self.relationships
-            if r.table_a.name != table_name and r.table_b.name != table_name
-        ]
+        table = self._tables.get(table_name)
+        if table is None:
+            return
+        with self.batch():
+            # Only the relationships adjacent to this table need to go
+            edges = self._edges.get(id(table))
+            if edges is not None:
+                for key in [*edges.outgoing, *edges.incoming]:
+                    self._unlink_relationship(key)
+            del self._tables[table_name]
+            del self._table_order[id(table)]
+            self._edges.pop(id(table), None)
+            self._emit(TableRemoved(table))
+
+    def rename_table(self, old_name: str, new_name: str) -> bool:
+        """Rename a table, keeping its position. Returns False on conflict."""
+        table = self._tables.get(old_name)
+        if table is None or (new_name != old_name and new_name in self._tables):
+            return False
+        if new_name == old_name:
+            return True
+        table.name = new_name
+        # O(1): the position is kept by _table_order, not by this index
+        del self._tables[old_name]
+        self._tables[new_name] = table
+        self._emit(TableRenamed(table, old_name))
+        return True
+
+    def add_attribute(self, table_name: str, attribute: Attribute) -> bool:
+        """Add an attribute to a table. Returns False if it was not added."""
+        table = self._tables.get(table_name)
+        if table is None or table.has_attribute(attribute.name):
+            return False
+        table.add_attribute(attribute)
+        self._emit(AttributeAdded(table, attribute))
+        return True
+
+    def remove_attribute(self, table_name: str, attr_name: str) -> bool:
+        """Remove an attribute from a table. Returns False if it did not exist."""
+        table = self._tables.get(table_name)
+        attribute = table.find_attribute(attr_name) if table is not None else None
+        if attribute is None:
+            return False
+        table.remove_attribute(attr_name)
+        self._emit(AttributeRemoved(table, attribute))
+        return True
 
     def add_relationship(self, relationship: Relationship) -> None:
-        for r in self.relationships:
-            if (
-                r.table_a is relationship.table_a
-                and r.table_b is relationship.table_b
-                and r.rel_type == relationship.rel_type
-            ):
-                return
-        self.relationships.append(relationship)
+        """Add a relationship unless the two tables are already related."""
+        key = _pair_key(relationship.table_a, relationship.table_b)
+        if key in self._relationships:
+            return
+        self._relationships[key] = relationship
+        self._edges.setdefault(id(relationship.table_a), TableEdges()).outgoing[key] = relationship
+        self._edges.setdefault(id(relationship.table_b), TableEdges()).incoming[key] = relationship
+        self._emit(RelationshipAdded(relationship))
+
+    def remove_relationship(self, table_a_name: str, table_b_name: str) -> None:
+        """Remove the relationship between two tables, in either direction."""
+        table_a = self._tables.get(table_a_name)
+        table_b = self._tables.get(table_b_name)
+        if table_a is None or table_b is None:
+            return
+        self._unlink_relationship(_pair_key(table_a, table_b))
 
     def find_table(self, name: str) -> Optional[Table]:
-        for t in self.tables:
-            if t.name == name:
-                return t
-        return None
+        return self._tables.get(name)
+
+    def find_relationship(self, table_a_name: str, table_b_name: str) -> Optional[Relationship]:
+        """Return the relationship between two tables, in either direction."""
+        table_a = self._tables.get(table_a_name)
+        table_b = self._tables.get(table_b_name)
+        if table_a is None or table_b is None:
+            return None
+        return self._relationships.get(_pair_key(table_a, table_b))
+
+    def relationships_of(self, table_name: str, rel_type: Optional[str] = None) -> List[Relationship]:
+        """Relationships touching a table in either direction."""
+        return self.outgoing(table_name, rel_type) + self.incoming(table_name, rel_type)
+
+    def outgoing(self, table_name: str, rel_type: Optional[str] = None) -> List[Relationship]:
+        """Relationships where the table is ``table_a`` (the referenced side of a 1-N)."""
+        edges = self._edges_of(table_name)
+        if edges is None:
+            return []
+        return _filter_type(edges.outgoing.values(), rel_type)
+
+    def incoming(self, table_name: str, rel_type: Optional[str] = None) -> List[Relationship]:
+        """Relationships where the table is ``table_b`` (the referencing side of a 1-N)."""
+        edges = self._edges_of(table_name)
+        if edges is None:
+            return []
+        return _filter_type(edges.incoming.values(), rel_type)
+
+    def _edges_of(self, table_name: str) -> Optional[TableEdges]:
+        table = self._tables.get(table_name)
+        if table is None:
+            return None
+        return self._edges.get(id(table))
+
+    def _unlink_relationship(self, key: PairKey) -> None:
+        relationship = self._relationships.pop(key, None)
+        if relationship is None:
+            return
+        edges_a = self._edges.get(id(relationship.table_a))
+        if edges_a is not None:
+            edges_a.outgoing.pop(key, None)
+        edges_b = self._edges.get(id(relationship.table_b))
+        if edges_b is not None:
+            edges_b.incoming.pop(key, None)
+        self._emit(RelationshipRemoved(relationship))
+
+    def _emit(self, event: SchemaEvent) -> None:
+        self._version += 1
+        self._pending.append(event)
+        if self._batch_depth == 0:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        events, self._pending = self._pending, []
+        for callback in list(self._subscribers):
+            callback(events)
+
+
+def _filter_type(relationships: Iterable[Relationship], rel_type: Optional[str]) -> List[Relationship]:
+    if rel_type is None:
+        return list(relationships)
+    return [r for r in relationships if r.rel_type == rel_type]
@@ -1,27 +1,94 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, Iterable, List, Optional, Protocol
 
 from .attribute import Attribute
 
 
-@dataclass
 class Table:
-    """Represents a database table in the schema model."""
-    name: str
-    attributes: List[Attribute] = field(default_factory=list)
+    """Represents a database table in the schema model.
+
+    Attributes are kept in an insertion-ordered name index; the primary key
+    list is cached and invalidated whenever the attribute set changes.
+    """
+
+    __slots__ = ("name", "_attributes", "_primary_keys")
+
+    def __init__(self, name: str, attributes: Optional[Iterable[Attribute]] = None) -> None:
+        self.name = name
+        self._attributes: Dict[str, Attribute] = {}
+        self._primary_keys: Optional[List[Attribute]] = None
+        for attribute in attributes or ():
+            self.add_attribute(attribute)
+
+    def __repr__(self) -> str:
+        return f"Table(name={self.name!r}, attributes={self.attributes!r})"
+
+    @property
+    def attributes(self) -> List[Attribute]:
+        """Attributes in insertion order (a snapshot; mutate via the Table API)."""
+        return list(self._attributes.values())
 
     def add_attribute(self, attribute: Attribute) -> None:
         """Add a new attribute if name is unique."""
-        if any(a.name == attribute.name for a in self.attributes):
+        if attribute.name in self._attributes:
             return
-        self.attributes.append(attribute)
+        self._attributes[attribute.name] = attribute
+        self._primary_keys = None
 
     def remove_attribute(self, attr_name: str) -> None:
         """Remove an attribute by name."""
-        self.attributes = [a for a in self.attributes if a.name != attr_name]
+        if self._attributes.pop(attr_name, None) is not None:
+            self._primary_keys = None
+
+    def find_attribute(self, attr_name: str) -> Optional[Attribute]:
+        """Return the attribute with the given name, if any."""
+        return self._attributes.get(attr_name)
+
+    def has_attribute(self, attr_name: str) -> bool:
+        return attr_name in self._attributes
 
     def get_primary_keys(self) -> List[Attribute]:
         """Return list of attributes that are primary keys."""
-        return [a for a in self.attributes if a.is_primary_key]
+        if self._primary_keys is None:
+            self._primary_keys = [a for a in self._attributes.values() if a.is_primary_key]
+        return list(self._primary_keys)
+
+
+class AttributeSource(Protocol):
+    def attributes(self, index: int) -> List[Attribute]: ...
+
+
+# The slot LazyTable's _attributes property stores the decoded attributes in
+_ATTRIBUTES_SLOT = Table._attributes
+
+
+class LazyTable(Table):
+    """A Table whose attributes are loaded from ``source.attributes(index)`` on first access."""
+
+    __slots__ = ("_source", "_index")
+
+    def __init__(self, name: str, source: AttributeSource, index: int) -> None:
+        self.name = name
+        self._primary_keys = None
+        self._source: Optional[AttributeSource] = source
+        self._index = index
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._source is None
+
+    @property
+    def _attributes(self) -> Dict[str, Attribute]:
+        try:
+            return _ATTRIBUTES_SLOT.__get__(self, LazyTable)
+        except AttributeError:
+            attributes = {a.name: a for a in self._source.attributes(self._index)}
+            _ATTRIBUTES_SLOT.__set__(self, attributes)
+            self._source = None
+            return attributes
+
+    @_attributes.setter
+    def _attributes(self, value: Dict[str, Attribute]) -> None:
+        _ATTRIBUTES_SLOT.__set__(self, value)
+        self._source = None
@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer  # noqa: E402
+
+from controller.backup_scheduler import BackupScheduler  # noqa: E402
+from controller.connection_manager import ConnectionManager  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def wait_for(condition, timeout=5000):
+    loop = QEventLoop()
+    poll = QTimer()
+    poll.timeout.connect(lambda: condition() and loop.quit())
+    poll.start(5)
+    QTimer.singleShot(timeout, loop.quit)
+    loop.exec()
+    poll.stop()
+    assert condition()
+
+
+def file_rows(path):
+    disk = sqlite3.connect(path)
+    try:
+        return disk.execute("SELECT a, b FROM t ORDER BY a").fetchall()
+    finally:
+        disk.close()
+
+
+def test_timer_backs_up_the_memory_database(app, tmp_path):
+    path = str(tmp_path / "app.db")
+    manager = ConnectionManager(path, in_memory=True)
+    scheduler = BackupScheduler(manager, interval=20)
+    saved, failed = [], []
+    scheduler.saved.connect(saved.append)
+    scheduler.failed.connect(failed.append)
+    try:
+        assert manager.uri.endswith("?vfs=memdb")
+        manager.writer.execute("CREATE TABLE t (a INTEGER PRIMARY KEY, b TEXT)")
+        manager.writer.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"r{i}") for i in range(2000)])
+        manager.writer.commit()
+        wait_for(lambda: saved and not scheduler.is_running())
+        assert failed == [] and saved[0].pages > 0
+        assert file_rows(path) == manager.writer.execute("SELECT a, b FROM t ORDER BY a").fetchall()
+
+        # Later changes reach the file through save()
+        manager.writer.execute("DELETE FROM t WHERE a % 2 = 0")
+        manager.writer.commit()
+        scheduler.save()
+        scheduler.save()
+        wait_for(lambda: not scheduler.is_running() and not manager.needs_backup())
+        assert file_rows(path) == [(i, f"r{i}") for i in range(1, 2000, 2)]
+    finally:
+        scheduler.stop()
+        manager.close()
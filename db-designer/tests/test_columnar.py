@@ -0,0 +1,41 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from controller.columnar import ColumnarWriter  # noqa: E402
+
+
+def _values(npz, group, index):
+    data = npz[f"{group:05d}/{index}.utf8"]
+    offsets = npz[f"{group:05d}/{index}.offsets"]
+    return [bytes(data[offsets[i]:offsets[i + 1]]).decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def test_text_is_stored_by_total_length(tmp_path):
+    path = str(tmp_path / "result.npz")
+    writer = ColumnarWriter(path, ["id", "text"])
+    long = "x" * 100_000
+    writer.write_batch([(i, long if i == 0 else "é") for i in range(1000)])
+    writer.write_batch([(None, None), (7, "a")])
+    writer.close()
+
+    npz = np.load(path)
+    assert npz["00000/1.utf8"].nbytes == len(long) + 999 * 2
+    texts = _values(npz, 0, 1)
+    assert texts[0] == long and texts[1:] == ["é"] * 999
+    assert _values(npz, 1, 1) == ["", "a"]
+    assert npz["00001/1.null"].tolist() == [True, False]
+    assert npz["00000/0"].dtype == np.int64
+
+
+def test_integers_with_nulls_keep_int64(tmp_path):
+    path = str(tmp_path / "result.npz")
+    writer = ColumnarWriter(path, ["id"])
+    big = 2 ** 53 + 1
+    writer.write_batch([(big,), (None,), (-big,)])
+    writer.close()
+
+    npz = np.load(path)
+    assert npz["00000/0"].dtype == np.int64
+    assert npz["00000/0"].tolist() == [big, 0, -big]
+    assert npz["00000/0.null"].tolist() == [False, True, False]
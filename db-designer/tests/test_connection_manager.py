@@ -0,0 +1,87 @@
+import sqlite3
+
+import pytest
+
+from controller.connection_manager import ConnectionManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "app.db"), readers=2)
+    manager.writer.execute("CREATE TABLE t (a INTEGER)")
+    manager.writer.execute("INSERT INTO t VALUES (1)")
+    manager.writer.commit()
+    yield manager
+    manager.close()
+
+
+def test_readers_see_committed_data_while_the_writer_writes(manager):
+    assert manager.writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    manager.writer.execute("INSERT INTO t VALUES (2)")
+    with manager.reader() as conn:
+        assert conn.execute("SELECT a FROM t").fetchall() == [(1,)]
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO t VALUES (3)")
+    manager.writer.commit()
+    with manager.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+
+
+def test_reader_pool_reuses_connections(manager):
+    with manager.reader() as first, manager.reader() as second:
+        assert first is not second
+        with pytest.raises(Exception):
+            with manager.reader(timeout=0.01):
+                pass
+    with manager.reader() as again:
+        assert again in (first, second)
+
+
+def test_other_writers_wait_for_the_write_lock(manager):
+    other = manager.connect(timeout=0.05)
+    try:
+        manager.writer.execute("INSERT INTO t VALUES (2)")
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("INSERT INTO t VALUES (3)")
+        manager.writer.commit()
+        other.execute("INSERT INTO t VALUES (3)")
+        other.commit()
+    finally:
+        other.close()
+    assert manager.writer.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 3
+
+
+def test_use_profile_restores_the_default(manager):
+    before = manager.writer.execute("PRAGMA synchronous").fetchone()[0]
+    with manager.use_profile("bulk-load") as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+    assert manager.writer.execute("PRAGMA synchronous").fetchone()[0] == before
+
+
+
+def test_in_memory_database_is_backed_up_to_the_file(tmp_path):
+    path = str(tmp_path / "app.db")
+    manager = ConnectionManager(path, in_memory=True)
+    try:
+        assert not (tmp_path / "app.db").exists()
+        manager.writer.execute("CREATE TABLE t (a INTEGER)")
+        manager.writer.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(1000)])
+        manager.writer.commit()
+        assert manager.needs_backup()
+        assert manager.backup(pages=1, sleep=0).written
+        assert not manager.needs_backup()
+        assert not manager.backup().written
+    finally:
+        manager.close()
+
+    disk = sqlite3.connect(path)
+    assert disk.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1000
+    disk.close()
+
+    # A new manager starts from the saved file
+    manager = ConnectionManager(path, in_memory=True)
+    try:
+        assert manager.writer.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1000
+        assert not manager.needs_backup()
+    finally:
+        manager.close()
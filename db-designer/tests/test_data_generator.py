@@ -0,0 +1,98 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from controller import sql_engine
+from controller.data_generator import _bounded_map, generate_data
+from model.attribute import Attribute
+from model.relationship import Relationship
+from model.schema import Schema
+from model.table import Table
+
+
+@pytest.fixture
+def schema():
+    customer = Table("customer", [
+        Attribute("customer_id", "INTEGER", is_primary_key=True),
+        Attribute("email", "TEXT", is_unique=True, is_nullable=False),
+        Attribute("joined", "DATE"),
+    ])
+    order = Table("order", [
+        Attribute("order_id", "INTEGER", is_primary_key=True),
+        Attribute("total", "REAL"),
+    ])
+    product = Table("product", [Attribute("product_id", "INTEGER", is_primary_key=True)])
+    return Schema([order, customer, product], [
+        Relationship(customer, order, "1-N"),
+        Relationship(order, product, "N-N"),
+    ])
+
+
+@pytest.fixture
+def conn(schema):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(sql_engine.generate_create_table_statements(schema))
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_generated_rows_follow_the_fk_graph(schema, conn, processes):
+    report = generate_data(conn, schema, {"customer": 50, "order": 120, "product": 10, "order_product": 80},
+                           batch_size=16, seed=1, processes=processes)
+    # Junction pairs drawn twice are skipped (INSERT OR IGNORE)
+    assert 0 < report.rows.pop("order_product") <= 80
+    assert report.rows == {"customer": 50, "product": 10, "order": 120}
+    assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    assert conn.execute('SELECT COUNT(DISTINCT "email") FROM "customer"').fetchone()[0] == 50
+    # Every order references a customer unless its FK was left NULL
+    orphans = conn.execute(
+        'SELECT COUNT(*) FROM "order" o LEFT JOIN "customer" c USING ("customer_id") '
+        'WHERE o."customer_id" IS NOT NULL AND c."customer_id" IS NULL'
+    ).fetchone()[0]
+    assert orphans == 0
+
+
+def test_generation_is_reproducible_with_a_seed(schema):
+    dumps = []
+    for _ in range(2):
+        conn = sqlite3.connect(":memory:")
+        conn.executescript(sql_engine.generate_create_table_statements(schema))
+        generate_data(conn, schema, 20, seed=7)
+        dumps.append(list(conn.iterdump()))
+        conn.close()
+    assert dumps[0] == dumps[1]
+
+
+def test_progress_can_cancel(schema, conn):
+    report = generate_data(conn, schema, 100, batch_size=10, progress=lambda rows: rows < 30)
+    assert report.cancelled and report.total_rows == 30
+
+
+def test_bounded_map_limits_batches_in_flight():
+    lock = threading.Lock()
+    submitted = 0
+    peak = 0
+    consumed = 0
+
+    def work(i):
+        return i * i
+
+    def args():
+        nonlocal submitted, peak
+        for i in range(20):
+            with lock:
+                submitted += 1
+                peak = max(peak, submitted - consumed)
+            yield (i,)
+
+    with ThreadPoolExecutor(2) as executor:
+        results = []
+        for value in _bounded_map(executor, work, args(), 3):
+            consumed += 1
+            results.append(value)
+    assert results == [i * i for i in range(20)]
+    assert peak <= 4  # the limit plus the one just submitted
@@ -0,0 +1,59 @@
+from controller import sql_engine
+from model.attribute import Attribute
+from model.frozen_schema import FrozenSchema
+from model.relationship import Relationship
+from model.schema import Schema
+from model.table import Table
+
+
+def _sample():
+    customer = Table("customer", [
+        Attribute("id", "INTEGER", is_primary_key=True, is_nullable=False),
+        Attribute("email", "TEXT", is_unique=True),
+    ])
+    order = Table("order", [
+        Attribute("id", "INTEGER", is_primary_key=True),
+        Attribute("placed", "TEXT", is_nullable=False),
+    ])
+    product = Table("product", [Attribute("sku", "TEXT", is_primary_key=True)])
+    return Schema([customer, order, product], [
+        Relationship(customer, order, "1-N"),
+        Relationship(order, product, "N-N"),
+    ])
+
+
+def _shape(schema):
+    return (
+        [(t.name, t.attributes) for t in schema.tables],
+        [(r.table_a.name, r.table_b.name, r.rel_type) for r in schema.relationships],
+    )
+
+
+def test_thaw_round_trips():
+    schema = _sample()
+    thawed = FrozenSchema.from_schema(schema).thaw()
+    assert _shape(thawed) == _shape(schema)
+    # A thawed schema is a new object graph, not a view on the original
+    assert thawed.find_table("order") is not schema.find_table("order")
+    assert len(thawed.relationships_of("order")) == 2
+
+
+def test_frozen_ddl_matches_schema_ddl():
+    schema = _sample()
+    frozen = FrozenSchema.from_schema(schema)
+    assert sql_engine.generate_create_table_statements(frozen) == sql_engine.generate_create_table_statements(schema)
+
+
+def test_frozen_table_lookups():
+    frozen = FrozenSchema.from_schema(_sample())
+    customer = frozen.find_table("customer")
+    assert customer.name == "customer"
+    assert customer.find_attribute("email") == Attribute("email", "TEXT", is_unique=True)
+    assert customer.has_attribute("id") and not customer.has_attribute("placed")
+    # "placed" is interned for "order" but is not a column of "customer"
+    assert customer.find_attribute("placed") is None
+    assert customer.find_attribute("missing") is None
+    assert [a.name for a in customer.get_primary_keys()] == ["id"]
+    assert frozen.find_table("missing") is None
+    [rel] = frozen.incoming("order", "1-N")
+    assert rel.table_a is customer and rel.table_b is frozen.find_table("order")
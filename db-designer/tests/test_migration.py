@@ -0,0 +1,115 @@
+import sqlite3
+
+import pytest
+
+from controller.migration import apply_migration, plan_migration, rebuild_via_shadow
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute('CREATE TABLE "person" ("id" INTEGER PRIMARY KEY, "name" TEXT)')
+    conn.executemany('INSERT INTO "person" VALUES (?, ?)', [(i, f"p{i}") for i in range(10)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def migrate(conn, desired):
+    steps = plan_migration(conn, desired)
+    return steps, apply_migration(conn, steps)
+
+
+def rows(conn, table="person"):
+    return conn.execute(f'SELECT * FROM "{table}" ORDER BY 1').fetchall()
+
+
+def test_unchanged_table_has_no_steps(conn):
+    steps, failed = migrate(conn, [("person", 'CREATE TABLE "person" ("id" INTEGER PRIMARY KEY, "name" TEXT)')])
+    assert steps == [] and failed == []
+
+
+def test_create_and_drop(conn):
+    steps, failed = migrate(conn, [("city", 'CREATE TABLE "city" ("id" INTEGER)')])
+    assert sorted((s.kind, s.table) for s in steps) == [("create", "city"), ("drop", "person")]
+    assert failed == []
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert tables == {"city"}
+
+
+def test_added_column_keeps_rows(conn):
+    steps, failed = migrate(conn, [
+        ("person", 'CREATE TABLE "person" ("id" INTEGER PRIMARY KEY, "name" TEXT, "age" INTEGER)'),
+    ])
+    assert [s.kind for s in steps] == ["alter"]
+    assert failed == []
+    assert rows(conn) == [(i, f"p{i}", None) for i in range(10)]
+
+
+def test_added_column_without_primary_key_is_altered(conn):
+    conn.execute('CREATE TABLE "log" (\n    "at" INTEGER,\n    "msg" TEXT\n)')
+    conn.executemany('INSERT INTO "log" VALUES (?, ?)', [(1, "a"), (2, "b")])
+    conn.commit()
+    steps, failed = migrate(conn, [
+        ("person", 'CREATE TABLE "person" ("id" INTEGER PRIMARY KEY, "name" TEXT)'),
+        ("log", 'CREATE TABLE "log" (\n    "at" INTEGER,\n    "msg" TEXT,\n    "level" INTEGER\n)'),
+    ])
+    assert [(s.kind, s.table) for s in steps] == [("alter", "log")]
+    assert failed == []
+    assert rows(conn, "log") == [(1, "a", None), (2, "b", None)]
+
+
+def test_reordered_columns_are_rebuilt_with_rows(conn):
+    steps, failed = migrate(conn, [
+        ("person", 'CREATE TABLE "person" ("name" TEXT, "id" INTEGER PRIMARY KEY)'),
+    ])
+    assert [s.kind for s in steps] == ["rebuild"]
+    assert failed == []
+    assert conn.execute('SELECT id, name FROM "person" ORDER BY id').fetchall() == [
+        (i, f"p{i}") for i in range(10)
+    ]
+
+
+def test_not_null_column_on_filled_table_fails_without_dropping_rows(conn):
+    steps, failed = migrate(conn, [
+        ("person", 'CREATE TABLE "person" ("id" INTEGER PRIMARY KEY, "name" TEXT, "age" INTEGER NOT NULL)'),
+    ])
+    assert [s.table for s in failed] == ["person"]
+    assert rows(conn) == [(i, f"p{i}") for i in range(10)]
+
+
+def test_not_null_column_on_empty_table_is_recreated(conn):
+    conn.execute('DELETE FROM "person"')
+    conn.commit()
+    create_sql = 'CREATE TABLE "person" ("id" INTEGER PRIMARY KEY, "name" TEXT, "age" INTEGER NOT NULL)'
+    steps, failed = migrate(conn, [("person", create_sql)])
+    assert failed == []
+    assert plan_migration(conn, [("person", create_sql)]) == []
+
+
+def test_failed_step_does_not_affect_others(conn):
+    conn.execute('CREATE TABLE "city" ("id" INTEGER)')
+    conn.commit()
+    steps, failed = migrate(conn, [
+        ("person", 'CREATE TABLE "person" ("id" INTEGER PRIMARY KEY, "name" TEXT, "age" INTEGER NOT NULL)'),
+        ("city", 'CREATE TABLE "city" ("id" INTEGER, "name" TEXT)'),
+    ])
+    assert [s.table for s in failed] == ["person"]
+    assert [row[1] for row in conn.execute('PRAGMA table_info("city")')] == ["id", "name"]
+
+
+def test_rebuild_via_shadow_reports_emptied_tables(tmp_path):
+    path = str(tmp_path / "live.db")
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE "person" ("id" INTEGER PRIMARY KEY, "name" TEXT)')
+    conn.execute('CREATE TABLE "city" ("id" INTEGER)')
+    conn.executemany('INSERT INTO "person" VALUES (?, ?)', [(1, "a"), (2, "b")])
+    conn.execute('INSERT INTO "city" VALUES (7)')
+    conn.commit()
+    report = rebuild_via_shadow(conn, [
+        ("person", 'CREATE TABLE "person" ("id" INTEGER PRIMARY KEY, "name" TEXT, "age" INTEGER NOT NULL)'),
+        ("city", 'CREATE TABLE "city" ("id" INTEGER, "name" TEXT)'),
+    ])
+    assert report.copied == ["city"] and report.skipped == ["person"]
+    assert conn.execute('SELECT * FROM "city"').fetchall() == [(7, None)]
+    conn.close()
@@ -0,0 +1,137 @@
+import pytest
+
+import model.project
+from model.attribute import Attribute
+from model.project import Project, ProjectFormatError, load_project, save_project
+from model.relationship import Relationship
+from model.schema import Schema
+from model.table import LazyTable, Table
+
+SUFFIXES = [".json", ".dbd", ".dbdx"]
+
+
+def make_project() -> Project:
+    schema = Schema()
+    author = Table("author", [
+        Attribute("id", "INTEGER", is_primary_key=True, is_nullable=False),
+        Attribute("name", "TEXT", is_unique=True),
+        Attribute("bio", "TEXT"),
+    ])
+    book = Table("livre \"été\"", [Attribute("id", "INTEGER", True, False), Attribute("title", "VARCHAR(200)")])
+    tag = Table("tag", [])
+    for table in (author, book, tag):
+        schema.add_table(table)
+    schema.add_relationship(Relationship(author, book, "1-N"))
+    schema.add_relationship(Relationship(book, tag, "N-N"))
+    return Project(schema, {"author": (20, 40), "tag": (460, 20)})
+
+
+def describe(project: Project):
+    tables = [
+        (t.name, [(a.name, a.data_type, a.is_primary_key, a.is_nullable, a.is_unique) for a in t.attributes])
+        for t in project.schema.tables
+    ]
+    rels = [(r.table_a.name, r.table_b.name, r.rel_type) for r in project.schema.relationships]
+    return tables, rels, project.positions
+
+
+@pytest.mark.parametrize("suffix", SUFFIXES)
+def test_round_trip(tmp_path, suffix):
+    path = str(tmp_path / ("project" + suffix))
+    project = make_project()
+    save_project(project, path)
+    loaded = load_project(path)
+    assert describe(loaded) == describe(project)
+    # Saving a loaded project (over the file it was mapped from) round-trips too
+    save_project(loaded, path)
+    assert describe(load_project(path)) == describe(project)
+
+
+@pytest.mark.parametrize("suffix", SUFFIXES)
+def test_round_trip_empty(tmp_path, suffix):
+    path = str(tmp_path / ("empty" + suffix))
+    save_project(Project(), path)
+    assert describe(load_project(path)) == ([], [], {})
+
+
+def test_mapped_tables_decode_lazily(tmp_path):
+    path = str(tmp_path / "project.dbdx")
+    save_project(make_project(), path)
+    schema = load_project(path).schema
+    tables = schema.tables
+    assert all(isinstance(t, LazyTable) and not t.is_loaded for t in tables)
+    assert [a.name for a in tables[0].attributes] == ["id", "name", "bio"]
+    assert tables[0].is_loaded and not tables[1].is_loaded
+
+
+@pytest.mark.parametrize("suffix", SUFFIXES)
+def test_truncated_files_are_rejected(tmp_path, suffix):
+    path = tmp_path / ("project" + suffix)
+    save_project(make_project(), str(path))
+    data = path.read_bytes()
+    for size in range(0, len(data) - 1, 7):
+        path.write_bytes(data[:size])
+        with pytest.raises(ProjectFormatError):
+            load_project(str(path))
+
+
+@pytest.mark.parametrize("suffix", [".dbd", ".dbdx"])
+def test_out_of_range_ids_are_rejected(tmp_path, suffix):
+    path = tmp_path / ("project" + suffix)
+    save_project(make_project(), str(path))
+    data = bytearray(path.read_bytes())
+    # The relationship endpoints are the last table indexes before the kinds
+    # (.dbdx) or kinds and positions (.dbd); point one past the tables
+    end = len(data) - 2 - (0 if suffix == ".dbdx" else 3 * 8)
+    end -= -2 % 4 if suffix == ".dbdx" else 0
+    data[end - 4:end] = (99).to_bytes(4, "little")
+    path.write_bytes(bytes(data))
+    with pytest.raises(ProjectFormatError):
+        load_project(str(path))
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "[]",
+    '{"format": "something-else"}',
+    '{"format": "db-designer-project", "version": 99}',
+    '{"tables": [{"attributes": []}]}',
+    '{"tables": [3]}',
+    '{"tables": [{"name": "t", "attributes": [["id"]]}]}',
+    '{"tables": [], "relationships": [["a"]]}',
+    '{"tables": [{"name": "a"}, {"name": "b"}], "relationships": [["a", "b", "1-1"]]}',
+    '{"tables": [{"name": "t"}], "relationships": [["t", "t", "1-N"]]',
+    '{"tables": [{"name": "t", "x": 1}]}',
+    '{"tables": [{"name": ["t"]}]}',
+    '{"version": "1"}',
+])
+def test_corrupt_json_is_rejected(tmp_path, text):
+    path = tmp_path / "project.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ProjectFormatError):
+        load_project(str(path))
+
+
+def test_non_utf8_json_is_rejected(tmp_path):
+    path = tmp_path / "project.json"
+    path.write_bytes(b'{"tables": [{"name": "\xff"}]}')
+    with pytest.raises(ProjectFormatError):
+        load_project(str(path))
+
+
+@pytest.mark.parametrize("suffix", SUFFIXES)
+def test_failed_save_keeps_the_old_file(tmp_path, monkeypatch, suffix):
+    path = tmp_path / ("project" + suffix)
+    save_project(make_project(), str(path))
+    before = path.read_bytes()
+
+    def fail(project, f):
+        f.write(b"x" if "b" in f.mode else "x")
+        raise RuntimeError("disk full")
+
+    for name in ("write_json", "write_binary", "write_mapped"):
+        monkeypatch.setattr(model.project, name, fail)
+    with pytest.raises(RuntimeError):
+        save_project(Project(), str(path))
+    assert path.read_bytes() == before
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
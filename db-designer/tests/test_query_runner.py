@@ -0,0 +1,123 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from controller import sql_engine  # noqa: E402
+from controller.query_runner import CACHE_MAX_ROWS, QueryWorker  # noqa: E402
+from controller.result_model import QueryResultModel, QueryStatsModel  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "console.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (a INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(CACHE_MAX_ROWS + 10)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def run(db_path, sql, **kwargs):
+    worker = QueryWorker(lambda: sqlite3.connect(db_path, check_same_thread=False), sql, **kwargs)
+    results = []
+    worker.finished.connect(results.append)
+    worker.run()
+    assert len(results) == 1
+    return results[0]
+
+
+def test_every_result_set_is_returned(db_path):
+    result = run(db_path, "SELECT COUNT(*) FROM t; UPDATE t SET a = a WHERE a < 3; SELECT a FROM t ORDER BY a")
+    try:
+        assert [s.columns for s in result.result_sets] == [["COUNT(*)"], ["a"]]
+        assert [s.returns_rows for s in result.stats] == [True, False, True]
+        assert result.stats[1].rowcount == 3
+        # The last set is read up to its first batch; the others stay on their cursor
+        assert result.result_sets[0].first_rows is None
+        assert result.result_sets[0].cursor.fetchall() == [(CACHE_MAX_ROWS + 10,)]
+        assert len(result.result_sets[1].first_rows) == 500
+    finally:
+        result.close()
+
+
+def test_statements_without_rows_report_a_message(db_path):
+    result = run(db_path, "INSERT INTO t VALUES (-1); DELETE FROM t WHERE a < 0")
+    assert result.messages == [("Success: 2 rows affected",)]
+    assert result.connection is None
+
+
+def test_errors_roll_back_and_are_reported(db_path):
+    result = run(db_path, "DELETE FROM t; SELECT * FROM missing")
+    assert result.messages[0][0].startswith("SQL Error: no such table")
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == CACHE_MAX_ROWS + 10
+    conn.close()
+
+
+def test_small_results_go_through_the_cache(db_path):
+    cache = sql_engine.ResultCache(db_path)
+    try:
+        sql = "SELECT a FROM t WHERE a < 5 ORDER BY a"
+        first = run(db_path, sql, cache=cache)
+        assert not first.stats[0].cached and first.result_sets[0].cursor is None
+        first.close()
+        second = run(db_path, sql, cache=cache)
+        assert second.stats[0].cached
+        assert second.result_sets[0].first_rows == [(i,) for i in range(5)]
+        second.close()
+
+        # Larger results stay lazy on their cursor and are not cached
+        big = run(db_path, "SELECT a FROM t", cache=cache)
+        assert big.result_sets[0].cursor is not None
+        big.close()
+        assert cache.misses == 2 and cache.hits == 1
+    finally:
+        cache.close()
+
+
+def test_cancel_before_start(db_path):
+    worker = QueryWorker(lambda: sqlite3.connect(db_path, check_same_thread=False), "SELECT 1")
+    results = []
+    worker.finished.connect(results.append)
+    worker.cancel()
+    worker.run()
+    assert results[0].messages == [("Query cancelled",)]
+
+
+def test_timeout_interrupts_the_query(db_path):
+    slow = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+    result = run(db_path, slow, timeout=0.05)
+    assert result.messages == [("Query timed out after 0.05s",)]
+
+
+def test_result_model_fetches_in_batches(db_path):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.execute("SELECT a FROM t ORDER BY a")
+    model = QueryResultModel(["a"], cursor, first_rows=cursor.fetchmany(40), batch_size=40, connection=conn)
+    counts = [model.rowCount()]
+    while model.canFetchMore():
+        model.fetchMore()
+        counts.append(model.rowCount())
+    total = CACHE_MAX_ROWS + 10
+    assert counts == [min(40 * n, total) for n in range(1, len(counts) + 1)]
+    assert counts[-1] == total
+    # The short last batch used up the cursor, which was released
+    assert not model.canFetchMore()
+    model.fetchMore()
+    assert model.rowCount() == total
+    assert model.data(model.index(total - 1, 0)) == str(total - 1)
+
+
+def test_step_counts_never_show_zero(db_path):
+    result = run(db_path, "SELECT 1; SELECT SUM(a) FROM t")
+    try:
+        model = QueryStatsModel(result.stats)
+        small, count = (model.data(model.index(row, 3)) for row in range(2))
+        assert result.stats[0].steps == 0 and small == "<1,000"
+        assert result.stats[1].steps >= 1000 and count == f"~{result.stats[1].steps:,}"
+        assert model.summary().endswith(f"~{result.stats[1].steps:,} VM steps")
+    finally:
+        result.close()
@@ -0,0 +1,185 @@
+from model.attribute import Attribute
+from model.events import (
+    AttributeAdded,
+    RelationshipRemoved,
+    TableAdded,
+    TableRemoved,
+    TableRenamed,
+)
+from model.relationship import Relationship
+from model.schema import Schema
+from model.table import Table
+
+
+def test_rename_keeps_position_and_indexes():
+    a, b, c = Table("a"), Table("b"), Table("c")
+    schema = Schema([a, b, c])
+    events = []
+    schema.subscribe(events.extend)
+
+    assert schema.rename_table("a", "z")
+    assert [t.name for t in schema.tables] == ["z", "b", "c"]
+    assert schema.find_table("z") is a and schema.find_table("a") is None
+    assert [type(e) for e in events] == [TableRenamed]
+
+    assert not schema.rename_table("b", "c")
+    assert schema.rename_table("b", "b")
+    assert len(events) == 1
+
+    schema.remove_table("z")
+    schema.add_table(Table("a"))
+    assert [t.name for t in schema.tables] == ["b", "c", "a"]
+
+
+def test_batch_delivers_one_notification():
+    schema = Schema()
+    calls = []
+    schema.subscribe(calls.append)
+    with schema.batch():
+        schema.add_table(Table("a"))
+        with schema.batch():
+            schema.add_attribute("a", Attribute("id", "INTEGER"))
+        assert calls == []
+    assert [[type(e) for e in events] for events in calls] == [[TableAdded, AttributeAdded]]
+
+
+def test_unsubscribe_stops_delivery():
+    schema = Schema()
+    calls = []
+    unsubscribe = schema.subscribe(calls.append)
+    schema.add_table(Table("a"))
+    unsubscribe()
+    schema.add_table(Table("b"))
+    unsubscribe()
+    assert len(calls) == 1
+
+
+def test_version_increases_on_each_change():
+    schema = Schema()
+    versions = [schema.version]
+    schema.add_table(Table("a"))
+    versions.append(schema.version)
+    schema.add_attribute("a", Attribute("id", "INTEGER"))
+    versions.append(schema.version)
+    schema.rename_table("a", "b")
+    versions.append(schema.version)
+    with schema.batch():
+        schema.add_table(Table("c"))
+        schema.remove_table("c")
+    versions.append(schema.version)
+    assert versions == sorted(set(versions))
+    # No-op calls publish nothing
+    schema.add_table(Table("b"))
+    schema.rename_table("b", "b")
+    assert schema.version == versions[-1]
+
+
+def _assert_adjacency(schema):
+    """outgoing/incoming/relationships_of agree with a scan of all relationships."""
+    for table in schema.tables:
+        out = [r for r in schema.relationships if r.table_a is table]
+        inc = [r for r in schema.relationships if r.table_b is table]
+        assert schema.outgoing(table.name) == out
+        assert schema.incoming(table.name) == inc
+        assert schema.relationships_of(table.name) == out + inc
+        assert schema.outgoing(table.name, "N-N") == [r for r in out if r.rel_type == "N-N"]
+
+
+def test_adjacency_stays_consistent():
+    a, b, c, d = (Table(name) for name in "abcd")
+    schema = Schema([a, b, c, d])
+    schema.add_relationship(Relationship(a, b, "1-N"))
+    schema.add_relationship(Relationship(a, c, "N-N"))
+    schema.add_relationship(Relationship(c, b, "1-N"))
+    schema.add_relationship(Relationship(d, a, "1-N"))
+    # Same pair in the other direction is a duplicate
+    schema.add_relationship(Relationship(b, a, "N-N"))
+    _assert_adjacency(schema)
+    assert len(schema.relationships) == 4
+
+    schema.remove_relationship("b", "a")
+    _assert_adjacency(schema)
+    assert schema.incoming("b") == [schema.find_relationship("c", "b")]
+
+    assert schema.rename_table("c", "e")
+    _assert_adjacency(schema)
+    assert [r.table_b.name for r in schema.outgoing("a")] == ["e"]
+    assert schema.outgoing("c") == [] and schema.find_relationship("a", "e") is not None
+
+    schema.remove_table("a")
+    _assert_adjacency(schema)
+    assert [(r.table_a.name, r.table_b.name) for r in schema.relationships] == [("e", "b")]
+    assert schema.outgoing("d") == [] and schema.relationships_of("a") == []
+
+
+def _pk_names(table):
+    return [a.name for a in table.get_primary_keys()]
+
+
+def test_primary_key_cache_follows_attribute_changes():
+    table = Table("t", [Attribute("id", "INTEGER", is_primary_key=True), Attribute("name", "TEXT")])
+    schema = Schema([table])
+    assert _pk_names(table) == ["id"]
+    # The cached list is not exposed
+    table.get_primary_keys().clear()
+    assert _pk_names(table) == ["id"]
+
+    assert schema.add_attribute("t", Attribute("tenant", "INTEGER", is_primary_key=True))
+    assert _pk_names(table) == ["id", "tenant"]
+
+    assert schema.remove_attribute("t", "id")
+    assert _pk_names(table) == ["tenant"]
+
+    # Changing an attribute replaces it under the same name
+    with schema.batch():
+        schema.remove_attribute("t", "name")
+        schema.add_attribute("t", Attribute("name", "TEXT", is_primary_key=True))
+    assert _pk_names(table) == ["tenant", "name"]
+    with schema.batch():
+        schema.remove_attribute("t", "tenant")
+        schema.add_attribute("t", Attribute("tenant", "INTEGER"))
+    assert _pk_names(table) == ["name"]
+
+
+def test_attribute_lookups():
+    name = Attribute("name", "TEXT")
+    table = Table("t", [Attribute("id", "INTEGER", is_primary_key=True), name])
+    schema = Schema([table])
+    assert table.has_attribute("name") and table.find_attribute("name") is name
+    assert not table.has_attribute("missing") and table.find_attribute("missing") is None
+    # Duplicates are rejected through the same index
+    assert not schema.add_attribute("t", Attribute("name", "INTEGER"))
+    assert table.find_attribute("name") is name
+    assert schema.remove_attribute("t", "name")
+    assert not table.has_attribute("name") and table.find_attribute("name") is None
+    assert not schema.remove_attribute("t", "name")
+    assert [a.name for a in table.attributes] == ["id"]
+
+
+def test_duplicate_table_names_are_rejected():
+    first = Table("a")
+    schema = Schema([first, Table("a")])
+    assert schema.tables == [first]
+    schema.add_table(Table("a"))
+    assert schema.tables == [first] and schema.find_table("a") is first
+    # A renamed-away name is free again; the new name is taken
+    schema.rename_table("a", "b")
+    schema.add_table(Table("b"))
+    schema.add_table(Table("a"))
+    assert [t.name for t in schema.tables] == ["b", "a"] and schema.find_table("b") is first
+
+
+def test_remove_table_removes_its_relationships():
+    a, b, c = Table("a"), Table("b"), Table("c")
+    schema = Schema([a, b, c], [
+        Relationship(a, b, "1-N"), Relationship(c, a, "N-N"), Relationship(b, c, "1-N"),
+    ])
+    events = []
+    schema.subscribe(events.append)
+    schema.remove_table("a")
+    assert [(r.table_a.name, r.table_b.name) for r in schema.relationships] == [("b", "c")]
+    assert schema.find_relationship("a", "b") is None
+    assert schema.relationships_of("b") == schema.relationships_of("c") == schema.relationships
+    assert [[type(e) for e in batch] for batch in events] == [
+        [RelationshipRemoved, RelationshipRemoved, TableRemoved]
+    ]
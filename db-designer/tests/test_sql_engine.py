@@ -0,0 +1,410 @@
+import io
+import re
+import sqlite3
+
+import pytest
+
+from controller import sql_engine
+from model.attribute import Attribute
+from model.relationship import Relationship
+from model.schema import Schema
+from model.table import Table
+
+
+def _schema(names, edges):
+    """Tables with a "<name>_id" key each and 1-N edges as (parent, child) names."""
+    tables = {name: Table(name, [Attribute(f"{name}_id", "INTEGER", is_primary_key=True)]) for name in names}
+    return Schema(
+        tables.values(), [Relationship(tables[a], tables[b], "1-N") for a, b in edges]
+    )
+
+
+def _names(tables):
+    return [t.name for t in tables]
+
+
+def test_dependency_order_places_parents_first():
+    schema = _schema(["line", "order", "customer", "product"], [
+        ("order", "line"), ("product", "line"), ("customer", "order"),
+    ])
+    order = sql_engine.dependency_order(schema)
+    assert [_names(level) for level in order.levels] == [["customer", "product"], ["order"], ["line"]]
+    assert order.deferred == []
+
+
+def test_dependency_order_defers_only_cycle_edges():
+    # "dependent" comes first in schema order but is only behind the cycle a -> b -> c -> a
+    schema = _schema(["dependent", "a", "b", "c"], [
+        ("a", "b"), ("b", "c"), ("c", "a"), ("a", "dependent"),
+    ])
+    order = sql_engine.dependency_order(schema)
+    assert [(r.table_a.name, r.table_b.name) for r in order.deferred] == [("c", "a")]
+    assert _names(order.tables) == ["a", "dependent", "b", "c"]
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("PRAGMA foreign_keys=ON")
+    script = sql_engine.generate_create_table_statements(schema)
+    assert script.count("DEFERRABLE") == 1
+    conn.executescript(script)
+    conn.close()
+
+
+def test_write_sql_script_streams_in_dependency_order():
+    schema = _schema(["line", "order", "customer", "product"], [
+        ("order", "line"), ("product", "line"), ("customer", "order"),
+    ])
+    schema.add_relationship(Relationship(schema.find_table("customer"), schema.find_table("product"), "N-N"))
+    out = io.StringIO()
+    written = sql_engine.write_sql_script(sql_engine.iter_create_table_statements(schema), out)
+    script = out.getvalue()
+    assert script == "".join(sql_engine.iter_create_table_statements(schema))
+    assert written == len(script)
+    created = re.findall(r'CREATE TABLE IF NOT EXISTS "(\w+)"', script)
+    assert created == ["customer", "product", "order", "line", "customer_product"]
+
+
+def _rename_attribute(schema, table_name, old, new):
+    attribute = schema.find_table(table_name).find_attribute(old)
+    with schema.batch():
+        schema.remove_attribute(table_name, old)
+        schema.add_attribute(table_name, Attribute(new, attribute.data_type, attribute.is_primary_key))
+
+
+def _change_rel_type(schema, a, b, rel_type):
+    schema.remove_relationship(a, b)
+    schema.add_relationship(Relationship(schema.find_table(a), schema.find_table(b), rel_type))
+
+
+@pytest.mark.parametrize("change", [
+    lambda s: s.add_table(Table("tag", [Attribute("tag_id", "INTEGER", is_primary_key=True)])),
+    lambda s: s.remove_table("customer"),
+    lambda s: s.remove_table("line"),
+    lambda s: s.rename_table("customer", "client"),
+    lambda s: s.rename_table("product", "item"),
+    lambda s: s.add_attribute("order", Attribute("note", "TEXT")),
+    lambda s: s.add_attribute("customer", Attribute("region", "INTEGER", is_primary_key=True)),
+    lambda s: s.remove_attribute("customer", "customer_id"),
+    lambda s: _rename_attribute(s, "customer", "customer_id", "id"),
+    lambda s: _rename_attribute(s, "product", "product_id", "sku"),
+    lambda s: s.add_relationship(Relationship(s.find_table("product"), s.find_table("customer"), "1-N")),
+    lambda s: s.add_relationship(Relationship(s.find_table("customer"), s.find_table("product"), "N-N")),
+    lambda s: s.remove_relationship("customer", "order"),
+    lambda s: s.remove_relationship("order", "product"),
+    lambda s: _change_rel_type(s, "customer", "order", "N-N"),
+    lambda s: _change_rel_type(s, "order", "product", "1-N"),
+])
+def test_ddl_cache_matches_a_full_regeneration(change):
+    schema = _schema(["line", "order", "customer", "product"], [
+        ("order", "line"), ("product", "line"), ("customer", "order"),
+    ])
+    schema.add_relationship(Relationship(schema.find_table("order"), schema.find_table("product"), "N-N"))
+    cache = sql_engine.DDLCache(schema)
+    assert cache.script() == sql_engine.generate_create_table_statements(schema)
+    change(schema)
+    assert cache.script() == sql_engine.generate_create_table_statements(schema)
+    cache.close()
+
+
+def test_pragma_profile_skips_pragmas_without_a_value():
+    conn = sqlite3.connect("file:/test_pragma_profile?vfs=memdb", uri=True)
+    before = conn.execute("PRAGMA cache_size").fetchone()[0]
+    with sql_engine.pragma_profile(conn, sql_engine.BULK_LOAD_PRAGMAS):
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == sql_engine.BULK_LOAD_PRAGMAS["cache_size"]
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == before
+    conn.close()
+
+
+def _load(tmp_path, name, text):
+    conn = sqlite3.connect(":memory:")
+    conn.execute('CREATE TABLE "t" ("a" INTEGER, "b" TEXT)')
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    try:
+        return sql_engine.load_file(conn, "t", str(path)), conn.execute('SELECT * FROM "t"').fetchall()
+    finally:
+        conn.close()
+
+
+def test_load_csv_and_jsonl(tmp_path):
+    report, rows = _load(tmp_path, "t.csv", "a,b,extra\n1,x,?\n\n,y,?\n")
+    assert report.rows == 2 and report.ignored_columns == ["extra"]
+    assert rows == [(1, "x"), (None, "y")]
+    report, rows = _load(tmp_path, "t.jsonl", '{"a": 1, "b": "x"}\n\n{"b": "y"}\n')
+    assert rows == [(1, "x"), (None, "y")]
+
+
+@pytest.mark.parametrize("name, text, message", [
+    ("t.csv", "a,b\n1,x\n2\n", "CSV line 3"),
+    ("t.csv", "a,b,extra\n1,x,?\n2,y\n", "CSV line 3"),
+    ("t.jsonl", '{"a": 1}\n\n[1, 2]\n', "line 3 is not an object"),
+    ("t.jsonl", "3\n", "line 1 is not an object"),
+    ("t.jsonl", '{"a": 1}\n{"a": \n', "line 2"),
+])
+def test_load_rejects_malformed_rows(tmp_path, name, text, message):
+    with pytest.raises(ValueError, match=message):
+        _load(tmp_path, name, text)
+
+
+@pytest.mark.parametrize("statement", [
+    "SELECT * FROM t",
+    "select a, count(*) from t group by a",
+    "WITH x AS (SELECT 1) SELECT * FROM x",
+    "VALUES (1), (2)",
+    "SELECT date(created) FROM t",
+    "SELECT datetime('2024-01-01', '+1 day')",
+    "SELECT strftime('%Y', created) FROM t",
+    "SELECT current_timestamp_col FROM t",
+])
+def test_cacheable(statement):
+    assert sql_engine.ResultCache.cacheable(statement)
+
+
+@pytest.mark.parametrize("statement", [
+    "INSERT INTO t VALUES (1)",
+    "PRAGMA table_info(t)",
+    "WITH x AS (DELETE FROM t RETURNING *) SELECT * FROM x",
+    "SELECT random()",
+    "SELECT last_insert_rowid()",
+    "SELECT CURRENT_TIMESTAMP",
+    "SELECT current_date, current_time",
+    "SELECT datetime()",
+    "SELECT date ( )",
+    "SELECT time()",
+    "SELECT julianday()",
+    "SELECT unixepoch()",
+    "SELECT strftime('%s')",
+    "SELECT datetime('now', '-1 day')",
+    "SELECT * FROM t WHERE created < date('NOW')",
+])
+def test_not_cacheable(statement):
+    assert not sql_engine.ResultCache.cacheable(statement)
+
+
+TRIGGER = (
+    "CREATE TRIGGER log_insert AFTER INSERT ON t BEGIN\n"
+    "  INSERT INTO log VALUES (CASE WHEN new.a > 0 THEN 'pos' ELSE 'neg' END);\n"
+    "  UPDATE t SET b = 'x;y' WHERE a = new.a; -- done; really\n"
+    "END"
+)
+SCRIPT = (
+    "SELECT 'a;b', \"c;d\", `e;f`, [g;h] FROM t; -- trailing; comment\n"
+    "/* block; comment */ SELECT 'it''s';\n"
+    + TRIGGER + ";\n"
+    "CREATE TEMP TRIGGER t2 BEFORE DELETE ON t BEGIN SELECT 1; /* a */ /* b */ END;\n"
+    "SELECT -1 - 2 / 3;"
+    "SELECT 'last'"
+)
+EXPECTED = [
+    "SELECT 'a;b', \"c;d\", `e;f`, [g;h] FROM t",
+    "SELECT 'it''s'",
+    TRIGGER.replace("-- done; really", ""),
+    "CREATE TEMP TRIGGER t2 BEFORE DELETE ON t BEGIN SELECT 1;     END",
+    "SELECT -1 - 2 / 3",
+    "SELECT 'last'",
+]
+
+
+def test_split_statements():
+    assert list(sql_engine.iter_sql_statements(SCRIPT)) == EXPECTED
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 16, 64])
+def test_split_statements_across_chunks(size):
+    chunks = [SCRIPT[i:i + size] for i in range(0, len(SCRIPT), size)]
+    assert list(sql_engine.iter_sql_statements(chunks)) == EXPECTED
+
+
+def test_split_trigger_ends_where_sqlite_does():
+    statements = list(sql_engine.iter_sql_statements(TRIGGER + "; SELECT 1;"))
+    assert len(statements) == 2
+    assert sqlite3.complete_statement(statements[0] + ";")
+
+
+def test_split_keeps_unclosed_text():
+    assert list(sql_engine.iter_sql_statements("SELECT 1; SELECT 'open;")) == ["SELECT 1", "SELECT 'open;"]
+
+
+def test_normalize_statement_caches_only_short_statements():
+    short = "SELECT  a -- note\n FROM t;"
+    values = ",  ".join(f"({i})" for i in range(sql_engine.NORMALIZE_CACHE_MAX_CHARS))
+    long = f"INSERT INTO t VALUES {values};"
+    sql_engine._normalize_cached.cache_clear()
+    assert sql_engine.normalize_statement(short) == "SELECT a FROM t"
+    assert sql_engine.normalize_statement(long) == "INSERT INTO t VALUES " + values.replace(",  ", ", ")
+    assert sql_engine._normalize_cached.cache_info().currsize == 1
+
+
+def test_result_cache_hits_until_the_data_changes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (a INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+    conn.commit()
+    cache = sql_engine.ResultCache(path)
+    try:
+        query = "SELECT a FROM t WHERE a > ? ORDER BY a"
+        assert cache.execute(conn, query, (0,)) == (["a"], [(1,), (2,)])
+        assert cache.execute(conn, "SELECT a FROM t  WHERE a > ?\n ORDER BY a;", (0,)) == (["a"], [(1,), (2,)])
+        assert (cache.hits, cache.misses) == (1, 1)
+        # Different parameters are a different entry
+        assert cache.execute(conn, query, (1,)) == (["a"], [(2,)])
+        assert cache.misses == 2
+
+        conn.execute("INSERT INTO t VALUES (3)")
+        # Not cached while conn has uncommitted changes
+        assert cache.lookup(conn, query, (0,)) == (None, None)
+        conn.commit()
+        assert cache.execute(conn, query, (0,)) == (["a"], [(1,), (2,), (3,)])
+        assert cache.misses == 3
+    finally:
+        cache.close()
+        conn.close()
+
+
+def test_result_cache_evicts_least_recently_used():
+    conn = sqlite3.connect(":memory:")
+    cache = sql_engine.ResultCache(":memory:", max_bytes=3000, max_entry_bytes=3000)
+    version = cache.version()
+    rows = [(i,) for i in range(20)]
+    for n in range(5):
+        cache.store(version, f"SELECT {n}", (), ["a"], rows)
+    assert cache.size_bytes <= 3000
+    assert cache.lookup(conn, "SELECT 4")[1] is not None
+    assert cache.lookup(conn, "SELECT 0")[1] is None
+    assert not cache.store(version, "SELECT 'big'", (), ["a"], [(i,) for i in range(1000)])
+    cache.close()
+    conn.close()
+
+
+def _plan_db():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE a (id INTEGER PRIMARY KEY, x, z)")
+    conn.execute("CREATE TABLE b (y)")
+    conn.execute("CREATE INDEX b_y ON b (y)")
+    return conn
+
+
+def test_explain_query_plan_flags_scans_and_sorts():
+    conn = _plan_db()
+    scan, subquery, sort = sql_engine.explain_query_plan(
+        conn, "SELECT * FROM a WHERE x IN (SELECT y FROM b WHERE y > ?) ORDER BY z", (1,)
+    )
+    assert scan.detail == "SCAN a" and scan.full_scan and not scan.temp_btree
+    assert sort.temp_btree and not sort.full_scan
+    [search] = subquery.children
+    assert search.detail.startswith("SEARCH b USING COVERING INDEX b_y")
+    assert not search.full_scan and search.children == []
+    assert not any(n.full_scan for n in sql_engine.explain_query_plan(conn, "SELECT * FROM a WHERE id = 1"))
+    conn.close()
+
+
+def test_explain_query_plan_nests_compound_queries():
+    conn = _plan_db()
+    [compound] = sql_engine.explain_query_plan(conn, "SELECT z FROM a UNION SELECT y FROM b")
+    left, union = compound.children
+    assert union.temp_btree and not compound.temp_btree
+    assert [n.detail for n in left.children] == ["SCAN a"] and left.children[0].full_scan
+    assert union.children[0].detail.startswith("SCAN b")
+    assert sql_engine.explain_query_plan(conn, "CREATE TABLE c (d)") == []
+    conn.close()
+
+
+def test_execute_sql_returns_the_last_result_set():
+    conn = sqlite3.connect(":memory:")
+    assert sql_engine.execute_sql(conn, "CREATE TABLE t (a INTEGER); INSERT INTO t VALUES (1), (2)") == (
+        None, [("Success: 2 rows affected",)]
+    )
+    assert sql_engine.execute_sql(conn, "SELECT 0; SELECT a FROM t WHERE a > :low", {"low": 1}) == (["a"], [(2,)])
+    assert sql_engine.execute_sql(conn, "SELECT ?; SELECT ?", (1,))[1][0][0].startswith("Error: Positional")
+    assert sql_engine.execute_sql(conn, "SELECT * FROM missing")[1][0][0].startswith("SQL Error:")
+    assert sql_engine.execute_sql(conn, " -- nothing") == (None, [("No valid SQL statements",)])
+    conn.close()
+
+
+def test_iter_sql_results_runs_each_statement():
+    conn = sqlite3.connect(":memory:")
+    results = list(sql_engine.iter_sql_results(
+        conn, "CREATE TABLE t (a INTEGER); INSERT INTO t VALUES (1), (2); SELECT a FROM t ORDER BY a; SELECT 1"
+    ))
+    assert [r.columns for r in results] == [None, None, ["a"], ["1"]]
+    assert results[1].rowcount == 2
+    # Cursors of earlier result sets stay readable
+    assert list(results[2].rows) == [(1,), (2,)]
+    assert not any(r.cached or r.cache_version is not None for r in results)
+    conn.close()
+
+
+def test_iter_sql_results_binds_params():
+    conn = sqlite3.connect(":memory:")
+    named = sql_engine.iter_sql_results(conn, "SELECT :x; SELECT :x + 1", params={"x": 1})
+    assert [list(r.rows) for r in named] == [[(1,)], [(2,)]]
+    assert list(next(sql_engine.iter_sql_results(conn, "SELECT ?", params=(5,))).rows) == [(5,)]
+    with pytest.raises(ValueError, match="single statement"):
+        list(sql_engine.iter_sql_results(conn, "SELECT ?; SELECT ?", params=(5,)))
+    conn.close()
+
+
+def test_iter_sql_results_through_the_cache(tmp_path):
+    path = str(tmp_path / "results.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (a INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    cache = sql_engine.ResultCache(path)
+    try:
+        miss, = sql_engine.iter_sql_results(conn, "SELECT a FROM t", cache)
+        assert not miss.cached and miss.cache_version is not None
+        rows = miss.rows.fetchall()
+        cache.store(miss.cache_version, miss.statement, (), miss.columns, rows)
+
+        hit, = sql_engine.iter_sql_results(conn, "SELECT a  FROM t;", cache)
+        assert hit.cached and hit.columns == ["a"] and list(hit.rows) == [(1,)]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # Writes bypass the cache
+        write, = sql_engine.iter_sql_results(conn, "INSERT INTO t VALUES (2)", cache)
+        assert write.cache_version is None and write.rowcount == 1
+    finally:
+        cache.close()
+        conn.close()
+
+
+def test_export_query_binds_params(tmp_path):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (a INTEGER, b TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(1, "x"), (2, "y"), (3, "z")])
+    path = str(tmp_path / "out.jsonl")
+
+    script = "CREATE TEMP TABLE picked AS SELECT * FROM t WHERE a >= :low; SELECT b FROM picked WHERE a < :high"
+    report = sql_engine.export_query(conn, script, path, params={"low": 2, "high": 3})
+    assert report.rows == 1
+    assert (tmp_path / "out.jsonl").read_text(encoding="utf-8") == '{"b": "y"}\n'
+
+    report = sql_engine.export_query(conn, "SELECT a, b FROM t WHERE a > ?", str(tmp_path / "out.csv"), params=(1,))
+    assert report.rows == 2
+    assert (tmp_path / "out.csv").read_text(encoding="utf-8").splitlines() == ["a,b", "2,y", "3,z"]
+
+    with pytest.raises(ValueError, match="single statement"):
+        sql_engine.export_query(conn, "SELECT ?; SELECT ?", path, params=(1,))
+    conn.close()
+
+
+def test_split_scans_each_chunk_once():
+    splitter = sql_engine._StatementSplitter()
+    values = ",".join(f"({i}, 'v;{i}', \"x\" - -1 / 2)" for i in range(2000))
+    insert = f"INSERT INTO t VALUES {values}"
+    chunks = [insert[i:i + 10] for i in range(0, len(insert), 10)]
+    for chunk in chunks:
+        assert list(splitter.feed(chunk)) == []
+        # Only a token's last character or an open quote is carried over
+        assert len(splitter._pending) <= 3
+    assert list(splitter.close()) == [insert]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 4])
+def test_split_comments_and_quotes_across_chunks(size):
+    script = "SELECT 'a''b;' /* x; **/ - -1; /**/SELECT [c;d] -- e;\n; SELECT \"f\"\"g\""
+    chunks = [script[i:i + size] for i in range(0, len(script), size)]
+    assert list(sql_engine.iter_sql_statements(chunks)) == [
+        "SELECT 'a''b;'   - -1", "SELECT [c;d]", 'SELECT "f""g"',
+    ]
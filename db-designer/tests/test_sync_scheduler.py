@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer  # noqa: E402
+
+from controller.connection_manager import ConnectionManager  # noqa: E402
+from controller.sql_engine import DDLCache  # noqa: E402
+from controller.sync_scheduler import SyncScheduler, sync_database  # noqa: E402
+from model.attribute import Attribute  # noqa: E402
+from model.schema import Schema  # noqa: E402
+from model.table import Table  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def setup(app, tmp_path):
+    manager = ConnectionManager(str(tmp_path / "sync.db"))
+    schema = Schema()
+    ddl = DDLCache(schema)
+    scheduler = SyncScheduler(manager, ddl, delay=20)
+    reports = []
+    scheduler.synced.connect(reports.append)
+    yield manager, schema, scheduler, reports
+    scheduler.stop()
+    ddl.close()
+    manager.close()
+
+
+def live_tables(manager):
+    rows = manager.writer.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")
+    return [name for name, in rows]
+
+
+def wait_for(condition, timeout=5000):
+    loop = QEventLoop()
+    poll = QTimer()
+    poll.timeout.connect(lambda: condition() and loop.quit())
+    poll.start(5)
+    QTimer.singleShot(timeout, loop.quit)
+    loop.exec()
+    poll.stop()
+    assert condition()
+
+
+def add(schema, scheduler, name):
+    schema.add_table(Table(name, [Attribute("id", "INTEGER", is_primary_key=True)]))
+    scheduler.request()
+
+
+def test_bursts_of_changes_are_synced_once(setup):
+    manager, schema, scheduler, reports = setup
+    for name in ("a", "b", "c"):
+        add(schema, scheduler, name)
+    assert scheduler.is_pending() and reports == []
+    wait_for(lambda: reports and not scheduler.is_pending())
+    assert len(reports) == 1 and reports[0].error is None
+    assert live_tables(manager) == ["a", "b", "c"]
+
+
+def test_sync_now_applies_pending_changes(setup):
+    manager, schema, scheduler, reports = setup
+    add(schema, scheduler, "a")
+    report = scheduler.sync_now()
+    assert report is not None and report.steps == 1
+    assert live_tables(manager) == ["a"]
+    assert not scheduler.is_pending()
+    assert scheduler.sync_now() is None
+
+
+def test_deferred_requests_wait_for_sync_now(setup):
+    manager, schema, scheduler, reports = setup
+    schema.add_table(Table("a", [Attribute("id", "INTEGER", is_primary_key=True)]))
+    scheduler.request(defer=True)
+    loop = QEventLoop()
+    QTimer.singleShot(100, loop.quit)
+    loop.exec()
+    assert reports == [] and scheduler.is_deferred()
+    scheduler.sync_now()
+    assert live_tables(manager) == ["a"] and not scheduler.is_deferred()
+
+
+def test_sync_database_keeps_rows():
+    conn = sqlite3.connect(":memory:")
+    conn.execute('CREATE TABLE "t" ("id" INTEGER PRIMARY KEY)')
+    conn.execute('INSERT INTO "t" VALUES (1)')
+    conn.commit()
+    report = sync_database(conn, [("t", 'CREATE TABLE IF NOT EXISTS "t" (\n    "id" INTEGER,\n    "name" TEXT,\n    PRIMARY KEY ("id")\n);\n')])
+    assert report.error is None and not report.rebuilt
+    assert conn.execute('SELECT * FROM "t"').fetchall() == [(1, None)]
+    conn.close()
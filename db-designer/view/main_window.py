@@ -1,4 +1,5 @@
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import QModelIndex, QRect, Qt, Signal
+from PySide6.QtGui import QBrush, QColor
 from PySide6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -14,6 +15,12 @@ from PySide6.QtWidgets import (
     QScrollArea,
     QHeaderView,
     QMessageBox,
+    QFileDialog,
+    QSpinBox,
+    QTabWidget,
+    QCheckBox,
+    QTreeWidget,
+    QTreeWidgetItem,
 )
 
 
@@ -21,9 +28,21 @@ from .widgets.sql_viewer import SQLViewer
 from .widgets.canvas_widget import CanvasWidget
 
 
+def _with_filter_extension(path: str, selected_filter: str, extensions: tuple) -> str:
+    """
+    The format of a saved file follows its extension: add the one of the
+    selected "Name (*.ext)" filter if ``path`` has none of ``extensions``.
+    """
+    if path.lower().endswith(extensions):
+        return path
+    return path + selected_filter[selected_filter.rfind("*") + 1:selected_filter.rfind(")")]
+
+
 class SQLGeneratorDialog(QDialog):
     """Dialog to show generated SQL with copy functionality."""
     
+    save_requested = Signal(str)
+    
     def __init__(self, sql_text: str, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Generated SQL")
@@ -122,6 +141,30 @@ class SQLGeneratorDialog(QDialog):
         copy_btn.clicked.connect(self._copy_to_clipboard)
         button_layout.addWidget(copy_btn)
         
+        # Save button
+        save_btn = QPushButton("💾 Save to File")
+        save_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #1e293b;
+                color: #e2e8f0;
+                border: 1px solid #3b82f6;
+                padding: 14px 36px;
+                border-radius: 10px;
+                font-size: 14px;
+                font-weight: 600;
+                min-width: 140px;
+                max-height: 46px;
+            }
+            QPushButton:hover {
+                background-color: #2563eb;
+                border: 1px solid #60a5fa;
+                color: #ffffff;
+            }
+        """)
+        save_btn.setFixedHeight(44)
+        save_btn.clicked.connect(self._on_save)
+        button_layout.addWidget(save_btn)
+        
         # Close button
         close_btn = QPushButton("Close")
         close_btn.setStyleSheet("""
@@ -157,12 +200,23 @@ class SQLGeneratorDialog(QDialog):
         
         # Show brief confirmation
         QMessageBox.information(self, "Copied", "SQL copied to clipboard!", QMessageBox.Ok)
+    
+    def _on_save(self):
+        """Ask for a target file; the controller streams the script into it."""
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save SQL Script", "schema.sql", "SQL Files (*.sql);;All Files (*)"
+        )
+        if path:
+            self.save_requested.emit(path)
 
 
 class SQLConsoleDialog(QDialog):
     """Enhanced SQL Console with better UX."""
     
-    execute_requested = Signal(str)
+    execute_requested = Signal(str, int, bool)  # sql, timeout, use result cache
+    cancel_requested = Signal()
+    export_requested = Signal(str, str)  # sql, path
+    explain_requested = Signal(str)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -273,8 +327,92 @@ class SQLConsoleDialog(QDialog):
         """)
         self.btn_execute.setFixedHeight(48)
         self.btn_execute.clicked.connect(self._on_execute)
+        
+        # Cancel button (enabled while a query runs)
+        self.btn_cancel = QPushButton("⏹️ Cancel")
+        self.btn_cancel.setStyleSheet("""
+            QPushButton {
+                background-color: #334155;
+                color: #e2e8f0;
+                border: 1px solid #475569;
+                padding: 16px 32px;
+                border-radius: 10px;
+                font-size: 15px;
+                font-weight: 600;
+                min-width: 120px;
+                max-height: 50px;
+            }
+            QPushButton:hover {
+                background-color: #dc2626;
+                border: 1px solid #ef4444;
+                color: #ffffff;
+            }
+            QPushButton:disabled {
+                color: #64748b;
+                background-color: #1e293b;
+            }
+        """)
+        self.btn_cancel.setFixedHeight(48)
+        self.btn_cancel.setEnabled(False)
+        self.btn_cancel.clicked.connect(self.cancel_requested)
+        
+        # Explain button - shows the query plan without running the query
+        self.btn_explain = QPushButton("🔍 Explain")
+        self.btn_explain.setStyleSheet("""
+            QPushButton {
+                background-color: #334155;
+                color: #e2e8f0;
+                border: 1px solid #475569;
+                padding: 16px 32px;
+                border-radius: 10px;
+                font-size: 15px;
+                font-weight: 600;
+                min-width: 120px;
+                max-height: 50px;
+            }
+            QPushButton:hover {
+                background-color: #7c3aed;
+                border: 1px solid #8b5cf6;
+                color: #ffffff;
+            }
+        """)
+        self.btn_explain.setFixedHeight(48)
+        self.btn_explain.setToolTip("Show EXPLAIN QUERY PLAN; full scans and temp B-trees are highlighted")
+        self.btn_explain.clicked.connect(self._on_explain)
+        
+        # Per-query timeout, 0 = no limit
+        timeout_label = QLabel("Timeout (s):")
+        timeout_label.setStyleSheet("color: #94a3b8; font-size: 13px;")
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(0, 3600)
+        self.timeout_spin.setValue(30)
+        self.timeout_spin.setSpecialValueText("none")
+        self.timeout_spin.setToolTip("Abort queries running longer than this (0 = no limit)")
+        self.timeout_spin.setStyleSheet("""
+            QSpinBox {
+                background-color: #0d1b2a;
+                color: #e2e8f0;
+                border: 1px solid #1e3a5f;
+                border-radius: 6px;
+                padding: 6px 8px;
+                font-size: 13px;
+            }
+        """)
+        
         execute_layout.addStretch()
         execute_layout.addWidget(self.btn_execute)
+        execute_layout.addWidget(self.btn_cancel)
+        execute_layout.addWidget(self.btn_explain)
+        execute_layout.addSpacing(20)
+        execute_layout.addWidget(timeout_label)
+        execute_layout.addWidget(self.timeout_spin)
+        execute_layout.addSpacing(20)
+        
+        # Repeated SELECTs are answered from the result cache until the data changes
+        self.cache_check = QCheckBox("Cache results")
+        self.cache_check.setToolTip("Reuse results of identical SELECTs while the database is unchanged")
+        self.cache_check.setStyleSheet("QCheckBox { color: #94a3b8; font-size: 13px; }")
+        execute_layout.addWidget(self.cache_check)
         execute_layout.addStretch()
         
         layout.addLayout(execute_layout)
@@ -297,8 +435,34 @@ class SQLConsoleDialog(QDialog):
         
         results_layout.addLayout(results_header)
         
-        self.results_view = QTableView()
-        self.results_view.setStyleSheet("""
+        # One tab per result set; the stylesheet applies to every tab's table
+        self.results_tabs = QTabWidget()
+        self.results_tabs.setStyleSheet("""
+            QTabWidget::pane {
+                border: none;
+            }
+            QTabBar::tab {
+                background-color: #1e293b;
+                color: #94a3b8;
+                padding: 8px 18px;
+                border-top-left-radius: 8px;
+                border-top-right-radius: 8px;
+                margin-right: 4px;
+                font-size: 12px;
+                font-weight: 600;
+            }
+            QTabBar::tab:selected {
+                background-color: #2563eb;
+                color: white;
+            }
+            QTreeWidget {
+                background-color: #0d1b2a;
+                border: 2px solid #1e3a5f;
+                border-radius: 12px;
+                color: #e2e8f0;
+                font-size: 13px;
+                padding: 8px;
+            }
             QTableView {
                 background-color: #0d1b2a;
                 border: 2px solid #1e3a5f;
@@ -332,14 +496,13 @@ class SQLConsoleDialog(QDialog):
                 font-size: 13px;
             }
         """)
-        self.results_view.setAlternatingRowColors(True)
-        self.results_view.horizontalHeader().setStretchLastSection(True)
-        self.results_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
-        self.results_view.setMinimumHeight(200)
+        self.results_tabs.setMinimumHeight(200)
+        self.results_tabs.currentChanged.connect(lambda _: self._update_result_status())
+        self.results_tabs.addTab(self._create_results_view(), "Result")
         
         # Wrap results view in scroll area for better scrolling
         results_scroll = QScrollArea()
-        results_scroll.setWidget(self.results_view)
+        results_scroll.setWidget(self.results_tabs)
         results_scroll.setWidgetResizable(True)
         results_scroll.setStyleSheet("""
             QScrollArea {
@@ -407,6 +570,30 @@ class SQLConsoleDialog(QDialog):
         clear_btn.clicked.connect(self.sql_console.clear)
         bottom_layout.addWidget(clear_btn)
         
+        # Export button - streams the query's rows to a file, not the grid
+        export_btn = QPushButton("💾 Export Results")
+        export_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #0f766e;
+                color: white;
+                border: 1px solid #14b8a6;
+                padding: 12px 28px;
+                border-radius: 10px;
+                font-size: 13px;
+                font-weight: 600;
+                min-width: 130px;
+                max-height: 42px;
+            }
+            QPushButton:hover {
+                background-color: #14b8a6;
+                border: 1px solid #2dd4bf;
+            }
+        """)
+        export_btn.setFixedHeight(40)
+        export_btn.setToolTip("Run the query and write its last result set to CSV, JSON Lines or NumPy columnar")
+        export_btn.clicked.connect(self._on_export)
+        bottom_layout.addWidget(export_btn)
+        
         bottom_layout.addStretch()
         
         # Close button
@@ -448,18 +635,130 @@ class SQLConsoleDialog(QDialog):
         
         # Execute the SQL - let the SQL engine handle validation
         self.result_status.setText("⏳ Executing...")
-        self.execute_requested.emit(sql)
+        self.execute_requested.emit(sql, self.timeout_spin.value(), self.cache_check.isChecked())
+    
+    def _on_explain(self):
+        sql = self.sql_console.toPlainText().strip()
+        if not sql:
+            self.result_status.setText("⚠️ No SQL to explain - Please enter a SQL query")
+            return
+        self.explain_requested.emit(sql)
+    
+    def _on_export(self):
+        sql = self.sql_console.toPlainText().strip()
+        if not sql:
+            self.result_status.setText("⚠️ No SQL to export - Please enter a SQL query")
+            return
+        path, selected = QFileDialog.getSaveFileName(
+            self,
+            "Export Results",
+            "results.csv",
+            "CSV Files (*.csv);;JSON Lines (*.jsonl);;NumPy Columnar (*.npz)",
+        )
+        if path:
+            self.export_requested.emit(sql, _with_filter_extension(path, selected, (".csv", ".jsonl", ".npz")))
+    
+    def set_running(self, running: bool):
+        """Toggle the buttons while a query runs in the background."""
+        self.btn_execute.setEnabled(not running)
+        self.btn_cancel.setEnabled(running)
+    
+    def set_progress(self, elapsed: float):
+        self.result_status.setText(f"⏳ Executing... {elapsed:.1f}s")
+    
+    def _create_results_view(self):
+        view = QTableView()
+        view.setAlternatingRowColors(True)
+        view.horizontalHeader().setStretchLastSection(True)
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        return view
     
     def set_query_results_model(self, model):
-        self.results_view.setModel(model)
-        # Update status based on results
-        if model.rowCount() > 0:
+        self.set_query_results([("Result", "", model)])
+    
+    def set_query_results(self, tabs, current=-1):
+        """Show (title, tooltip, model) tabs and select the one at index current."""
+        self.results_tabs.blockSignals(True)
+        while self.results_tabs.count():
+            view = self.results_tabs.widget(0)
+            self.results_tabs.removeTab(0)
+            view.deleteLater()
+        for title, tooltip, model in tabs:
+            view = self._create_results_view()
+            view.setModel(model)
+            # Lazy models load more rows as the view scrolls
+            model.rowsInserted.connect(lambda *_: self._update_result_status())
+            index = self.results_tabs.addTab(view, title)
+            self.results_tabs.setTabToolTip(index, tooltip)
+        self.results_tabs.setCurrentIndex(current % self.results_tabs.count())
+        self.results_tabs.blockSignals(False)
+        self._update_result_status()
+    
+    def set_query_plan(self, plans):
+        """
+        Show query plans in a "Plan" tab as a tree. plans holds a
+        (statement, plan nodes or error text) pair per statement.
+        """
+        tree = QTreeWidget()
+        tree.setHeaderHidden(True)
+        full_scans = temp_btrees = 0
+        
+        def add_nodes(parent_item, nodes):
+            nonlocal full_scans, temp_btrees
+            for node in nodes:
+                item = QTreeWidgetItem(parent_item, [node.detail])
+                if node.full_scan:
+                    full_scans += 1
+                    item.setForeground(0, QBrush(QColor("#f87171")))
+                    item.setToolTip(0, "Full table scan - an index on the filtered or joined columns may help")
+                elif node.temp_btree:
+                    temp_btrees += 1
+                    item.setForeground(0, QBrush(QColor("#fbbf24")))
+                    item.setToolTip(0, "Temporary B-tree - an index matching the ORDER BY / GROUP BY may help")
+                add_nodes(item, node.children)
+        
+        for statement, plan in plans:
+            top = QTreeWidgetItem(tree, [" ".join(statement.split())])
+            top.setToolTip(0, statement)
+            if isinstance(plan, str):
+                QTreeWidgetItem(top, [f"⚠️ {plan}"])
+            elif not plan:
+                QTreeWidgetItem(top, ["(no query plan)"])
+            else:
+                add_nodes(top, plan)
+        tree.expandAll()
+        
+        for index in range(self.results_tabs.count()):
+            if self.results_tabs.tabText(index) == "Plan":
+                old = self.results_tabs.widget(index)
+                self.results_tabs.removeTab(index)
+                old.deleteLater()
+                break
+        index = self.results_tabs.addTab(tree, "Plan")
+        self.results_tabs.setCurrentIndex(index)
+        self.result_status.setText(
+            f"Query plan: {full_scans} full scan(s), {temp_btrees} temp B-tree(s)"
+        )
+    
+    def _update_result_status(self):
+        view = self.results_tabs.currentWidget()
+        model = view.model() if isinstance(view, QTableView) else None
+        if model is None:
+            return
+        if hasattr(model, "summary"):
+            view.resizeColumnsToContents()
+            self.result_status.setText(model.summary())
+            return
+        if not view.property("resized") and model.rowCount() > 0:
+            # Auto-resize columns to content once the tab has rows
+            view.resizeColumnsToContents()
+            view.setProperty("resized", True)
+        if model.canFetchMore(QModelIndex()):
+            self.result_status.setText(f"{model.rowCount()} row(s) loaded (scroll for more)")
+        elif model.rowCount() > 0:
             self.result_status.setText(f"{model.rowCount()} row(s) returned")
         else:
             self.result_status.setText("Query executed successfully")
-        
-        # Auto-resize columns to content
-        self.results_view.resizeColumnsToContents()
 
 
 class MainWindow(QMainWindow):
@@ -471,8 +770,19 @@ class MainWindow(QMainWindow):
     add_attribute_requested = Signal()
     add_relationship_requested = Signal()
     generate_sql_requested = Signal()
-    execute_sql_requested = Signal(str)
+    execute_sql_requested = Signal(str, int, bool)
+    cancel_sql_requested = Signal()
+    export_sql_requested = Signal(str)
     open_sql_console_requested = Signal()
+    import_data_requested = Signal()
+    generate_data_requested = Signal()
+    export_query_requested = Signal(str, str)
+    explain_sql_requested = Signal(str)
+    sql_console_closed = Signal()
+    save_db_requested = Signal()
+    open_project_requested = Signal(str)
+    save_project_requested = Signal(str)
+    canvas_viewport_changed = Signal()  # scrolled, resized or shown
     delete_table_requested = Signal(str)
     delete_attribute_requested = Signal(str, str)
     delete_relationship_requested = Signal(str, str)
@@ -616,6 +926,14 @@ class MainWindow(QMainWindow):
         self.btn_add_relationship = QPushButton("🔗 Add Relationship")
         self.btn_add_relationship.setStyleSheet(sidebar_button_style)
         self.btn_add_relationship.setToolTip("Link tables with relationships")
+
+        self.btn_open_project = QPushButton("📂 Open Project")
+        self.btn_open_project.setStyleSheet(sidebar_button_style)
+        self.btn_open_project.setToolTip("Load tables, relationships and layout from a project file")
+
+        self.btn_save_project = QPushButton("💾 Save Project")
+        self.btn_save_project.setStyleSheet(sidebar_button_style)
+        self.btn_save_project.setToolTip("Save tables, relationships and layout (.json, compact .dbd or memory-mapped .dbdx)")
         
         # Generate SQL button style (purple accent)
         sql_button_style = """
@@ -673,13 +991,51 @@ class MainWindow(QMainWindow):
         self.btn_execute_sql.setStyleSheet(console_button_style)
         self.btn_execute_sql.setToolTip("Open SQL console to run queries")
 
+        self.btn_import_data = QPushButton("📥 Import Data")
+        self.btn_import_data.setStyleSheet(console_button_style)
+        self.btn_import_data.setToolTip("Bulk load a CSV or JSON Lines file into a table")
+
+        self.btn_generate_data = QPushButton("🎲 Generate Data")
+        self.btn_generate_data.setStyleSheet(console_button_style)
+        self.btn_generate_data.setToolTip("Fill every table with synthetic rows for load testing")
+
+        # Only shown for an in-memory working database (see set_db_status)
+        self.btn_save_db = QPushButton("💾 Save Database")
+        self.btn_save_db.setStyleSheet(console_button_style)
+        self.btn_save_db.setToolTip("Write the in-memory working database to disk")
+        self.btn_save_db.setVisible(False)
+
+        status_style = """
+            QLabel {
+                font-size: 12px;
+                color: #94a3b8;
+                padding: 4px 6px;
+            }
+        """
+        self.sync_status = QLabel("")
+        self.sync_status.setWordWrap(True)
+        self.sync_status.setStyleSheet(status_style)
+        self.sync_status.setVisible(False)
+
+        self.db_status = QLabel("")
+        self.db_status.setWordWrap(True)
+        self.db_status.setStyleSheet(status_style)
+        self.db_status.setVisible(False)
+
         # Add buttons to navigation layout
         nav_layout.addWidget(self.btn_add_table)
         nav_layout.addWidget(self.btn_add_attribute)
         nav_layout.addWidget(self.btn_add_relationship)
+        nav_layout.addWidget(self.btn_open_project)
+        nav_layout.addWidget(self.btn_save_project)
         nav_layout.addWidget(self.btn_generate_sql)
         nav_layout.addWidget(self.btn_execute_sql)
+        nav_layout.addWidget(self.btn_import_data)
+        nav_layout.addWidget(self.btn_generate_data)
+        nav_layout.addWidget(self.btn_save_db)
         nav_layout.addStretch()
+        nav_layout.addWidget(self.sync_status)
+        nav_layout.addWidget(self.db_status)
 
         sidebar_layout.addWidget(nav_container)
         main_layout.addWidget(sidebar)
@@ -766,6 +1122,9 @@ class MainWindow(QMainWindow):
         
         scroll_area.setWidget(self.canvas)
         content_layout.addWidget(scroll_area, 1)
+        self.canvas_scroll = scroll_area
+        scroll_area.horizontalScrollBar().valueChanged.connect(self.canvas_viewport_changed)
+        scroll_area.verticalScrollBar().valueChanged.connect(self.canvas_viewport_changed)
         
         main_layout.addWidget(content_widget, 1)
 
@@ -773,20 +1132,83 @@ class MainWindow(QMainWindow):
         self.btn_add_table.clicked.connect(self._on_add_table_clicked)
         self.btn_add_attribute.clicked.connect(self._on_add_attribute_clicked)
         self.btn_add_relationship.clicked.connect(self._on_add_relationship_clicked)
+        self.btn_open_project.clicked.connect(self._on_open_project_clicked)
+        self.btn_save_project.clicked.connect(self._on_save_project_clicked)
         self.btn_generate_sql.clicked.connect(self._on_generate_sql_clicked)
         self.btn_execute_sql.clicked.connect(self._on_execute_sql_clicked)
+        self.btn_import_data.clicked.connect(self._on_import_data_clicked)
+        self.btn_generate_data.clicked.connect(self._on_generate_data_clicked)
+        self.btn_save_db.clicked.connect(self.save_db_requested)
 
     # API for controller
 
     def set_generated_sql(self, sql: str) -> None:
         """Show generated SQL in a dialog."""
         self.sql_generator_dialog = SQLGeneratorDialog(sql, self)
+        self.sql_generator_dialog.save_requested.connect(self.export_sql_requested)
         self.sql_generator_dialog.exec()
 
-    def set_query_results_model(self, model) -> None:
-        """Update query results in the console dialog."""
+    def set_query_results_model(self, model) -> bool:
+        """Update query results in the console dialog. Returns False if it is closed."""
         if self.sql_console_dialog:
             self.sql_console_dialog.set_query_results_model(model)
+            return True
+        return False
+
+    def set_query_results(self, tabs, current: int = -1) -> bool:
+        """Show (title, tooltip, model) result tabs in the console. Returns False if it is closed."""
+        if self.sql_console_dialog:
+            self.sql_console_dialog.set_query_results(tabs, current)
+            return True
+        return False
+
+    def set_query_plan(self, plans) -> None:
+        if self.sql_console_dialog:
+            self.sql_console_dialog.set_query_plan(plans)
+
+    def set_query_running(self, running: bool) -> None:
+        if self.sql_console_dialog:
+            self.sql_console_dialog.set_running(running)
+
+    def set_query_progress(self, elapsed: float) -> None:
+        if self.sql_console_dialog:
+            self.sql_console_dialog.set_progress(elapsed)
+
+    def visible_canvas_rect(self) -> QRect:
+        """The part of the canvas currently scrolled into view, in canvas coordinates."""
+        viewport = self.canvas_scroll.viewport()
+        return QRect(
+            self.canvas_scroll.horizontalScrollBar().value(),
+            self.canvas_scroll.verticalScrollBar().value(),
+            viewport.width(),
+            viewport.height(),
+        )
+
+    def ensure_canvas_size(self, width: int, height: int) -> None:
+        """Grow the canvas (never shrink it) so the given extent can be scrolled to."""
+        size = self.canvas.minimumSize()
+        self.canvas.setMinimumSize(max(size.width(), width), max(size.height(), height))
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.canvas_viewport_changed.emit()
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self.canvas_viewport_changed.emit()
+
+    def set_db_status(self, text: str) -> None:
+        """Show a line about the working database under the sidebar buttons."""
+        self.db_status.setText(text)
+        self.db_status.setVisible(bool(text))
+
+    def set_sync_status(self, text: str) -> None:
+        """Show the state of the schema-to-database sync under the sidebar buttons."""
+        self.sync_status.setText(text)
+        self.sync_status.setVisible(bool(text))
+
+    def set_save_db_available(self, available: bool) -> None:
+        self.btn_save_db.setVisible(available)
 
     # Slots that only emit signals
 
@@ -799,14 +1221,44 @@ class MainWindow(QMainWindow):
     def _on_add_relationship_clicked(self) -> None:
         self.add_relationship_requested.emit()
 
+    def _on_open_project_clicked(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open Project", "", "Projects (*.json *.dbd *.dbdx);;All Files (*)"
+        )
+        if path:
+            self.open_project_requested.emit(path)
+
+    def _on_save_project_clicked(self) -> None:
+        path, selected = QFileDialog.getSaveFileName(
+            self,
+            "Save Project",
+            "project.json",
+            "JSON Project (*.json);;Compact Binary Project (*.dbd);;Memory-Mapped Project (*.dbdx)",
+        )
+        if path:
+            self.save_project_requested.emit(_with_filter_extension(path, selected, (".json", ".dbd", ".dbdx")))
+
     def _on_generate_sql_clicked(self) -> None:
         self.generate_sql_requested.emit()
 
+    def _on_import_data_clicked(self) -> None:
+        self.import_data_requested.emit()
+
+    def _on_generate_data_clicked(self) -> None:
+        self.generate_data_requested.emit()
+
     def _on_execute_sql_clicked(self) -> None:
         """Open SQL console dialog."""
         self.open_sql_console_requested.emit()
         self.sql_console_dialog = SQLConsoleDialog(self)
         self.sql_console_dialog.execute_requested.connect(
-            lambda sql: self.execute_sql_requested.emit(sql)
+            lambda sql, timeout, use_cache: self.execute_sql_requested.emit(sql, timeout, use_cache)
         )
+        self.sql_console_dialog.cancel_requested.connect(self.cancel_sql_requested)
+        self.sql_console_dialog.export_requested.connect(self.export_query_requested)
+        self.sql_console_dialog.explain_requested.connect(self.explain_sql_requested)
         self.sql_console_dialog.exec()
+        self.sql_console_dialog = None
+        # Don't leave a query running behind a closed console
+        self.cancel_sql_requested.emit()
+        self.sql_console_closed.emit()